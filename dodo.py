@@ -263,6 +263,7 @@ def task_tips_treasury_pull_fed_yield_curve():
     """ """
     file_dep = [
         "./src/tips_treasury/pull_fed_yield_curve.py",
+        "./src/fed_curve_store.py",
     ]
     targets = [
         DATA_DIR / "fed_yield_curve_all.parquet",
@@ -271,7 +272,7 @@ def task_tips_treasury_pull_fed_yield_curve():
 
     return {
         "actions": [
-            "ipython ./src/tips_treasury/pull_fed_yield_curve.py",
+            "ipython ./src/tips_treasury/pull_fed_yield_curve.py -- --incremental",
         ],
         "targets": targets,
         "file_dep": file_dep,
@@ -282,6 +283,7 @@ def task_tips_treasury_pull_fed_tips_yield_curve():
     """ """
     file_dep = [
         "./src/tips_treasury/pull_fed_tips_yield_curve.py",
+        "./src/fed_curve_store.py",
     ]
     targets = [
         DATA_DIR / "fed_tips_yield_curve.parquet",
@@ -289,7 +291,7 @@ def task_tips_treasury_pull_fed_tips_yield_curve():
 
     return {
         "actions": [
-            "ipython ./src/tips_treasury/pull_fed_tips_yield_curve.py",
+            "ipython ./src/tips_treasury/pull_fed_tips_yield_curve.py -- --incremental",
         ],
         "targets": targets,
         "file_dep": file_dep,
@@ -324,6 +326,7 @@ def task_tips_treasury_compute_tips_treasury():
     ]
     targets = [
         OUTPUT_DIR / "tips_treasury_implied_rf.parquet",
+        DATA_DIR / "tips_treasury_term_structure.parquet",
     ]
 
     return {
@@ -935,7 +938,7 @@ def task_CIP_rename_plots():
 
 
 def task_CIP_summary_stats():
-    """Generate CIP summary statistics and save them as HTML files."""
+    """Generate CIP summary statistics and save them as HTML, PNG and PDF files."""
     from pathlib import Path
     import sys
 
@@ -949,6 +952,7 @@ def task_CIP_summary_stats():
         str(cip_src / "pull_bloomberg_cip_data.py"),
         str(cip_src / "cip_analysis.py"),
         str(cip_src / "directory_functions.py"),
+        str(cip_src / "table_render.py"),
         str(MANUAL_DATA_DIR / "CIP_2025.xlsx"),
     ]
     # Outputs:
@@ -956,6 +960,9 @@ def task_CIP_summary_stats():
     out2 = OUTPUT_DIR / "cip_correlation_matrix.html"
     out3 = OUTPUT_DIR / "cip_annual_statistics.html"
     outputs = [str(out1), str(out2), str(out3)]
+    # Table images written by save_cip_statistics_as_png
+    for stem in ["cip_summary_overall", "cip_correlation_matrix", "cip_annual_statistics"]:
+        outputs += [str(OUTPUT_DIR / "main_cip_files" / f"{stem}.{ext}") for ext in ("png", "pdf")]
 
     def generate_summary():
         # Make sure OUTPUT_DIR exists
@@ -964,7 +971,7 @@ def task_CIP_summary_stats():
         # import our routines
         from pull_bloomberg_cip_data import compute_cip
         from cip_analysis import compute_cip_statistics
-        from directory_functions import save_cip_statistics_as_html
+        from directory_functions import save_cip_statistics_as_html, save_cip_statistics_as_png
 
         # 1) get the raw CIP series
         cip_data = compute_cip()
@@ -978,6 +985,9 @@ def task_CIP_summary_stats():
         #    save_cip_statistics_as_html() knows to write into OUTPUT_DIR/html_files
         save_cip_statistics_as_html(stats_dict)
 
+        # 4) render the same tables to PNG/PDF (in-process, no browser)
+        save_cip_statistics_as_png(stats_dict)
+
     return {
         "actions": [generate_summary],
         "file_dep":    deps,
@@ -1203,9 +1213,9 @@ def task_expectations_pull_ken_french_data():
             str(script),
         ],
         "targets": [
-            DATA_DIR / "6_Portfolios_2x3.xlsx",
-            DATA_DIR / "25_Portfolios_5x5.xlsx",
-            DATA_DIR / "100_Portfolios_10x10.xlsx",
+            DATA_DIR / "ken_french" / "6_Portfolios_2x3" / "manifest.json",
+            DATA_DIR / "ken_french" / "25_Portfolios_5x5" / "manifest.json",
+            DATA_DIR / "ken_french" / "100_Portfolios_10x10" / "manifest.json",
         ],
         "clean": [],   # keep these around
         "verbosity": 2,
@@ -28,18 +28,20 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
 
 sns.set()
 
-# Load data
-df = pull_bloomberg_cip_data.load_raw(end='2020-01-01', plot=True)
-df_2025 = pull_bloomberg_cip_data.load_raw(end='2025-01-01', plot=True)
 
+def main():
+    # Load data (served from the shared CIP dataset)
+    df = pull_bloomberg_cip_data.load_raw(end='2020-01-01', plot=True)
+    df_2025 = pull_bloomberg_cip_data.load_raw(end='2025-01-01', plot=True)
 
+    # Save figure
+    filename = OUTPUT_DIR / 'CIP_Replication.png'
 
+    print(f"Plot saved at {filename}")
 
-# Save figure
-filename = OUTPUT_DIR / 'CIP_Replication.png'
+    # Show plot
+    plt.show()
 
 
-print(f"Plot saved at {filename}")
-
-# Show plot
-plt.show()
+if __name__ == "__main__":
+    main()
@@ -26,15 +26,19 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
 
 sns.set()
 
-# Load data
-df = pull_bloomberg_cip_data.load_raw(end='2020-01-01')
 
+def main():
+    # Load data (served from the shared CIP dataset)
+    df = pull_bloomberg_cip_data.load_raw(end='2020-01-01')
 
-# Save figure
-filename = OUTPUT_DIR / 'CIP_Replication.pdf'
+    # Save figure
+    filename = OUTPUT_DIR / 'CIP_Replication.pdf'
 
+    print(f"Table saved at {filename}")
 
-print(f"Table saved at {filename}")
+    # Show plot
+    plt.show()
 
-# Show plot
-plt.show()
+
+if __name__ == "__main__":
+    main()
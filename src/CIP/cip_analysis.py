@@ -19,28 +19,32 @@ except ModuleNotFoundError:
 
 
 from settings import config
+from streaming_stats import YearlyStats
 
 OUTPUT_DIR = config("OUTPUT_DIR")
 
 
-def compute_cip_statistics(cip_data):
-    """Compute CIP statistics from CIP data."""
+def compute_cip_statistics(cip_data, accumulator=None):
+    """
+    Compute CIP statistics from CIP data.
+
+    The tables come from per-year mergeable accumulators (streaming_stats).
+    Pass a `YearlyStats` as `accumulator` to reuse it across calls: only the
+    days after its `last_date` are folded in.
+    """
     if cip_data is None or cip_data.empty:
         raise ValueError("Error: cip_data is empty or None. Check if compute_cip() is working correctly.")
 
-    stats_dict = {}
     cip_columns = [col for col in cip_data.columns if col.startswith('CIP_') and col.endswith('_ln')]
     cip_df = cip_data[cip_columns]
 
     if cip_df.empty:
         raise ValueError("Error: cip_df is empty after filtering CIP columns.")
 
-    stats_dict["overall_statistics"] = cip_df.describe()
-    stats_dict["correlation_matrix"] = cip_df.corr()
-    cip_data.index = pd.to_datetime(cip_data.index)
-    stats_dict["annual_statistics"] = cip_df.resample('YE').agg(['mean', 'std', 'min', 'max'])
-
-    return stats_dict
+    cip_df = cip_df.set_axis(pd.to_datetime(cip_df.index), axis=0)
+    stats = accumulator if accumulator is not None else YearlyStats(cip_columns)
+    stats.append(cip_df)
+    return stats.tables()
 
 
 
@@ -0,0 +1,171 @@
+"""
+Vectorized covered-interest-parity (CIP) basis.
+
+The quotes are stacked into arrays with the currencies on axis 1 and the
+tenors on axis 2:
+
+    spot      (dates, currencies)           foreign currency per USD
+    forward   (dates, currencies, tenors)   outright forwards, same quoting
+    ois       (dates, currencies, tenors)   foreign OIS rates, in percent
+    usd_ois   (dates, tenors)               USD OIS rates, in percent
+
+`log_basis` computes every basis in one broadcast expression,
+
+    CIP (bps) = 100*100 x [ i_foreign - (360/days) x (log F - log S) - i_USD ]
+
+taking the log of each spot series once for all its tenors. `usd_quotes` turns
+Bloomberg spot quotes and forward points into foreign-per-USD spot and
+outright forwards: the forward-point scale (per 10,000, per 100 for JPY) and
+the inversion of the currencies quoted as USD per unit (EUR, GBP, AUD, NZD)
+are applied here and nowhere else.
+
+In a DataFrame the columns are named {ccy}_CURNCY (spot), {ccy}_CURNCY{tenor}
+(forward) and {ccy}_IR{tenor} (OIS), with the tenor left off the OIS column
+for the 3M base tenor; the bases come out as CIP_{ccy}_ln (3M) and
+CIP_{ccy}_{tenor}_ln.
+
+Usage:
+    import cip_engine
+    spreads = cip_engine.cip_basis(df_merged)                       # 3M, all currencies
+    spreads = cip_engine.cip_basis(df_merged, tenors=["1M", "3M"])  # needs the 1M columns
+"""
+import numpy as np
+import pandas as pd
+
+CURRENCIES = ("AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK")
+# Quoted as USD per unit of the currency by Bloomberg
+RECIPROCAL_CURRENCIES = ("EUR", "GBP", "AUD", "NZD")
+# Forward points are per 10,000 except for these currencies
+FORWARD_POINT_SCALE = {"JPY": 100.0}
+
+# Days of each tenor on the ACT/360 money-market basis
+TENOR_DAYS = {"1W": 7, "2W": 14, "1M": 30, "2M": 60, "3M": 90, "6M": 180, "9M": 270, "1Y": 360}
+BASE_TENOR = "3M"
+
+
+def forward_column(ccy, tenor=BASE_TENOR):
+    return f"{ccy}_CURNCY{tenor}"
+
+
+def ois_column(ccy, tenor=BASE_TENOR):
+    return f"{ccy}_IR" if tenor == BASE_TENOR else f"{ccy}_IR{tenor}"
+
+
+def basis_column(ccy, tenor=BASE_TENOR):
+    return f"CIP_{ccy}_ln" if tenor == BASE_TENOR else f"CIP_{ccy}_{tenor}_ln"
+
+
+def tenor_days(tenors):
+    """Days of each tenor as an array, e.g. ["1W", "3M"] -> [7., 90.]."""
+    unknown = [t for t in tenors if t not in TENOR_DAYS]
+    if unknown:
+        raise ValueError(f"Unknown tenors {unknown}, expected some of {list(TENOR_DAYS)}")
+    return np.array([TENOR_DAYS[t] for t in tenors], dtype=float)
+
+
+def _per_currency(values, ndim):
+    """Shape a per-currency vector to broadcast along axis 1 of an ndim array."""
+    return np.asarray(values).reshape((1, -1) + (1,) * (ndim - 2))
+
+
+def usd_quotes(spot, points, currencies=CURRENCIES):
+    """
+    Foreign-per-USD spot and outright forwards from Bloomberg quotes.
+
+    Parameters
+    ----------
+    spot : array (dates, currencies)
+        Spot rates as quoted.
+    points : array (dates, currencies) or (dates, currencies, tenors)
+        Forward points as quoted.
+    currencies : sequence of str
+        Currency of each column of axis 1.
+
+    Returns
+    -------
+    (spot, forward) : tuple of arrays
+        Shaped like the inputs.
+    """
+    spot = np.asarray(spot, dtype=float)
+    points = np.asarray(points, dtype=float)
+    scale = [FORWARD_POINT_SCALE.get(c, 10000.0) for c in currencies]
+    spot_b = spot if points.ndim == spot.ndim else spot[..., None]
+    forward = spot_b + points / _per_currency(scale, points.ndim)
+
+    reciprocal = [c in RECIPROCAL_CURRENCIES for c in currencies]
+    with np.errstate(divide="ignore"):
+        spot = np.where(_per_currency(reciprocal, spot.ndim), 1.0 / spot, spot)
+        forward = np.where(_per_currency(reciprocal, forward.ndim), 1.0 / forward, forward)
+    return spot, forward
+
+
+def log_basis(spot, forward, ois, usd_ois, tenors=(BASE_TENOR,)):
+    """
+    Log CIP basis in basis points for every date, currency and tenor.
+
+    Parameters
+    ----------
+    spot : array (dates, currencies)
+    forward : array (dates, currencies, tenors)
+    ois : array (dates, currencies, tenors)
+        Foreign OIS rates in percent.
+    usd_ois : array (dates, tenors)
+        USD OIS rates in percent.
+    tenors : sequence of str
+        Tenor of each entry of axis 2, keys of TENOR_DAYS.
+
+    Returns
+    -------
+    array (dates, currencies, tenors)
+    """
+    annualize = 360.0 / tenor_days(tenors)
+    log_spot = np.log(np.asarray(spot, dtype=float))[:, :, None]
+    usd_ois = np.asarray(usd_ois, dtype=float)[:, None, :]
+    return 100 * 100 * (
+        (np.asarray(ois, dtype=float) / 100.0)
+        - annualize * (np.log(np.asarray(forward, dtype=float)) - log_spot)
+        - (usd_ois / 100.0)
+    )
+
+
+def stack_quotes(df, currencies=CURRENCIES, tenors=(BASE_TENOR,)):
+    """
+    Stack the quote columns of a wide DataFrame into the arrays of `log_basis`.
+
+    Returns
+    -------
+    (spot, forward, ois, usd_ois) : tuple of arrays
+    """
+    n_dates, n_ccy, n_tenors = len(df), len(currencies), len(tenors)
+    spot = df[[f"{c}_CURNCY" for c in currencies]].to_numpy(dtype=float)
+    forward = df[[forward_column(c, t) for c in currencies for t in tenors]].to_numpy(dtype=float)
+    ois = df[[ois_column(c, t) for c in currencies for t in tenors]].to_numpy(dtype=float)
+    usd_ois = df[[ois_column("USD", t) for t in tenors]].to_numpy(dtype=float)
+    return (
+        spot,
+        forward.reshape(n_dates, n_ccy, n_tenors),
+        ois.reshape(n_dates, n_ccy, n_tenors),
+        usd_ois,
+    )
+
+
+def cip_basis(df, currencies=CURRENCIES, tenors=(BASE_TENOR,)):
+    """
+    Log CIP bases of a wide quote DataFrame, one column per currency and tenor.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Foreign-per-USD quotes and OIS rates (see the module docstring).
+    currencies : sequence of str
+    tenors : sequence of str
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed like `df`, with columns basis_column(ccy, tenor) in currency-
+        then-tenor order.
+    """
+    basis = log_basis(*stack_quotes(df, currencies, tenors), tenors=tenors)
+    columns = [basis_column(c, t) for c in currencies for t in tenors]
+    return pd.DataFrame(basis.reshape(len(df), -1), index=df.index, columns=columns)
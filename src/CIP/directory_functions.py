@@ -1,5 +1,8 @@
 """
 Converts CIP data to hmtl and png
+
+The PNG/PDF tables are drawn in-process by table_render (matplotlib); no
+browser is started.
 """
 
 
@@ -10,10 +13,7 @@ import os
 import pandas as pd
 import numpy as np
 import argparse  # ✅ Fix: Handle command-line arguments
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
+from table_render import render_cip_statistics, render_table
 
 try:
     from settings import config
@@ -36,37 +36,13 @@ except ModuleNotFoundError:
 
 
 
-
-
-cip_table_2025 = cip.compute_cip(end = '2025-01-01')
-stats_dict = cip_stats.compute_cip_statistics(cip_table_2025)
-
-
-
 OUTPUT_DIR = config("OUTPUT_DIR")
 
 
 def html_to_png(html_file, png_file):
-    """Convert an HTML file to PNG using Selenium and Chrome."""
-
-    # Set up Chrome in headless mode
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920x1080")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-
-    # Load the HTML file
-    driver.get(f"file://{html_file}")
-
-    # Take screenshot and save as PNG
-    driver.save_screenshot(png_file)
-
-    driver.quit()
-    return png_file
-
+    """Render the table of an HTML file (as written by DataFrame.to_html) to PNG."""
+    df = pd.read_html(html_file, index_col=0)[0]
+    return str(render_table(df, png_file, formats=("png",))[0])
 
 
 def save_cip_statistics_as_html(stats_dict):
@@ -85,6 +61,12 @@ def save_cip_statistics_as_html(stats_dict):
     return overall_html, corr_html, annual_html
 
 
+def save_cip_statistics_as_png(stats_dict, formats=("png", "pdf")):
+    """Render the CIP statistics tables straight to PNG/PDF files."""
+    output_dir = os.path.join(OUTPUT_DIR, "main_cip_files")
+    return render_cip_statistics(stats_dict, output_dir, formats=formats)
+
+
 def convert_html_to_png(html_files):
     """Convert HTML files to PNG images."""
 
@@ -94,5 +76,8 @@ def convert_html_to_png(html_files):
         html_to_png(html_file, png_file)
 
 
-html_files = save_cip_statistics_as_html(stats_dict)
-convert_html_to_png(html_files)
\ No newline at end of file
+
+if __name__ == "__main__":
+    stats_dict = cip.cip_dataset(end='2025-01-01').stats()
+    save_cip_statistics_as_html(stats_dict)
+    save_cip_statistics_as_png(stats_dict)
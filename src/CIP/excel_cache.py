@@ -0,0 +1,143 @@
+"""
+Columnar on-disk cache for the CIP Excel workbook.
+
+Parsing CIP_2025.xlsx takes several seconds, and every load goes through it.
+`read_excel_cached` parses a workbook once, writes each sheet to an
+uncompressed Arrow IPC (Feather v2) file, and memory-maps those files on later
+calls:
+
+    - The sheets of a workbook are stored in CACHE_DIR/<stem>-<sha256[:16]>/,
+      one sheet_<i>.arrow file per sheet plus a manifest.json with the sheet
+      names. Workbooks with the same content share one entry.
+    - CACHE_DIR/index.json remembers the size, mtime and SHA-256 of each
+      workbook path. If the size and mtime still match, the cache is used
+      without opening the workbook. Otherwise the workbook is re-hashed, and it
+      is re-parsed only when its content changed.
+
+Usage:
+    sheets = read_excel_cached("./data_manual/CIP_2025.xlsx")
+    df_spot = sheets["Spot"]
+"""
+import hashlib
+import json
+import os
+import warnings
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from settings import config
+
+CACHE_DIR = Path(config("DATA_DIR")) / "excel_cache"
+
+
+def file_sha256(filepath, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path, obj):
+    """Write JSON atomically so readers never see a partial file."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(obj, indent=2))
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _entry_dir(filepath, sha256, cache_dir):
+    return cache_dir / f"{Path(filepath).stem}-{sha256[:16]}"
+
+
+def _load_entry(entry_dir):
+    """Memory-map the cached sheets of one workbook, or None if incomplete."""
+    manifest = _read_json(entry_dir / "manifest.json")
+    if "sheets" not in manifest:
+        return None
+    try:
+        return {
+            name: feather.read_table(entry_dir / f"sheet_{i}.arrow", memory_map=True).to_pandas()
+            for i, name in enumerate(manifest["sheets"])
+        }
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def _write_entry(entry_dir, sheets, source):
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    for i, df in enumerate(sheets.values()):
+        tmp = entry_dir / f"sheet_{i}.arrow.tmp"
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, entry_dir / f"sheet_{i}.arrow")
+    # The manifest is written last: an entry without one is ignored.
+    _write_json(entry_dir / "manifest.json", {"source": str(source), "sheets": list(sheets)})
+
+
+def workbook_sha256(filepath, cache_dir=None):
+    """
+    SHA-256 of a workbook, re-hashed only when its size or mtime changed.
+
+    The digest is remembered in CACHE_DIR/index.json, so this is also a cheap
+    content key for results derived from the workbook.
+    """
+    filepath = Path(filepath).resolve()
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index_file = cache_dir / "index.json"
+
+    stat = filepath.stat()
+    index = _read_json(index_file)
+    known = index.get(str(filepath), {})
+    if known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+        return known["sha256"]
+
+    sha256 = file_sha256(filepath)
+    index[str(filepath)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    _write_json(index_file, index)
+    return sha256
+
+
+def read_excel_cached(filepath, cache_dir=None):
+    """
+    Read all sheets of an Excel workbook through the Arrow cache.
+
+    Returns the same dict of DataFrames as `pd.read_excel(filepath, sheet_name=None)`.
+    If a sheet cannot be stored as Arrow (e.g. mixed-type columns), the parsed
+    workbook is returned without being cached.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        Path to the workbook.
+    cache_dir : str or Path, optional
+        Cache location; defaults to DATA_DIR/excel_cache.
+
+    Returns
+    -------
+    dict
+        Sheet name -> DataFrame, in workbook order.
+    """
+    filepath = Path(filepath).resolve()
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    sha256 = workbook_sha256(filepath, cache_dir)
+
+    entry_dir = _entry_dir(filepath, sha256, cache_dir)
+    sheets = _load_entry(entry_dir)
+    if sheets is None:
+        sheets = pd.read_excel(filepath, sheet_name=None)
+        try:
+            _write_entry(entry_dir, sheets, filepath)
+        except (pa.ArrowException, ValueError) as e:
+            warnings.warn(f"Could not cache {filepath.name}: {e}")
+    return sheets
@@ -10,6 +10,11 @@ import matplotlib.dates as mdates
 
 from dateutil.relativedelta import relativedelta
 import datetime
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import weighted_stats
 
 
 ########################################################################################
@@ -238,7 +243,8 @@ def move_columns_to_front(df, cols=[]):
 
 
 def weighted_average(data_col=None, weight_col=None, data=None):
-    """Simple calculation of weighted average.
+    """Simple calculation of weighted average, skipping rows where the value
+    or the weight is missing.
 
     Examples
     --------
@@ -253,14 +259,7 @@ def weighted_average(data_col=None, weight_col=None, data=None):
     ```
     """
 
-    def weights_function(row):
-        return data.loc[row.index, weight_col]
-
-    def wm(row):
-        return np.average(row, weights=weights_function(row))
-
-    result = wm(data[data_col])
-    return result
+    return weighted_stats.weighted_mean(data[data_col], data[weight_col])
 
 
 def groupby_weighted_average(
@@ -274,8 +273,9 @@ def groupby_weighted_average(
     """
     Faster method for calculating grouped weighted average.
 
-    From:
-    https://stackoverflow.com/a/44683506
+    The group sums are `np.bincount`s over integer group codes (see
+    weighted_stats); rows with a missing value or weight are skipped, and
+    `data` is not modified.
 
     Examples
     --------
@@ -295,20 +295,13 @@ def groupby_weighted_average(
     ```
 
     """
-    data["_data_times_weight"] = data[data_col] * data[weight_col]
-    data["_weight_where_notnull"] = data[weight_col] * pd.notnull(data[data_col])
-    g = data.groupby(by_col)
-    result = g["_data_times_weight"].sum() / g["_weight_where_notnull"].sum()
-    del data["_data_times_weight"], data["_weight_where_notnull"]
-
     if transform:
-        result.name = f"__{data_col}"
-        result = data.merge(result.reset_index(), how="left", on=by_col)[
-            f"__{data_col}"
-        ]
-        result.name = new_column_name
+        result = weighted_stats.groupby_weighted_mean(
+            data, data_col, weight_col, by_col, transform=True
+        )
+        return pd.Series(result, name=new_column_name)
 
-    return result
+    return weighted_stats.groupby_weighted_mean(data, data_col, weight_col, by_col)
 
 
 def groupby_weighted_std(
@@ -317,8 +310,10 @@ def groupby_weighted_std(
     """
     Method for calculating grouped weighted standard devation.
 
-    From:
-    https://stackoverflow.com/a/72915123
+    The variance is sum(w * (x - mean)^2) / ((n - ddof) / n * sum(w)), with n
+    the number of rows in the group (after https://stackoverflow.com/a/72915123),
+    computed for all groups at once by weighted_stats. Rows with a missing
+    value or weight are skipped.
 
     Examples
     --------
@@ -353,18 +348,7 @@ def groupby_weighted_std(
 
     """
 
-    def weighted_sd(input_df):
-        weights = input_df[weight_col]
-        vals = input_df[data_col]
-
-        weighted_avg = np.average(vals, weights=weights)
-
-        numer = np.sum(weights * (vals - weighted_avg) ** 2)
-        denom = ((vals.count() - ddof) / vals.count()) * np.sum(weights)
-
-        return np.sqrt(numer / denom)
-
-    return data.groupby(by_col).apply(weighted_sd)
+    return weighted_stats.groupby_weighted_std(data, data_col, weight_col, by_col, ddof=ddof)
 
 
 def weighted_quantile(
@@ -911,6 +895,9 @@ def html_to_png(directory):
     """
     Convert all .html files in the given directory to .png format.
 
+    The first table of each file is read with pandas and drawn with matplotlib
+    (table_render.render_table), in-process.
+
     Parameters:
     directory (str): The path to the directory containing .html files.
 
@@ -918,7 +905,7 @@ def html_to_png(directory):
     list: A list of paths to the generated .png files.
     """
     from pathlib import Path
-    import subprocess
+    from table_render import render_table
 
     directory = Path(directory)
     if not directory.exists():
@@ -935,12 +922,10 @@ def html_to_png(directory):
     for html_file in html_files:
         png_file = output_dir / f"{html_file.stem}.png"
         try:
-            subprocess.run(
-                ["wkhtmltoimage", str(html_file), str(png_file)],
-                check=True
-            )
+            df = pd.read_html(html_file, index_col=0)[0]
+            render_table(df, png_file, formats=("png",))
             png_files.append(str(png_file))
-        except subprocess.CalledProcessError as e:
+        except (ValueError, ImportError) as e:
             print(f"Error converting {html_file}: {e}")
 
     return png_files
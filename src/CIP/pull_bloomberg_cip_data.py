@@ -5,10 +5,11 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-import requests
 from io import BytesIO
 import sys
 import os
+import shutil
+from functools import lru_cache
 from pathlib import Path
 from settings import config
 
@@ -21,6 +22,11 @@ try:
 except ModuleNotFoundError:
     import settings as settings # Fallback if src.settings isn't found
 
+from outlier_filter import rolling_outlier_mask
+from excel_cache import read_excel_cached, workbook_sha256
+import cip_engine
+import http_cache
+
 DATA_MANUAL = Path(config("LOCAL_MANUAL_DATA_DIR"))
 BLOOMBERG = False
 
@@ -28,13 +34,10 @@ def download():
     filepath = Path(DATA_MANUAL) / "CIP_2025.xlsx"
     if not filepath.exists():
         url = "https://raw.githubusercontent.com/Kunj121/CIP_DATA/main/CIP_2025%20(1).xlsx"
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an error on bad responses
         # Ensure the data_manual folder exists.
         #os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        # Write the file to the target path.
-        with open(filepath, "wb") as f:
-            f.write(response.content)
+        # Copy the (revalidated) cached download to the target path.
+        shutil.copyfile(http_cache.fetch(url), filepath)
     df =  pd.read_excel(filepath)
     return df
 
@@ -177,167 +180,141 @@ def fetch_bloomberg_historical_data(start_date, end_date):
         spot_mapping
     )
 
-    # For demonstration, we replicate the "3M forward" concept by appending
-    # the spot data (currency_df) to the swap rates (swap_df).
-    # In a real scenario, you might need the forward points separately
-    # to add to / subtract from spot. This code treats 'swap_df' as 3M rates.
-
-    # We keep the original spot rates in swap_df as well for reference:
-    cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-    cols_IR = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK", "USD"]
-    exchange_rates_df.columns = cols
-    forward_rates_df.columns = cols
-    interest_rates_df.columns = cols_IR
-
-    # Convert certain currencies to reciprocals
-    # The forward df is actually forward points, so we need to make this into forward rates.
-    forward_rates_df[[c for c in cols if c != 'JPY']] /= 10000
-    forward_rates_df['JPY'] /= 100
-    forward_rates_df = exchange_rates_df + forward_rates_df
-
-    exchange_rates_df.columns = [name+"_CURNCY" for name in exchange_rates_df.columns]
-    forward_rates.columns = [name+"_CURNCY3M" for name in forward_rates.columns]
-    interest_rates.columns = [name+"_IR" for name in interest_rates.columns]
-
-    # Merge all
+    # The forward tickers are forward points; merge_quotes turns them into
+    # outright forwards and applies the same quoting as the Excel data.
+    interest_rates_df.columns = list(cip_engine.CURRENCIES) + ["USD"]
+    return merge_quotes(exchange_rates_df, forward_rates_df, interest_rates_df)
+
+
+def merge_quotes(exchange_rates, forward_points, interest_rates, currencies=cip_engine.CURRENCIES):
+    """
+    Merge spot, forward-point and OIS quotes into one wide DataFrame.
+
+    Spot and forward points are converted to foreign-per-USD spot and 3M
+    outright forwards by `cip_engine.usd_quotes`.
+
+    Parameters
+    ----------
+    exchange_rates, forward_points : pandas.DataFrame
+        One column per currency, in the order of `currencies`.
+    interest_rates : pandas.DataFrame
+        OIS rates, with columns named by currency (USD included).
+
+    Returns
+    -------
+    pandas.DataFrame
+        {ccy}_CURNCY, {ccy}_CURNCY3M and {ccy}_IR columns on the common dates.
+    """
+    spot_cols = [f"{ccy}_CURNCY" for ccy in currencies]
+    fwd_cols = [cip_engine.forward_column(ccy) for ccy in currencies]
     df_merged = (
-        exchange_rates_df
-        .merge(forward_rates_df, left_index=True, right_index=True, how='inner')
-        .merge(interest_rates_df, left_index=True, right_index=True, how='inner')
+        exchange_rates.set_axis(spot_cols, axis=1)
+        .merge(forward_points.set_axis(fwd_cols, axis=1), left_index=True, right_index=True, how='inner')
+        .merge(interest_rates.add_suffix("_IR"), left_index=True, right_index=True, how='inner')
     )
-
+    spot, forward = cip_engine.usd_quotes(df_merged[spot_cols], df_merged[fwd_cols], currencies)
+    df_merged[spot_cols] = spot
+    df_merged[fwd_cols] = forward
     return df_merged
 
 
+def find_workbook():
+    """Path of CIP_2025.xlsx, downloaded to DATA_MANUAL if no local copy is found."""
+    for filepath in ["./data_manual/CIP_2025.xlsx", "../data_manual/CIP_2025.xlsx"]:
+        if os.path.exists(filepath):
+            return Path(filepath)
+    download()
+    return Path(DATA_MANUAL) / "CIP_2025.xlsx"
+
+
+@lru_cache(maxsize=4)
+def _merged_quotes(source, filepath):
+    """Merged quotes of the full sample of one source, built once per source."""
+    if source == "bloomberg":
+        return fetch_bloomberg_historical_data('2010-01-01', '2025-12-31')
+    data = read_excel_cached(filepath)
+    return merge_quotes(
+        data["Spot"].set_index("Date"),
+        data["Forward"].set_index("Date"),
+        data["OIS"].set_index("Date"),
+    )
+
+
+class CIPDataset:
+    """
+    CIP quotes up to an end date, with the spreads and statistics derived from them.
+
+    Get instances from `cip_dataset`, which builds each one once per
+    (source file SHA-256, end date). Spreads and statistics are computed on
+    first use and kept; every accessor returns a copy, so callers can modify
+    the result without touching the cache.
+    """
+
+    def __init__(self, df_merged, end):
+        self.end = end
+        self._merged = df_merged.loc[:end]
+        self._spreads = {}
+        self._stats = None
+
+    def raw(self):
+        """Merged spot, forward and OIS quotes (see `merge_quotes`)."""
+        return self._merged.copy()
+
+    def spreads(self, tenors=(cip_engine.BASE_TENOR,)):
+        """Cleaned log CIP bases (see `cip_spreads`)."""
+        tenors = tuple(tenors)
+        if tenors not in self._spreads:
+            self._spreads[tenors] = cip_spreads(self._merged, tenors=tenors)
+        return self._spreads[tenors].copy()
+
+    def pieces(self):
+        """(spot, forward, OIS) quote DataFrames."""
+        spot_cols = [f"{ccy}_CURNCY" for ccy in cip_engine.CURRENCIES]
+        fwd_cols = [cip_engine.forward_column(ccy) for ccy in cip_engine.CURRENCIES]
+        ir_cols = [c for c in self._merged.columns if c.endswith("_IR")]
+        return self._merged[spot_cols].copy(), self._merged[fwd_cols].copy(), self._merged[ir_cols].copy()
+
+    def stats(self):
+        """`cip_analysis.compute_cip_statistics` of the 3M spreads."""
+        if self._stats is None:
+            from cip_analysis import compute_cip_statistics
+            self._stats = compute_cip_statistics(self.spreads())
+        return {name: df.copy() for name, df in self._stats.items()}
+
+
+@lru_cache(maxsize=32)
+def _dataset(source, end, filepath):
+    return CIPDataset(_merged_quotes(source, filepath), end)
+
+
+def cip_dataset(end='2025-03-01'):
+    """
+    The shared CIPDataset of the current CIP data up to `end`.
+
+    The workbook is identified by its SHA-256 (kept by `excel_cache` and only
+    recomputed when the file's size or mtime changes), so repeated calls cost a
+    stat and a dictionary lookup, and an edited workbook is picked up.
+    """
+    if BLOOMBERG:
+        return _dataset("bloomberg", end, None)
+    filepath = find_workbook()
+    return _dataset(workbook_sha256(filepath), end, str(filepath))
+
+
 def plot_cip(end ='2025-03-01'):
     """
-    Reads data from Excel if excel=True, otherwise fetch from Bloomberg using xbbg.
+    Plots the cleaned CIP spreads up to `end` to spread_plot_rep.pdf/.png.
 
-    After retrieving data, calculates a CIP measure and cleans outliers.
-    Finally, plots the CIP spreads for a 2010-2019 subset and the full range.
+    The data come from the shared `cip_dataset`: the local Excel workbook, or
+    Bloomberg through xbbg if BLOOMBERG is set.
 
     Parameters
     ----------
-    start : str, optional
-        Start date in 'YYYY-MM-DD' format, used if excel=False
     end : str, optional
-        End date in 'YYYY-MM-DD' format, used if excel=False
-    excel : bool, optional
-        If True, read from a local Excel file. If False, use Bloomberg xbbg.
-
-    Returns
-    -------
-    df_merged : pandas.DataFrame
-        Final cleaned DataFrame with CIP spreads and underlying data.
+        Last date plotted, in 'YYYY-MM-DD' format.
     """
-    start = '2010-01-01'
-    if BLOOMBERG == False:
-        possible_paths = [
-            "./data_manual/CIP_2025.xlsx",
-            "../data_manual/CIP_2025.xlsx",
-        ]
-
-        data = None
-        for filepath in possible_paths:
-            if os.path.exists(filepath):
-                try:
-                    data = pd.read_excel(filepath, sheet_name=None)
-                    break
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-            else:
-                pass
-        if data is None:
-            raise FileNotFoundError("Could not find or load the CIP_2025.xlsx file in any of the expected locations")
-
-        df_spot = data["Spot"]
-        exchange_rates = df_spot.set_index("Date")
-
-        df_forward = data["Forward"]
-        forward_rates = df_forward.set_index("Date")
-
-        df_ir = data["OIS"]
-        interest_rates = df_ir.set_index("Date")
-        # Standard columns
-        cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-        exchange_rates.columns = cols
-        forward_rates.columns = cols
-
-        # Convert forward points to forward rates
-        # Non-JPY: forward points are per 10,000; JPY: per 100
-        forward_rates[[c for c in cols if c != 'JPY']] /= 10000
-        forward_rates['JPY'] /= 100
-        forward_rates = exchange_rates + forward_rates
-
-        # Rename to keep track
-        exchange_rates.columns = [f"{name}_CURNCY" for name in exchange_rates.columns]
-        forward_rates.columns = [f"{name}_CURNCY3M" for name in forward_rates.columns]
-        interest_rates.columns = [f"{name}_IR" for name in interest_rates.columns]
-
-        # Merge
-        df_merged = (
-            exchange_rates
-            .merge(forward_rates, left_index=True, right_index=True, how='inner')
-            .merge(interest_rates, left_index=True, right_index=True, how='inner')
-        )
-
-        # Convert to reciprocal for these currencies
-        reciprocal_currencies = ['EUR', 'GBP', 'AUD', 'NZD']
-        for ccy in reciprocal_currencies:
-            df_merged[f"{ccy}_CURNCY"] = 1.0 / df_merged[f"{ccy}_CURNCY"]
-            df_merged[f"{ccy}_CURNCY3M"] = 1.0 / df_merged[f"{ccy}_CURNCY3M"]
-
-    else:
-        # 2) Pull from Bloomberg
-        df_merged = fetch_bloomberg_historical_data(start, end)
-
-    # List of all the core currencies
-    currencies = ['AUD', 'CAD', 'CHF', 'EUR', 'GBP', 'JPY', 'NZD', 'SEK']
-
-    ######################################
-    # Compute the log CIP basis in basis points
-    ######################################
-    for ccy in currencies:
-        fwd_col    = f'{ccy}_CURNCY3M'
-        spot_col   = f'{ccy}_CURNCY'
-        ir_col     = f'{ccy}_IR'
-        usd_ir_col = 'USD_IR'  # The US interest rate column
-
-        # CIP in log terms (bps) = 100*100 x [ domestic_i - (logF - logS)*(360/90) - foreign_i ]
-        cip_col = f'CIP_{ccy}_ln'
-        df_merged[cip_col] = 100*100 * (
-            (df_merged[ir_col] / 100.0)               # domestic interest rate
-            - (360.0 / 90.0) * (
-                np.log(df_merged[fwd_col]) - np.log(df_merged[spot_col])
-            )
-            - (df_merged[usd_ir_col] / 100.0)         # foreign interest rate (USD)
-        )
-
-    ######################################
-    # Rolling outlier cleanup (45-day window)
-    ######################################
-    window_size = 45
-    for ccy in currencies:
-        cip_col = f'CIP_{ccy}_ln'
-        if cip_col not in df_merged.columns:
-            continue
-
-        # Rolling median over 45 days
-        rolling_median = df_merged[cip_col].rolling(window_size).median()
-
-        # Absolute deviation from median
-        abs_dev = (df_merged[cip_col] - rolling_median).abs()
-
-        # Rolling mean of abs_dev (proxy for MAD)
-        rolling_mad = abs_dev.rolling(window_size).mean()
-
-        # Mark outliers (abs_dev / mad >= 10) and replace with NaN
-        outlier_mask = (abs_dev / rolling_mad) >= 10
-        df_merged.loc[outlier_mask, cip_col] = np.nan
-
-    # Create a separate DataFrame for the CIP columns
-    cip_cols = [f'CIP_{c}_ln' for c in currencies if f'CIP_{c}_ln' in df_merged.columns]
-    spreads = df_merged[cip_cols].copy()
+    # Log CIP basis in basis points, with outliers replaced by NaN
+    spreads = cip_dataset(end).spreads()
 
     # Shorten column names for plotting
     spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
@@ -386,241 +363,67 @@ def plot_cip(end ='2025-03-01'):
         plt.savefig(f"spread_plot_{yr}.png", dpi=300, bbox_inches='tight')
 
     # Plot from start to 2019, and the full range
-    if isinstance(df_merged.index, pd.DatetimeIndex):
-        plot_spreads(spreads.loc[:end], 'rep')
+    if isinstance(spreads.index, pd.DatetimeIndex):
+        plot_spreads(spreads, 'rep')
 
 
 
 
 def load_raw(end ='2025-03-01', plot = False):
     """
-    Reads data from Excel if excel=True, otherwise fetch from Bloomberg using xbbg.
+    Merged spot, 3M forward and OIS quotes up to `end`.
 
-    After retrieving data, calculates a CIP measure and cleans outliers.
-    Finally, plots the CIP spreads for a 2010-2019 subset and the full range.
+    Reads the local Excel workbook (downloaded if missing), or Bloomberg through
+    xbbg if BLOOMBERG is set, once per workbook content; see `cip_dataset`.
 
     Parameters
     ----------
-    start : str, optional
-        Start date in 'YYYY-MM-DD' format, used if excel=False
     end : str, optional
-        End date in 'YYYY-MM-DD' format, used if excel=False
-    excel : bool, optional
-        If True, read from a local Excel file. If False, use Bloomberg xbbg.
+        End date in 'YYYY-MM-DD' format.
 
     Returns
     -------
     df_merged : pandas.DataFrame
-        Final cleaned DataFrame with CIP spreads and underlying data.
+        {ccy}_CURNCY, {ccy}_CURNCY3M and {ccy}_IR columns, foreign currency per USD.
     """
 
-    start = '2010-01-01'
-    if BLOOMBERG == False:
-        possible_paths = [
-            "./data_manual/CIP_2025.xlsx",
-            "../data_manual/CIP_2025.xlsx",
-        ]
-
-        data = None
-        for filepath in possible_paths:
-            if os.path.exists(filepath):
-                try:
-                    data = pd.read_excel(filepath, sheet_name=None)
-                    break
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-            else:
-                pass
-        if data is None:
-            download()
-        data = pd.read_excel(filepath, sheet_name=None, parse_dates=['Date'])
-
-        df_spot = data["Spot"]
-        exchange_rates = df_spot.set_index("Date")
-
-        df_forward = data["Forward"]
-        forward_rates = df_forward.set_index("Date")
-
-        df_ir = data["OIS"]
-        interest_rates = df_ir.set_index("Date")
-
-        # Standard columns
-        cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-        exchange_rates.columns = cols
-        forward_rates.columns = cols
-
-        # Convert forward points to forward rates
-        # Non-JPY: forward points are per 10,000; JPY: per 100
-        forward_rates[[c for c in cols if c != 'JPY']] /= 10000
-        forward_rates['JPY'] /= 100
-        forward_rates = exchange_rates + forward_rates
-
-        # Rename to keep track
-        exchange_rates.columns = [f"{name}_CURNCY" for name in exchange_rates.columns]
-        forward_rates.columns = [f"{name}_CURNCY3M" for name in forward_rates.columns]
-        interest_rates.columns = [f"{name}_IR" for name in interest_rates.columns]
-
-        # Merge
-        df_merged = (
-            exchange_rates
-            .merge(forward_rates, left_index=True, right_index=True, how='inner')
-            .merge(interest_rates, left_index=True, right_index=True, how='inner')
-        )
-
-        # Convert to reciprocal for these currencies
-        reciprocal_currencies = ['EUR', 'GBP', 'AUD', 'NZD']
-        for ccy in reciprocal_currencies:
-            df_merged[f"{ccy}_CURNCY"] = 1.0 / df_merged[f"{ccy}_CURNCY"]
-            df_merged[f"{ccy}_CURNCY3M"] = 1.0 / df_merged[f"{ccy}_CURNCY3M"]
-
-
-    else:
-        # 2) Pull from Bloomberg
-        df_merged = fetch_bloomberg_historical_data(start, end)
-
-
-    return df_merged.loc[:end]
-
-def compute_cip(end = '2020-01-01'):
-    df_merged = load_raw(end = end)
-
-    # List of all the core currencies
-    currencies = ['AUD', 'CAD', 'CHF', 'EUR', 'GBP', 'JPY', 'NZD', 'SEK']
-
-    ######################################
-    # Compute the log CIP basis in basis points
-    ######################################
-    for ccy in currencies:
-        fwd_col = f'{ccy}_CURNCY3M'
-        spot_col = f'{ccy}_CURNCY'
-        ir_col = f'{ccy}_IR'
-        usd_ir_col = 'USD_IR'  # The US interest rate column
-
-        # CIP in log terms (bps) = 100*100 x [ domestic_i - (logF - logS)*(360/90) - foreign_i ]
-        cip_col = f'CIP_{ccy}_ln'
-        df_merged[cip_col] = 100 * 100 * (
-                (df_merged[ir_col] / 100.0)  # domestic interest rate
-                - (360.0 / 90.0) * (
-                        np.log(df_merged[fwd_col]) - np.log(df_merged[spot_col])
-                )
-                - (df_merged[usd_ir_col] / 100.0)  # foreign interest rate (USD)
-        )
-
-    ######################################
-    # Rolling outlier cleanup (45-day window)
-    ######################################
-    window_size = 45
-    for ccy in currencies:
-        cip_col = f'CIP_{ccy}_ln'
-        if cip_col not in df_merged.columns:
-            continue
-
-        # Rolling median over 45 days
-        rolling_median = df_merged[cip_col].rolling(window_size).median()
-
-        # Absolute deviation from median
-        abs_dev = (df_merged[cip_col] - rolling_median).abs()
-
-        # Rolling mean of abs_dev (proxy for MAD)
-        rolling_mad = abs_dev.rolling(window_size).mean()
-
-        # Mark outliers (abs_dev / mad >= 10) and replace with NaN
-        outlier_mask = (abs_dev / rolling_mad) >= 10
-        df_merged.loc[outlier_mask, cip_col] = np.nan
-
-    # Create a separate DataFrame for the CIP columns
-    cip_cols = [f'CIP_{c}_ln' for c in currencies if f'CIP_{c}_ln' in df_merged.columns]
-    spreads = df_merged[cip_cols].copy()
+    return cip_dataset(end).raw()
 
-    # Shorten column names for plotting
-    spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+def cip_spreads(df_merged, currencies=cip_engine.CURRENCIES, tenors=(cip_engine.BASE_TENOR,),
+                window=45, threshold=10):
+    """
+    Log CIP basis (bps) of every currency and tenor, with outliers removed.
+
+    The bases come from `cip_engine.cip_basis`. Values whose absolute deviation
+    from the trailing `window`-day rolling median is at least `threshold` times
+    the rolling mean absolute deviation are replaced with NaN.
+
+    Returns
+    -------
+    pandas.DataFrame
+        CIP_{ccy}_ln (3M) and CIP_{ccy}_{tenor}_ln columns, indexed like `df_merged`.
+    """
+    spreads = cip_engine.cip_basis(df_merged, currencies, tenors)
+    outlier_mask = rolling_outlier_mask(spreads, window=window, mode="trailing", threshold=threshold)
+    return spreads.mask(outlier_mask)
 
-    return df_merged.iloc[:, -8:]
+
+def compute_cip(end = '2020-01-01', tenors=(cip_engine.BASE_TENOR,)):
+    """Cleaned log CIP bases up to `end`, one CIP_{ccy}_ln column per currency (3M)."""
+    return cip_dataset(end).spreads(tenors)
 
 
 def load_raw_pieces(end ='2025-03-01',excel=False, plot = False):
     """
-    Reads data from Excel if excel=True, otherwise fetch from Bloomberg using xbbg.
-
-    After retrieving data, calculates a CIP measure and cleans outliers.
-    Finally, plots the CIP spreads for a 2010-2019 subset and the full range.
+    The quotes of `load_raw` split into spot, forward and OIS DataFrames.
 
     Parameters
     ----------
-    start : str, optional
-        Start date in 'YYYY-MM-DD' format, used if excel=False
     end : str, optional
-        End date in 'YYYY-MM-DD' format, used if excel=False
-    excel : bool, optional
-        If True, read from a local Excel file. If False, use Bloomberg xbbg.
+        End date in 'YYYY-MM-DD' format.
 
     Returns
     -------
-    df_merged : pandas.DataFrame
-        Final cleaned DataFrame with CIP spreads and underlying data.
+    (exchange_rates_df, forward_rates_df, interest_rates_df) : tuple of pandas.DataFrame
     """
-    start = '2010-01-01'
-    if BLOOMBERG == False:
-        possible_paths = [
-            "./data_manual/CIP_2025.xlsx",
-            "../data_manual/CIP_2025.xlsx",
-        ]
-
-        data = None
-        for filepath in possible_paths:
-            if os.path.exists(filepath):
-                try:
-                    data = pd.read_excel(filepath, sheet_name=None)
-                    break
-                except Exception as e:
-                    print(f"Error loading {filepath}: {e}")
-            else:
-                pass
-        df_spot = data["Spot"]
-        exchange_rates = df_spot.set_index("Date")
-
-        df_forward = data["Forward"]
-        forward_rates = df_forward.set_index("Date")
-
-        df_ir = data["OIS"]
-        interest_rates = df_ir.set_index("Date")
-
-        # Standard columns
-        cols = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-        exchange_rates.columns = cols
-        forward_rates.columns = cols
-
-        # Convert forward points to forward rates
-        # Non-JPY: forward points are per 10,000; JPY: per 100
-        forward_rates[[c for c in cols if c != 'JPY']] /= 10000
-        forward_rates['JPY'] /= 100
-        forward_rates = exchange_rates + forward_rates
-
-        # Rename to keep track
-        exchange_rates.columns = [f"{name}_CURNCY" for name in exchange_rates.columns]
-        forward_rates.columns = [f"{name}_CURNCY3M" for name in forward_rates.columns]
-        interest_rates.columns = [f"{name}_IR" for name in interest_rates.columns]
-
-        # Merge
-        df_merged = (
-            exchange_rates
-            .merge(forward_rates, left_index=True, right_index=True, how='inner')
-            .merge(interest_rates, left_index=True, right_index=True, how='inner')
-        )
-
-        # Convert to reciprocal for these currencies
-        reciprocal_currencies = ['EUR', 'GBP', 'AUD', 'NZD']
-        for ccy in reciprocal_currencies:
-            df_merged[f"{ccy}_CURNCY"] = 1.0 / df_merged[f"{ccy}_CURNCY"]
-            df_merged[f"{ccy}_CURNCY3M"] = 1.0 / df_merged[f"{ccy}_CURNCY3M"]
-
-    else:
-        # 2) Pull from Bloomberg
-        df_merged = fetch_bloomberg_historical_data(start, end)
-
-
-    exchange_rates_df = df_merged.iloc[:,:8]
-    forward_rates_df = df_merged.iloc[:, 8:16]
-    interest_rates_df = df_merged.iloc[:, -9:]
-
-    return exchange_rates_df, forward_rates_df, interest_rates_df
+    return cip_dataset(end).pieces()
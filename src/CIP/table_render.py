@@ -0,0 +1,155 @@
+"""
+Renders DataFrames as table images with matplotlib, in-process.
+
+The CIP statistics tables used to be written to HTML and screenshotted with a
+headless Chrome (Selenium) or wkhtmltoimage, one browser process per table.
+`render_table` draws a DataFrame as text columns between booktabs-style rules
+on an Agg figure and saves it as PNG and/or PDF: no browser, no network, no
+GUI backend.
+`render_cip_statistics` renders the three tables of
+`cip_analysis.compute_cip_statistics` in one call.
+
+Usage:
+    from table_render import render_cip_statistics
+    paths = render_cip_statistics(stats_dict, OUTPUT_DIR / "main_cip_files")
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+# stats_dict key -> (file stem, title)
+CIP_STATISTICS_TABLES = {
+    "overall_statistics": ("cip_summary_overall", "Overall CIP statistics (bps)"),
+    "correlation_matrix": ("cip_correlation_matrix", "Correlation of CIP deviations"),
+    "annual_statistics": ("cip_annual_statistics", "Annual CIP statistics (bps)"),
+}
+
+
+def _label(value):
+    if isinstance(value, tuple):
+        return "\n".join(_label(v) for v in value)
+    if isinstance(value, pd.Timestamp):
+        # Year-end resampling labels read better as the year alone
+        return str(value.year) if value.is_year_end else str(value.date())
+    return str(value)
+
+
+def format_table(df, float_format="{:,.2f}"):
+    """
+    Cell text, row labels and column labels of a DataFrame.
+
+    Floats are formatted with `float_format` and NaN is left blank; MultiIndex
+    labels are stacked on separate lines.
+    """
+    values = df.to_numpy(dtype=object)
+    cells = [
+        ["" if pd.isna(v) else float_format.format(v) if isinstance(v, (float, np.floating)) else str(v)
+         for v in row]
+        for row in values
+    ]
+    return cells, [_label(i) for i in df.index], [_label(c) for c in df.columns]
+
+
+def render_table(df, path, title=None, float_format="{:,.2f}", formats=("png",), dpi=200, fontsize=8):
+    """
+    Draw a DataFrame as a table and save it.
+
+    Each column is one multi-line text (header and body), so the cost does not
+    grow with the number of cells the way matplotlib's Table artist does. The
+    column widths and rules are placed from the measured text extents.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+    path : str or Path
+        Output file; its suffix is replaced by each of `formats`.
+    title : str, optional
+    float_format : str
+        Format string of float cells.
+    formats : sequence of str
+        File formats understood by matplotlib, e.g. ("png", "pdf").
+
+    Returns
+    -------
+    list of Path
+        The files written.
+    """
+    cells, row_labels, col_labels = format_table(df, float_format)
+    header_lines = max((label.count("\n") + 1 for label in col_labels), default=1)
+    columns = [(str(df.index.name or ""), row_labels, "left")]
+    columns += [(label, [row[j] for row in cells], "right") for j, label in enumerate(col_labels)]
+
+    fig = Figure(dpi=dpi)
+    renderer = FigureCanvasAgg(fig).get_renderer()
+    inches = fig.dpi_scale_trans
+    texts = []
+    for header, body, align in columns:
+        # Pad the header to the same number of lines so all headers share a baseline
+        header = "\n" * (header_lines - header.count("\n") - 1) + header
+        head = fig.text(0, 0, header, transform=inches, fontsize=fontsize, fontweight="bold",
+                        ha=align, va="bottom", multialignment=align)
+        text = fig.text(0, 0, "\n".join(body), transform=inches, fontsize=fontsize,
+                        ha=align, va="top", multialignment=align)
+        texts.append((head, text, align))
+
+    def size(artist):
+        extent = artist.get_window_extent(renderer)
+        return extent.width / dpi, extent.height / dpi
+
+    pad, gap, rule = 0.1, 0.12 * fontsize / 8, 0.04
+    widths = [max(size(head)[0], size(text)[0]) for head, text, _ in texts]
+    head_h = max(size(head)[1] for head, _, _ in texts)
+    body_h = max(size(text)[1] for _, text, _ in texts) if len(df) else 0.0
+
+    body_top = pad + rule + body_h
+    head_bottom = body_top + 2 * rule
+    head_top = head_bottom + head_h
+    x = pad
+    for (head, text, align), width in zip(texts, widths):
+        x_text = x if align == "left" else x + width
+        head.set_position((x_text, head_bottom))
+        text.set_position((x_text, body_top))
+        x += width + gap
+    total_w = x - gap + pad
+
+    for y in (pad, body_top + rule, head_top + rule):
+        fig.add_artist(Line2D([pad, total_w - pad], [y, y], transform=inches, color="black",
+                              linewidth=0.8 if y == body_top + rule else 1.2))
+    total_h = head_top + rule + pad
+    if title:
+        fig.text(total_w / 2, total_h, title, transform=inches, fontsize=fontsize + 2, ha="center", va="bottom")
+        total_h += 2 * rule + fontsize * 1.6 / 72
+    fig.set_size_inches(total_w, total_h)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt in formats:
+        out = path.with_suffix(f".{fmt}")
+        fig.savefig(out, dpi=dpi, facecolor="white")
+        written.append(out)
+    return written
+
+
+def render_cip_statistics(stats_dict, output_dir, formats=("png", "pdf"), **kwargs):
+    """
+    Render the tables of `compute_cip_statistics` to output_dir.
+
+    Returns
+    -------
+    dict
+        stats_dict key -> list of files written.
+    """
+    output_dir = Path(output_dir)
+    written = {}
+    for key, (stem, title) in CIP_STATISTICS_TABLES.items():
+        if key not in stats_dict:
+            continue
+        float_format = "{:,.3f}" if key == "correlation_matrix" else "{:,.2f}"
+        written[key] = render_table(stats_dict[key], output_dir / stem, title=title,
+                                    float_format=float_format, formats=formats, **kwargs)
+    return written
@@ -66,3 +66,21 @@ def test_pull_bloomberg_cip_data_compute_cip():
     assert not pd.isna(max_value), f"Max value in column {max_column} is NaN."
 
 
+def test_cip_dataset_is_shared():
+    dataset = pull_bloomberg_cip_data.cip_dataset('2020-01-01')
+    assert pull_bloomberg_cip_data.cip_dataset('2020-01-01') is dataset
+    assert pull_bloomberg_cip_data.cip_dataset('2025-01-01') is not dataset
+
+    # Accessors hand out copies
+    df = pull_bloomberg_cip_data.load_raw(end='2020-01-01')
+    df.iloc[:, :] = 0.0
+    assert (pull_bloomberg_cip_data.load_raw(end='2020-01-01') != 0.0).any().any()
+
+    spot, forward, ois = pull_bloomberg_cip_data.load_raw_pieces(end='2020-01-01')
+    pd.testing.assert_frame_equal(pd.concat([spot, forward, ois], axis=1), dataset.raw())
+
+    import cip_analysis
+    stats = dataset.stats()
+    expected = cip_analysis.compute_cip_statistics(pull_bloomberg_cip_data.compute_cip(end='2020-01-01'))
+    for name in expected:
+        pd.testing.assert_frame_equal(stats[name], expected[name])
@@ -0,0 +1,76 @@
+"""
+Unit tests for the vectorized CIP basis (cip_engine.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cip_engine
+import pull_bloomberg_cip_data
+
+
+def test_cip_basis_matches_per_currency_formula():
+    df = pull_bloomberg_cip_data.load_raw(end='2020-01-01')
+    spreads = cip_engine.cip_basis(df)
+
+    assert list(spreads.columns) == [f'CIP_{ccy}_ln' for ccy in cip_engine.CURRENCIES]
+    for ccy in cip_engine.CURRENCIES:
+        expected = 100 * 100 * (
+            (df[f'{ccy}_IR'] / 100.0)
+            - (360.0 / 90.0) * (np.log(df[f'{ccy}_CURNCY3M']) - np.log(df[f'{ccy}_CURNCY']))
+            - (df['USD_IR'] / 100.0)
+        )
+        pd.testing.assert_series_equal(spreads[f'CIP_{ccy}_ln'], expected, check_names=False)
+
+
+def test_all_tenors_and_currencies():
+    rng = np.random.default_rng(0)
+    currencies = ['AUD', 'EUR', 'JPY', 'MXN', 'NOK']
+    tenors = list(cip_engine.TENOR_DAYS)
+    index = pd.bdate_range('2015-01-01', periods=50)
+
+    columns = {}
+    for ccy in currencies + ['USD']:
+        for tenor in tenors:
+            columns[cip_engine.ois_column(ccy, tenor)] = rng.normal(1.0, 0.5, len(index))
+        if ccy == 'USD':
+            continue
+        spot = rng.uniform(0.5, 2.0, len(index))
+        columns[f'{ccy}_CURNCY'] = spot
+        for tenor in tenors:
+            columns[cip_engine.forward_column(ccy, tenor)] = spot * rng.uniform(0.98, 1.02, len(index))
+    df = pd.DataFrame(columns, index=index)
+
+    spreads = cip_engine.cip_basis(df, currencies, tenors)
+    assert spreads.shape == (len(index), len(currencies) * len(tenors))
+    assert 'CIP_EUR_ln' in spreads and 'CIP_NOK_1W_ln' in spreads and 'CIP_MXN_1Y_ln' in spreads
+    for ccy in currencies:
+        for tenor in tenors:
+            expected = 1e4 * (
+                df[cip_engine.ois_column(ccy, tenor)] / 100
+                - 360 / cip_engine.TENOR_DAYS[tenor]
+                * np.log(df[cip_engine.forward_column(ccy, tenor)] / df[f'{ccy}_CURNCY'])
+                - df[cip_engine.ois_column('USD', tenor)] / 100
+            )
+            np.testing.assert_allclose(spreads[cip_engine.basis_column(ccy, tenor)], expected, rtol=1e-9)
+
+
+def test_usd_quotes():
+    currencies = ['EUR', 'JPY', 'CAD']
+    spot = np.array([[1.25, 110.0, 1.30]])
+    points = np.array([[50.0, -20.0, 15.0]])
+
+    usd_spot, forward = cip_engine.usd_quotes(spot, points, currencies)
+    np.testing.assert_allclose(usd_spot, [[1 / 1.25, 110.0, 1.30]])
+    np.testing.assert_allclose(forward, [[1 / 1.255, 109.8, 1.3015]])
+
+    # Forward points for several tenors share the spot
+    _, forwards = cip_engine.usd_quotes(spot, np.stack([points, 2 * points], axis=2), currencies)
+    assert forwards.shape == (1, 3, 2)
+    np.testing.assert_allclose(forwards[:, :, 0], forward)
+
+
+def test_unknown_tenor():
+    with pytest.raises(ValueError, match='5Y'):
+        cip_engine.tenor_days(['3M', '5Y'])
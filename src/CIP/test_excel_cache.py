@@ -0,0 +1,84 @@
+"""
+Unit tests for the Arrow cache of the CIP workbook
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+try:
+    import excel_cache
+except ModuleNotFoundError:
+    import src.excel_cache as excel_cache
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    dates = pd.date_range("2010-01-04", periods=50, freq="B")
+    rng = np.random.default_rng(0)
+    path = tmp_path / "CIP_test.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for sheet in ["OIS", "Spot", "Forward"]:
+            df = pd.DataFrame(rng.normal(size=(50, 3)), columns=["AUD", "CAD", "CHF"])
+            df.insert(0, "Date", dates)
+            df.iloc[3, 2] = np.nan
+            df.to_excel(writer, sheet_name=sheet, index=False)
+    return path
+
+
+def _forbid_excel(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook should have been served from the cache")
+    monkeypatch.setattr(excel_cache.pd, "read_excel", fail)
+
+
+def test_cached_sheets_match_read_excel(workbook, tmp_path):
+    expected = pd.read_excel(workbook, sheet_name=None)
+    for _ in range(2):
+        sheets = excel_cache.read_excel_cached(workbook, cache_dir=tmp_path / "cache")
+        assert list(sheets) == list(expected)
+        for name in expected:
+            pd.testing.assert_frame_equal(sheets[name], expected[name])
+
+
+def test_touched_workbook_is_not_reparsed(workbook, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    excel_cache.read_excel_cached(workbook, cache_dir=cache_dir)
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    _forbid_excel(monkeypatch)
+    sheets = excel_cache.read_excel_cached(workbook, cache_dir=cache_dir)
+    assert set(sheets) == {"OIS", "Spot", "Forward"}
+
+
+def test_changed_workbook_invalidates_cache(workbook, tmp_path):
+    cache_dir = tmp_path / "cache"
+    excel_cache.read_excel_cached(workbook, cache_dir=cache_dir)
+
+    df = pd.DataFrame({"Date": pd.to_datetime(["2020-01-02"]), "AUD": [1.5]})
+    df.to_excel(workbook, sheet_name="Spot", index=False)
+    sheets = excel_cache.read_excel_cached(workbook, cache_dir=cache_dir)
+    assert list(sheets) == ["Spot"]
+    pd.testing.assert_frame_equal(sheets["Spot"], df)
+
+
+def test_workbook_sha256_is_remembered(workbook, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    sha256 = excel_cache.workbook_sha256(workbook, cache_dir)
+    assert sha256 == excel_cache.file_sha256(workbook)
+
+    monkeypatch.setattr(excel_cache, "file_sha256", lambda *args: pytest.fail("workbook was re-hashed"))
+    assert excel_cache.workbook_sha256(workbook, cache_dir) == sha256
+
+
+def test_cache_write_failure_warns(workbook, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("unsupported column type")
+    monkeypatch.setattr(excel_cache, "_write_entry", fail)
+
+    with pytest.warns(UserWarning, match="Could not cache CIP_test.xlsx"):
+        sheets = excel_cache.read_excel_cached(workbook, cache_dir=tmp_path / "cache")
+    assert set(sheets) == {"OIS", "Spot", "Forward"}
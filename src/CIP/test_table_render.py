@@ -0,0 +1,44 @@
+"""
+Unit tests for the in-process table renderer (table_render.py)
+"""
+
+import numpy as np
+import pandas as pd
+from matplotlib.image import imread
+
+import misc_tools
+import pull_bloomberg_cip_data
+from table_render import format_table, render_cip_statistics, render_table
+
+
+def test_format_table():
+    columns = pd.MultiIndex.from_product([["CIP_AUD_ln"], ["mean", "std"]])
+    df = pd.DataFrame([[1.234, np.nan], [-1000.0, 2.0]], columns=columns,
+                      index=pd.to_datetime(["2010-12-31", "2011-12-31"]))
+    cells, row_labels, col_labels = format_table(df)
+    assert cells == [["1.23", ""], ["-1,000.00", "2.00"]]
+    assert row_labels == ["2010", "2011"]
+    assert col_labels == ["CIP_AUD_ln\nmean", "CIP_AUD_ln\nstd"]
+
+
+def test_render_cip_statistics(tmp_path):
+    stats = pull_bloomberg_cip_data.cip_dataset('2020-01-01').stats()
+    written = render_cip_statistics(stats, tmp_path)
+
+    assert set(written) == set(stats)
+    for paths in written.values():
+        assert [p.suffix for p in paths] == [".png", ".pdf"]
+        assert all(p.stat().st_size > 0 for p in paths)
+    # Wide annual table: 32 currency/statistic columns
+    height, width, _ = imread(written["annual_statistics"][0]).shape
+    assert width > 5 * height
+
+
+def test_html_to_png(tmp_path):
+    df = pd.DataFrame({"a": [1.0, 2.5], "b": [np.nan, -3.0]}, index=["x", "y"])
+    df.to_html(tmp_path / "table.html")
+    png_files = misc_tools.html_to_png(tmp_path)
+    assert [p.endswith("table.png") for p in png_files] == [True]
+
+    empty = render_table(df.iloc[:0], tmp_path / "empty")
+    assert empty[0].exists()
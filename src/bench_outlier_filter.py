@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+bench_outlier_filter.py
+
+Benchmark the numba and NumPy engines of `outlier_filter` against the pandas
+reference on synthetic (day x series) blocks:
+
+    - trailing:  CIP filter, rolling(45), one pandas call per column.
+    - centered:  equity-spot filter, rolling(91, center=True), lag 1.
+    - loo:       Treasury leave-one-out filter, ±45 calendar days
+                 (no pandas timing; see treasury_spot/bench_rolling_outlier_flag.py).
+
+The flags of every engine are checked against the pandas reference (or the
+NumPy engine for loo). The numba timings exclude the one-off JIT compile.
+
+Usage:
+    python bench_outlier_filter.py
+    python bench_outlier_filter.py --rows 2500 25000 --series 8 --engines numpy numba
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from outlier_filter import (leave_one_out_outlier_flags, numba, rolling_outlier_mask,
+                            rolling_outlier_mask_pandas)
+
+FILTERS = {
+    "trailing": dict(window=45, mode="trailing", min_periods=None, lag=0),
+    "centered": dict(window=91, mode="centered", min_periods=1, lag=1),
+}
+
+
+def make_block(n_rows, n_series, seed=0):
+    """Random walks with occasional spikes and NaNs, indexed by calendar day."""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0, 1, (n_rows, n_series)).cumsum(axis=0) * 0.2 + rng.normal(0, 1, (n_rows, n_series))
+    spikes = rng.choice(x.size, max(1, x.size // 500), replace=False)
+    x.flat[spikes] += rng.choice([-1, 1], len(spikes)) * 60
+    x[rng.random(x.shape) < 0.01] = np.nan
+    return pd.DataFrame(x, index=pd.date_range("1700-01-01", periods=n_rows, freq="D"))
+
+
+def _time(func, *args, **kwargs):
+    start = time.perf_counter()
+    out = func(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def _pandas_mask(df, window, mode, min_periods, lag):
+    return np.column_stack([
+        rolling_outlier_mask_pandas(df[c], window, mode, 10, min_periods, lag) for c in df.columns
+    ])
+
+
+def run_benchmark(rows, n_series, engines):
+    """Time every (filter, engine) pair for each block size and return a results table."""
+    if "numba" in engines:
+        # Compile once outside the timings.
+        rolling_outlier_mask(make_block(100, 2), window=10, engine="numba")
+
+    results = []
+    for n in rows:
+        df = make_block(n, n_series)
+        for name, kw in FILTERS.items():
+            expected, t_ref = _time(_pandas_mask, df, **kw)
+            row = {"filter": name, "rows": n, "series": n_series, "pandas_s": round(t_ref, 3)}
+            for engine in engines:
+                mask, t = _time(rolling_outlier_mask, df, threshold=10, engine=engine, **kw)
+                row[f"{engine}_s"] = round(t, 3)
+                row[f"{engine}_ok"] = bool(np.array_equal(mask.to_numpy(), expected))
+            results.append(row)
+            print(row)
+
+        row = {"filter": "loo", "rows": n, "series": n_series, "pandas_s": np.nan}
+        reference = None
+        for engine in engines:
+            flags, t = _time(leave_one_out_outlier_flags, df.index, df.to_numpy(), 45, 10, engine=engine)
+            reference = flags if reference is None else reference
+            row[f"{engine}_s"] = round(t, 3)
+            row[f"{engine}_ok"] = bool(np.array_equal(flags, reference))
+        results.append(row)
+        print(row)
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[2_500, 25_000, 100_000])
+    parser.add_argument("--series", type=int, default=8)
+    parser.add_argument("--engines", nargs="+", default=["numpy", "numba"] if numba is not None else ["numpy"],
+                        choices=["numpy", "numba"])
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.series, args.engines)
+    print()
+    print(results.to_string(index=False))
+    if results.filter(like="_ok").eq(False).any(axis=None):
+        raise SystemExit("Flag mismatch between an engine and the reference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+contract_calendar.py
+
+Settlement dates of futures contracts from their Bloomberg contract specs.
+
+Futures data carry the contract as a month/year string ("DEC 10", e.g. the
+CURRENT_CONTRACT_MONTH_YR field), and the equity and Treasury pipelines
+parsed it and built the settlement date row by row. A column of specs holds
+only a few dozen distinct contracts, so `settlement_dates` resolves each
+distinct spec once and maps the dates back to the rows through the codes of
+a pandas Categorical. Parsing and the calendar rules are memoized.
+
+Conventions:
+    "third_friday"        equity index futures (ES, NQ, DM): the third Friday
+                          of the contract month.
+    "last_business_day"   Treasury futures: the last business day of the
+                          contract month. With `trading_days`, the last of
+                          those dates in the month (months without one give
+                          NaT); otherwise the last weekday.
+
+Usage:
+    from contract_calendar import settlement_dates
+    df["SettlementDate"] = settlement_dates(df["ContractSpec"], strict=True)
+    df["Mat_Date"] = settlement_dates(df["Contract"], "last_business_day", trading_days=dates)
+"""
+
+import calendar
+import logging
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MONTHS = {abbr.upper(): i for i, abbr in enumerate(calendar.month_abbr) if abbr}
+QUARTERLY_MONTHS = (3, 6, 9, 12)  # MAR, JUN, SEP, DEC
+CONVENTIONS = ("third_friday", "last_business_day")
+
+
+@lru_cache(maxsize=None)
+def parse_contract_month_year(contract_str):
+    """
+    Month number and full year of a contract spec, e.g. 'DEC 10' -> (12, 2010).
+    Two-digit years below 50 are 20xx, the others 19xx.
+
+    Returns:
+        tuple: (month, year), or (None, None) if the spec cannot be parsed.
+    """
+    if not isinstance(contract_str, str) or not contract_str.strip():
+        return None, None
+    parts = contract_str.split()
+    if len(parts) != 2 or parts[0].upper() not in MONTHS:
+        logger.warning(f"Unexpected contract format: {contract_str}")
+        return None, None
+    try:
+        yr = int(parts[1])
+    except ValueError:
+        logger.warning(f"Could not parse year: {parts[1]}")
+        return None, None
+    return MONTHS[parts[0].upper()], 2000 + yr if yr < 50 else 1900 + yr
+
+
+@lru_cache(maxsize=None)
+def third_friday(year, month):
+    """Third Friday of a month, e.g. third_friday(2010, 12) -> datetime(2010, 12, 17)."""
+    first_friday = 1 + (calendar.FRIDAY - calendar.weekday(year, month, 1)) % 7
+    return datetime(year, month, first_friday + 14)
+
+
+@lru_cache(maxsize=None)
+def last_weekday(year, month):
+    """Last Monday-to-Friday day of a month."""
+    day = calendar.monthrange(year, month)[1]
+    return datetime(year, month, day - max(calendar.weekday(year, month, day) - calendar.FRIDAY, 0))
+
+
+def last_trading_days(trading_days):
+    """{(year, month): last date} of a sequence of trading dates."""
+    dates = pd.DatetimeIndex(trading_days).dropna()
+    last = pd.Series(dates, index=dates).groupby([dates.year, dates.month]).max()
+    return {key: value.to_pydatetime() for key, value in last.items()}
+
+
+def settlement_dates(contracts, convention="third_friday", trading_days=None, overrides=None,
+                     months=QUARTERLY_MONTHS, strict=False):
+    """
+    Settlement date of every row of a Series of contract specs.
+
+    Args:
+        contracts (pd.Series): specs such as 'DEC 10' (NaN allowed); may be categorical.
+        convention (str): "third_friday" or "last_business_day".
+        trading_days (array-like): dates whose last one in each month is the
+            "last_business_day" settlement date.
+        overrides (dict): spec -> day of month used instead of the convention.
+        months (tuple): contract months of the cycle; specs in other months give
+            NaT, or raise with `strict`.
+        strict (bool): raise ValueError on a spec outside the cycle.
+
+    Returns:
+        pd.Series: datetime64[ns], aligned with `contracts.index`; NaT where the
+                   spec is missing or cannot be resolved.
+    """
+    if convention not in CONVENTIONS:
+        raise ValueError(f"Unknown convention {convention!r}, expected one of {CONVENTIONS}")
+    contracts = contracts if isinstance(contracts, pd.Series) else pd.Series(contracts)
+    cat = pd.Categorical(contracts)
+    overrides = overrides or {}
+    last_days = last_trading_days(trading_days) if trading_days is not None else None
+
+    def resolve(spec):
+        month, year = parse_contract_month_year(spec)
+        if month is None:
+            return None
+        if month not in months:
+            if strict:
+                raise ValueError(f"Contract month of {spec!r} not in allowed months {list(months)}")
+            return None
+        if spec in overrides:
+            return datetime(year, month, overrides[spec])
+        if convention == "third_friday":
+            return third_friday(year, month)
+        if last_days is not None:
+            return last_days.get((year, month))
+        return last_weekday(year, month)
+
+    # One date per distinct spec; code -1 (missing) indexes the trailing NaT.
+    resolved = pd.to_datetime([resolve(spec) for spec in cat.categories] + [None])
+    values = np.asarray(resolved, dtype="datetime64[ns]")[cat.codes]
+    return pd.Series(values, index=contracts.index, name=contracts.name)
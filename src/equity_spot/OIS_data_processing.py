@@ -61,12 +61,14 @@ OIS_TENORS = {
     "OIS_3M": "USSOC CMPN Curncy",   # 3 Month OIS Rate
 }
 
-def process_ois_data(filepath: Path) -> pd.DataFrame:
+def process_ois_data(filepath, save: bool = True) -> pd.DataFrame:
     """
     Extracts, cleans, and formats only the 3-month OIS rate from Bloomberg historical dataset.
 
     Args:
-        filepath (Path): Path to the parquet file containing multi-index Bloomberg data.
+        filepath (Path or pd.DataFrame): Path to the parquet file containing multi-index Bloomberg data,
+            or that data already loaded (e.g. by equity_pipeline.py).
+        save (bool): Write cleaned_ois_rates.csv to the processed directory.
 
     Returns:
         pd.DataFrame: Cleaned OIS dataset containing only the 3-month OIS rate.
@@ -74,13 +76,15 @@ def process_ois_data(filepath: Path) -> pd.DataFrame:
     Raises:
         ValueError: If the required OIS column is missing.
     """
-    logger.info(f"Loading OIS data from {filepath}")
-
-    try:
-        ois_df = pd.read_parquet(filepath)
-    except Exception as e:
-        logger.error(f"Error reading parquet file: {e}")
-        raise
+    if isinstance(filepath, pd.DataFrame):
+        ois_df = filepath
+    else:
+        logger.info(f"Loading OIS data from {filepath}")
+        try:
+            ois_df = pd.read_parquet(filepath)
+        except Exception as e:
+            logger.error(f"Error reading parquet file: {e}")
+            raise
 
     logger.info(f"Column levels: {ois_df.columns.names}")
 
@@ -101,9 +105,10 @@ def process_ois_data(filepath: Path) -> pd.DataFrame:
     ois_df = ois_df.dropna(subset=["OIS_3M"])
 
     # Save the cleaned dataset
-    output_path = Path(PROCESSED_DIR) / "cleaned_ois_rates.csv"
-    ois_df.to_csv(output_path, index=True)
-    logger.info(f"Saved cleaned OIS rates to {output_path}")
+    if save:
+        output_path = Path(PROCESSED_DIR) / "cleaned_ois_rates.csv"
+        ois_df.to_csv(output_path, index=True)
+        logger.info(f"Saved cleaned OIS rates to {output_path}")
 
     # Log dataset summary
     logger.info("\n========== OIS Data Summary ==========")
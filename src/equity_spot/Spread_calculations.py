@@ -14,7 +14,7 @@ Based on the logic from your Stata scripts:
   - Plot all indices together in one figure, with an option to keep date axis unbroken by missing data.
 
 This script presumes:
-  - Each index has a "{index_code}_Calendar_spread.csv" with 2-term data 
+  - Each index has a "{index_code}_calendar_spread.csv" with 2-term data 
     (Term1, Term2) in PROCESSED_DIR (including TTM, SettlementDate, etc.).
   - "cleaned_ois_rates.csv" in PROCESSED_DIR has columns [Date, OIS_3M]
     (with OIS_3M in DECIMAL form, e.g. 0.013 => 1.3%).
@@ -34,7 +34,9 @@ import sys
 
 
 sys.path.insert(1, "./src")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
 from settings import config
+from outlier_filter import rolling_outlier_mask
 
 DATA_DIR = config("DATA_DIR")
 TEMP_DIR = config("TEMP_DIR")
@@ -59,26 +61,28 @@ logger = logging.getLogger(__name__)
 INDEX_CODES = ["SPX", "NDX", "INDU"]
 
 
-def build_daily_dividends(index_code: str) -> pd.DataFrame:
+def build_daily_dividends(index_code: str, raw_df: pd.DataFrame = None) -> pd.DataFrame:
     """
-    Load daily dividends for the given index code from bloomberg_historical_data.parquet.
+    Load daily dividends for the given index code from bloomberg_historical_data.parquet,
+    or take them from `raw_df` (the multi-index Bloomberg data, already loaded).
     Return columns: [Date, Daily_Div].
     """
     logger.info(f"[{index_code}] Building daily dividend table")
 
-    input_file = Path(INPUT_DIR) / "bloomberg_historical_data.parquet"
-    if not os.path.exists(input_file):
-        logger.warning("Primary input file not found, switching to cached data")
-        input_file = Path(DATA_MANUAL) / "bloomberg_historical_data.parquet"
+    if raw_df is None:
+        input_file = Path(INPUT_DIR) / "bloomberg_historical_data.parquet"
+        if not os.path.exists(input_file):
+            logger.warning("Primary input file not found, switching to cached data")
+            input_file = Path(DATA_MANUAL) / "bloomberg_historical_data.parquet"
+        raw_df = pd.read_parquet(input_file)
 
-    raw_df = pd.read_parquet(input_file)
     div_col = (f"{index_code} Index", "INDX_GROSS_DAILY_DIV")
     if div_col not in raw_df.columns:
         raise ValueError(f"Missing daily dividend column {div_col} for index={index_code}")
 
     div_df = raw_df.loc[:, div_col].to_frame("Daily_Div").reset_index()
     div_df.rename(columns={"index": "Date"}, inplace=True)
-    div_df["Date"] = pd.to_datetime(div_df["Date"], errors="coerce")
+    div_df["Date"] = _as_datetime(div_df["Date"])
     div_df["Daily_Div"] = div_df["Daily_Div"].fillna(0)
 
     # Optionally drop any row that has no valid date
@@ -94,12 +98,12 @@ def build_daily_dividends(index_code: str) -> pd.DataFrame:
     div_df.reset_index(drop=True, inplace=True)
 
     logger.info(f"[{index_code}] daily dividends final shape: {div_df.shape}")
-    logger.info(f"[{index_code}] Sample daily dividends:\n{div_df.head(10)}")
+    logger.info("[%s] Sample daily dividends:\n%s", index_code, div_df.head(10))
     return div_df
 
 
 def barndorff_nielsen_filter(df: pd.DataFrame,
-                             colname: str,
+                             colname,
                              date_col: str = "Date",
                              window: int = 45,
                              threshold: float = 10.0) -> pd.DataFrame:
@@ -109,74 +113,93 @@ def barndorff_nielsen_filter(df: pd.DataFrame,
     2) abs_dev from that median
     3) rolling mean(abs_dev) => mad
     4) outlier if abs_dev/mad >= threshold => set colname_filtered=NaN
+
+    'colname' may also be a list of columns; all of them are filtered in one
+    call to `outlier_filter.rolling_outlier_mask`.
     """
     df = df.sort_values(date_col).copy()
+    cols = [colname] if isinstance(colname, str) else list(colname)
 
-    rolling_median = df[colname].rolling(window=window*2+1, center=True, min_periods=1).median()
-    rolling_median_shifted = rolling_median.shift(1)
+    # Median and MAD over the centered window, lagged by one row
+    bad_price = rolling_outlier_mask(df[cols], window=window*2+1, mode="centered", threshold=threshold,
+                                     min_periods=1, lag=1)
 
-    df["abs_dev"] = (df[colname] - rolling_median_shifted).abs()
-    rolling_mad = df["abs_dev"].rolling(window=window*2+1, center=True, min_periods=1).mean()
-    rolling_mad_shifted = rolling_mad.shift(1)
+    for col in cols:
+        # Count how many outliers
+        outlier_count = bad_price[col].sum()
+        if outlier_count > 0:
+            logger.info(f"Barndorff-Nielsen filter: flagged {int(outlier_count)} outliers in {col}")
 
-    df["bad_price"] = (df["abs_dev"] / rolling_mad_shifted) >= threshold
-    df.loc[df[colname].isna(), "bad_price"] = False
+        df[f"{col}_filtered"] = df[col].where(~bad_price[col], np.nan)
 
-    # Count how many outliers
-    outlier_count = df["bad_price"].sum()
-    if outlier_count > 0:
-        logger.info(f"Barndorff-Nielsen filter: flagged {int(outlier_count)} outliers in {colname}")
+    return df
 
-    df[f"{colname}_filtered"] = df[colname].where(~df["bad_price"], np.nan)
 
-    df.drop(["abs_dev", "bad_price"], axis=1, inplace=True, errors="ignore")
-    return df
+def _as_datetime(col: pd.Series) -> pd.Series:
+    """Parse a date column read from CSV; columns that are already datetimes are kept as is."""
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    return pd.to_datetime(col, errors="coerce")
 
 
-def process_index_forward_rates(index_code: str) -> pd.DataFrame:
+def process_index_forward_rates(index_code: str,
+                                raw_df: pd.DataFrame = None,
+                                fut_df: pd.DataFrame = None,
+                                ois_df: pd.DataFrame = None,
+                                save: bool = True) -> pd.DataFrame:
     """
-    1) Load near/next futures for index_code from _Calendar_spread.csv
+    1) Load near/next futures for index_code from _calendar_spread.csv
     2) Merge with single OIS_3M (as-of)
     3) Merge daily dividends, compute Div_Sum1_Comp & Div_Sum2_Comp
     4) Implied forward => cal_{index_code}_rf, OIS forward => ois_fwd_{index_code}, spread
     5) Barndorff outlier filter, then multiply spread by 100 => bps
     6) Save & return
+
+    `raw_df` is passed to build_daily_dividends (default: read the Parquet file).
+    `fut_df` (the calendar spread of the index) and `ois_df` (the cleaned OIS
+    rates, indexed by date) are used instead of the CSV files when given, e.g.
+    by equity_pipeline.py; `save=False` skips writing _Forward_Rates.csv.
     """
     logger.info(f"[{index_code}] Starting forward rate computation")
 
-    fut_file = Path(PROCESSED_DIR) / f"{index_code}_Calendar_spread.csv"
-    if not fut_file.exists():
-        logger.error(f"[{index_code}] Missing futures file: {fut_file}")
-        return pd.DataFrame()
-
-    fut_df = pd.read_csv(fut_file)
-    logger.info(f"[{index_code}] Loaded futures shape: {fut_df.shape}")
+    if fut_df is None:
+        fut_file = Path(PROCESSED_DIR) / f"{index_code}_calendar_spread.csv"
+        if not fut_file.exists():
+            logger.error(f"[{index_code}] Missing futures file: {fut_file}")
+            return pd.DataFrame()
 
+        fut_df = pd.read_csv(fut_file)
+        logger.info(f"[{index_code}] Loaded futures shape: {fut_df.shape}")
+    else:
+        fut_df = fut_df.copy()
 
     if "Date" not in fut_df.columns:
-        logger.error(f"[{index_code}] No 'Date' column in {fut_file}, aborting.")
+        logger.error(f"[{index_code}] No 'Date' column in the futures data, aborting.")
         return pd.DataFrame()
-    fut_df["Date"] = pd.to_datetime(fut_df["Date"], errors="coerce")
+    fut_df["Date"] = _as_datetime(fut_df["Date"])
 
     before_drop = len(fut_df)
     fut_df.dropna(subset=["Date"], inplace=True)
     logger.info(f"[{index_code}] Dropped {before_drop - len(fut_df)} rows lacking a valid Date in futures.")
-    fut_df["Term1_SettlementDate"] = pd.to_datetime(fut_df["Term1_SettlementDate"], errors="coerce")
-    fut_df["Term2_SettlementDate"] = pd.to_datetime(fut_df["Term2_SettlementDate"], errors="coerce")
+    fut_df["Term1_SettlementDate"] = _as_datetime(fut_df["Term1_SettlementDate"])
+    fut_df["Term2_SettlementDate"] = _as_datetime(fut_df["Term2_SettlementDate"])
 
     fut_df.sort_values("Date", inplace=True)
     fut_df.reset_index(drop=True, inplace=True)
 
     # === Merge single OIS_3M
-    ois_file = Path(PROCESSED_DIR) / "cleaned_ois_rates.csv"
-    if not ois_file.exists():
-        logger.error(f"[{index_code}] Missing OIS file: {ois_file}")
-        return pd.DataFrame()
+    if ois_df is None:
+        ois_file = Path(PROCESSED_DIR) / "cleaned_ois_rates.csv"
+        if not ois_file.exists():
+            logger.error(f"[{index_code}] Missing OIS file: {ois_file}")
+            return pd.DataFrame()
+        ois_df = pd.read_csv(ois_file)
+    else:
+        ois_df = ois_df.rename_axis("Date").reset_index()
 
-    ois_df = pd.read_csv(ois_file)
     if "Date" not in ois_df.columns:
         ois_df.rename(columns={"Unnamed: 0": "Date"}, inplace=True)
-    ois_df["Date"] = pd.to_datetime(ois_df["Date"], errors="coerce")
+    ois_df["Date"] = _as_datetime(ois_df["Date"])
     ois_df.sort_values("Date", inplace=True)
 
     # as-of merge
@@ -194,7 +217,7 @@ def process_index_forward_rates(index_code: str) -> pd.DataFrame:
         logger.warning(f"[{index_code}] 'OIS_3M' column not found in OIS data, using default 'OIS_3M'?")
 
     # === Load daily dividends
-    div_df = build_daily_dividends(index_code)
+    div_df = build_daily_dividends(index_code, raw_df)
     # add cumsum in div_df
     div_df["CumDiv"] = div_df["Daily_Div"].cumsum()
 
@@ -306,9 +329,10 @@ def process_index_forward_rates(index_code: str) -> pd.DataFrame:
 
     merged_df[spread_col] = merged_df[spread_col] * 100.0
     merged_df.set_index("Date", inplace=True)
-    out_file = Path(PROCESSED_DIR) / f"{index_code}_Forward_Rates.csv"
-    merged_df.to_csv(out_file)
-    logger.info(f"[{index_code}] Final forward rates shape: {merged_df.shape}, saved to {out_file}")
+    if save:
+        out_file = Path(PROCESSED_DIR) / f"{index_code}_Forward_Rates.csv"
+        merged_df.to_csv(out_file)
+        logger.info(f"[{index_code}] Final forward rates shape: {merged_df.shape}, saved to {out_file}")
     logger.info(
         f"[{index_code}] Sample final rows:\n"
         + merged_df[[f"cal_{index_code}_rf", f"ois_fwd_{index_code}", spread_col]].tail(5).to_string()
@@ -317,6 +341,152 @@ def process_index_forward_rates(index_code: str) -> pd.DataFrame:
     return merged_df
 
 
+def _asof(keys: np.ndarray, values: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Backward as-of lookup (as merge_asof(direction="backward")): for each query,
+    the value at the last key <= query, NaN before the first key. `keys` sorted.
+    """
+    pos = np.searchsorted(keys, queries, side="right") - 1
+    return np.where(pos >= 0, values[np.maximum(pos, 0)], np.nan)
+
+
+def cumulative_dividend_lookup(index_codes, dates, raw_df: pd.DataFrame = None) -> list:
+    """
+    Cumulative daily dividends of each row's index up to (and including) each date.
+
+    The cumulative sums of all indices are concatenated, keyed by (index, day),
+    so one searchsorted call serves every index. Dates before the first
+    dividend date of an index, and missing dates, give NaN.
+
+    Args:
+        index_codes (array-like): index code of each row.
+        dates (list): one or more date arrays, each aligned with `index_codes`.
+        raw_df (pd.DataFrame): multi-index Bloomberg data (see build_daily_dividends).
+
+    Returns:
+        list: one float array per entry of `dates`.
+    """
+    index_codes = pd.Series(np.asarray(index_codes))
+    codes = {code: i for i, code in enumerate(pd.unique(index_codes))}
+    span = np.int64(1) << 32  # key range of one index, in days
+    keys, cums = [], []
+    for code, i in codes.items():
+        div = build_daily_dividends(code, raw_df)
+        keys.append(i * span + div["Date"].to_numpy().astype("datetime64[D]").astype(np.int64))
+        cums.append(div["Daily_Div"].cumsum().to_numpy(dtype=float))
+    keys, cums = np.concatenate(keys), np.concatenate(cums)
+
+    row_offset = index_codes.map(codes).to_numpy(dtype=np.int64) * span
+    first = np.searchsorted(keys, row_offset)
+    out = []
+    for col in dates:
+        days = pd.DatetimeIndex(col).to_numpy().astype("datetime64[D]")
+        missing = np.isnat(days)
+        query = row_offset + np.where(missing, 0, days.astype(np.int64))
+        pos = np.searchsorted(keys, query, side="right") - 1
+        # A position in the previous index's keys means "before the first date"
+        out.append(np.where(missing | (pos < first), np.nan, cums[np.maximum(pos, 0)]))
+    return out
+
+
+def forward_rate_kernel(pairs: pd.DataFrame,
+                        ois_df: pd.DataFrame,
+                        raw_df: pd.DataFrame = None,
+                        window: int = 45,
+                        threshold: float = 10.0) -> pd.DataFrame:
+    """
+    Implied forward rates of every contract pair of every index in one pass.
+
+    The same computation as process_index_forward_rates, for a stacked frame of
+    pairs (futures_data_processing.contract_pairs): the as-of OIS rate and the
+    cumulative dividends at the trade date and both settlement dates come from
+    searchsorted lookups instead of merge_asof calls, each on a re-sorted frame.
+    The Barndorff-Nielsen filter runs per (Index, Near, Far) series.
+
+    Args:
+        pairs (pd.DataFrame): Index, Near, Far, Date and Term1_/Term2_ columns.
+        ois_df (pd.DataFrame): OIS_3M (decimal) indexed by date.
+        raw_df (pd.DataFrame): multi-index Bloomberg data with the daily
+            dividends (default: read by build_daily_dividends).
+
+    Returns:
+        pd.DataFrame: one row per (Index, Near, Far, Date) with OIS, Div_Sum1/2,
+            Div_Sum1/2_Comp, implied_forward_raw, cal_rf, ois_fwd_raw, ois_fwd
+            and spread (bps, outliers set to NaN together with cal_rf).
+    """
+    ttm1, ttm2 = "Term1_TTM", "Term2_TTM"
+    fp1, fp2 = "Term1_Futures_Price", "Term2_Futures_Price"
+    df = pairs.copy()
+    for col in ["Date", "Term1_SettlementDate", "Term2_SettlementDate"]:
+        df[col] = _as_datetime(df[col])
+    df = df.dropna(subset=["Date", ttm1, ttm2, fp1, fp2])
+    df = df.sort_values(["Index", "Near", "Far", "Date"], kind="stable").reset_index(drop=True)
+
+    ois = ois_df["OIS_3M"].dropna().sort_index()
+    df["OIS"] = _asof(ois.index.to_numpy(), ois.to_numpy(dtype=float), df["Date"].to_numpy())
+
+    cum_current, cum_term1, cum_term2 = cumulative_dividend_lookup(
+        df["Index"], [df["Date"], df["Term1_SettlementDate"], df["Term2_SettlementDate"]], raw_df
+    )
+    df["Div_Sum1"] = cum_term1 - cum_current
+    df["Div_Sum2"] = cum_term2 - cum_current
+
+    # Half-interval compounding of the dividends at the OIS rate
+    df["Div_Sum1_Comp"] = df["Div_Sum1"] * (((df[ttm1] / 2.0) / 360.0) * df["OIS"] + 1.0)
+    df["Div_Sum2_Comp"] = df["Div_Sum2"] * (((df[ttm2] / 2.0) / 360.0) * df["OIS"] + 1.0)
+    df["implied_forward_raw"] = (df[fp2] + df["Div_Sum2_Comp"]) / (df[fp1] + df["Div_Sum1_Comp"]) - 1.0
+
+    dt = df[ttm2] - df[ttm1]
+    df["cal_rf"] = np.where(dt > 0, 100.0 * df["implied_forward_raw"] * (360.0 / dt), np.nan)
+    df["ois_fwd_raw"] = (1.0 + df["OIS"] * df[ttm2] / 360.0) / (1.0 + df["OIS"] * df[ttm1] / 360.0) - 1.0
+    df["ois_fwd"] = np.where(dt > 0, df["ois_fwd_raw"] * (360.0 / dt) * 100.0, np.nan)
+    df["spread"] = df["cal_rf"] - df["ois_fwd"]
+
+    # Outlier filter on each series, rows in date order within each group
+    bad = np.zeros(len(df), dtype=bool)
+    for _, pos in df.groupby(["Index", "Near", "Far"], sort=False).indices.items():
+        mask = rolling_outlier_mask(df[["spread"]].iloc[pos], window=window*2+1, mode="centered",
+                                    threshold=threshold, min_periods=1, lag=1)
+        bad[pos] = mask["spread"].to_numpy()
+    if bad.any():
+        logger.info(f"Barndorff-Nielsen filter: flagged {int(bad.sum())} outliers across {df['Index'].nunique()} indices")
+    # As in process_index_forward_rates, cal_rf is dropped wherever the filtered spread is missing
+    out_mask = bad | df["spread"].isna().to_numpy()
+    df.loc[out_mask, ["cal_rf", "spread"]] = np.nan
+    df["spread"] = df["spread"] * 100.0
+    return df
+
+
+def pair_forward_rates(term_structure: pd.DataFrame, index_code: str, near: str) -> pd.DataFrame:
+    """
+    Forward rates of one contract pair of an index, taken from the output of
+    forward_rate_kernel and laid out like process_index_forward_rates:
+    indexed by Date, with cal_{index_code}_rf, ois_fwd_{index_code} and
+    spread_{index_code} (bps). For the nearest pair the values agree with
+    process_index_forward_rates to rounding; its intermediate merge columns
+    (CumDiv_*, Daily_Div_*, spread_*_filtered) are not reproduced.
+
+    Args:
+        term_structure (pd.DataFrame): output of forward_rate_kernel (or None).
+        index_code (str): e.g. "SPX".
+        near (str): near contract of the pair, e.g. "ES1".
+
+    Returns:
+        pd.DataFrame: empty when the index has no such pair.
+    """
+    if term_structure is None:
+        return pd.DataFrame()
+    rows = (term_structure["Index"] == index_code) & (term_structure["Near"] == near)
+    if not rows.any():
+        return pd.DataFrame()
+    df = term_structure.loc[rows].drop(columns=["Near", "Far"])
+    # Calendar-spread columns first, then the rates
+    df.insert(df.columns.get_loc("OIS"), "Index", df.pop("Index"))
+    df = df.rename(columns={"cal_rf": f"cal_{index_code}_rf", "ois_fwd": f"ois_fwd_{index_code}",
+                            "spread": f"spread_{index_code}"})
+    return df.set_index("Date")
+
+
 def plot_all_indices(results: dict, keep_dates: bool = True):
     """
     Generate two plots:
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+equity_pipeline.py
+
+Driver for the equity spot-futures stages, with one read of the Bloomberg data.
+
+Run one after the other, the stage scripts read bloomberg_historical_data.parquet
+five times: once in OIS_data_processing, once in futures_data_processing and
+once per index in Spread_calculations.build_daily_dividends. Each read loads
+every (ticker, field) column. This driver instead
+
+    1. reads the file once, projecting only the (ticker, field) pairs the
+       stages use: the 3M OIS rate, the daily dividends of each index and
+       its `n_contracts` nearest futures contracts (all four by default);
+    2. runs the OIS stage on that frame;
+    3. fans the indices (SPX, NDX, INDU) out over a process pool. Each worker
+       receives only the columns of its index and runs its futures stage
+       (settlement dates, TTM, Term1/Term2 calendar spread);
+    4. combines the calendar spreads and computes the forward-rate term
+       structure (every adjacent contract pair of every index, in one call of
+       Spread_calculations.forward_rate_kernel). The forward rates of each
+       index are its nearest pair in that term structure, so they are not
+       computed a second time; they feed the combined spread plots.
+
+The stages hand their DataFrames to each other in memory: the dates stay
+datetime64 columns, so nothing is written to CSV, read back and re-parsed
+(the scripts still do that when run one by one). With a checkpoint
+directory, every stage output is also saved as Parquet, which keeps the
+schema (dtypes and index):
+
+    <checkpoint dir>/cleaned_ois_rates.parquet
+    <checkpoint dir>/{index}_calendar_spread.parquet
+    <checkpoint dir>/all_indices_calendar_spreads.parquet
+    <checkpoint dir>/{index}_Forward_Rates.parquet
+    <checkpoint dir>/forward_term_structure.parquet
+
+and `read_checkpoint` loads them back.
+
+With one worker (or one CPU) the indices are run in-process, which avoids the
+pool start-up cost.
+
+Usage:
+    python equity_pipeline.py
+    python equity_pipeline.py --indices SPX NDX --max-workers 2
+    python equity_pipeline.py --contracts 2                   # nearest pair only
+    python equity_pipeline.py --checkpoint-dir                # Parquet checkpoints in PROCESSED_DIR
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from settings import config
+import futures_data_processing
+from OIS_data_processing import OIS_TENORS, process_ois_data
+from Spread_calculations import INDEX_CODES, forward_rate_kernel, pair_forward_rates, plot_all_indices
+
+INPUT_DIR = Path(config("INPUT_DIR"))
+DATA_MANUAL = Path(config("MANUAL_DATA_DIR"))
+PROCESSED_DIR = Path(config("PROCESSED_DIR"))
+BLOOMBERG_FILE = "bloomberg_historical_data.parquet"
+N_TERMS = 2  # Term1 and Term2 of the calendar spread
+N_CONTRACTS = 4  # contracts per index in the forward-rate term structure
+
+logger = logging.getLogger(__name__)
+
+
+def bloomberg_input_file():
+    """The Bloomberg Parquet file: INPUT_DIR, else the cached copy in MANUAL_DATA_DIR."""
+    input_file = INPUT_DIR / BLOOMBERG_FILE
+    if not input_file.exists():
+        logger.warning("Primary input file not found, switching to cached data")
+        input_file = DATA_MANUAL / BLOOMBERG_FILE
+    return input_file
+
+
+def required_columns(index_codes=INDEX_CODES, n_contracts=N_CONTRACTS):
+    """(ticker, field) pairs read by the OIS, futures and forward-rate stages."""
+    columns = [(OIS_TENORS["OIS_3M"], "PX_LAST")]
+    for index_code in index_codes:
+        columns += index_columns(index_code, n_contracts)
+    return columns
+
+
+def read_bloomberg_data(columns=None, path=None):
+    """
+    Multi-index Bloomberg data, reading only `columns` (a list of (ticker, field)
+    pairs; default: all). Pairs missing from the file are skipped, so the stages
+    raise their usual errors about them.
+    """
+    path = bloomberg_input_file() if path is None else Path(path)
+    if columns is None:
+        return pd.read_parquet(path)
+    # pyarrow stores each column of a MultiIndex under the str() of its tuple
+    available = set(pq.read_schema(path).names)
+    names = [str(tuple(c)) for c in columns if str(tuple(c)) in available]
+    table = pq.read_table(path, columns=names, use_pandas_metadata=True)
+    logger.info(f"Read {len(names)} of {len(available)} columns from {path}")
+    return table.to_pandas()
+
+
+def write_checkpoint(df, name, checkpoint_dir):
+    """Save a stage output as <checkpoint_dir>/<name>.parquet. Returns the path."""
+    path = Path(checkpoint_dir) / f"{name}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path)
+    logger.info(f"Saved checkpoint {path}")
+    return path
+
+
+def read_checkpoint(name, checkpoint_dir=PROCESSED_DIR):
+    """A stage output saved by `write_checkpoint`, with its dtypes and index."""
+    return pd.read_parquet(Path(checkpoint_dir) / f"{name}.parquet")
+
+
+def index_columns(index_code, n_contracts=N_CONTRACTS):
+    """(ticker, field) pairs of one index: its daily dividends and nearest futures."""
+    columns = [(f"{index_code} Index", "INDX_GROSS_DAILY_DIV")]
+    for code in futures_data_processing.INDEX_FUTURES[index_code][:max(n_contracts, N_TERMS)]:
+        columns += [(f"{code} Index", field) for field in futures_data_processing.FUTURES_FIELDS]
+    return columns
+
+
+def run_index(index_code, raw_df, checkpoint_dir=None, n_contracts=N_CONTRACTS):
+    """
+    Futures stage of one index (run in a worker process).
+
+    Returns:
+        tuple: (index_code, calendar spread DataFrame,
+                {futures code: processed contract DataFrame}).
+    """
+    futures_codes = futures_data_processing.INDEX_FUTURES[index_code][:max(n_contracts, N_TERMS)]
+    processed = futures_data_processing.process_index_futures(raw_df, futures_codes)
+    nearest = {code: processed[code] for code in list(processed)[:N_TERMS]}
+    spread = futures_data_processing.index_calendar_spread(index_code, nearest, save=False)
+    if spread is not None and checkpoint_dir is not None:
+        write_checkpoint(spread, f"{index_code}_calendar_spread", checkpoint_dir)
+    return index_code, spread, processed
+
+
+def run(index_codes=INDEX_CODES, max_workers=None, plot=True, path=None, checkpoint_dir=None,
+        n_contracts=N_CONTRACTS):
+    """
+    Run the OIS, futures and forward-rate stages from a single read of the data,
+    handing the stage outputs over in memory.
+
+    Args:
+        index_codes (list): indices to process (default SPX, NDX, INDU).
+        max_workers (int): processes for the per-index stage
+                           (default: one per index, at most the CPU count).
+        plot (bool): draw the combined spread plots.
+        checkpoint_dir (Path): also save every stage output there as Parquet.
+        n_contracts (int): nearest contracts per index in the term structure.
+
+    Returns:
+        dict: {"ois": cleaned OIS rates, "calendar_spreads": calendar spreads of
+               all indices, "forward_rates": {index code: forward rates of the
+               nearest contract pair (see pair_forward_rates)},
+               "forward_term_structure": forward rates of every adjacent contract
+               pair of every index (see forward_rate_kernel)}.
+    """
+    index_codes = list(index_codes)
+    raw_df = read_bloomberg_data(required_columns(index_codes, n_contracts), path)
+    if not isinstance(raw_df.index, pd.DatetimeIndex):
+        raw_df.index = pd.to_datetime(raw_df.index)
+
+    ois_df = process_ois_data(raw_df, save=False)
+    if checkpoint_dir is not None:
+        write_checkpoint(ois_df, "cleaned_ois_rates", checkpoint_dir)
+
+    frames = [raw_df.loc[:, [c for c in index_columns(i, n_contracts) if c in raw_df.columns]] for i in index_codes]
+    n = len(index_codes)
+    args = (index_codes, frames, [checkpoint_dir] * n, [n_contracts] * n)
+    if max_workers is None:
+        max_workers = min(n, os.cpu_count() or 1)
+    if max_workers <= 1 or n <= 1:
+        outputs = list(map(run_index, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            outputs = list(pool.map(run_index, *args))
+
+    spreads = futures_data_processing.combine_calendar_spreads([out[1] for out in outputs], save=False)
+    if checkpoint_dir is not None and spreads is not None:
+        write_checkpoint(spreads, "all_indices_calendar_spreads", checkpoint_dir)
+
+    # Every adjacent contract pair of every index, in one pass
+    pairs = futures_data_processing.contract_pairs({out[0]: out[2] for out in outputs})
+    term_structure = forward_rate_kernel(pairs, ois_df, raw_df) if pairs is not None else None
+    if checkpoint_dir is not None and term_structure is not None:
+        write_checkpoint(term_structure, "forward_term_structure", checkpoint_dir)
+
+    # The forward rates of each index are its nearest pair (Term1/Term2)
+    results = {}
+    for index_code in index_codes:
+        nearest = futures_data_processing.INDEX_FUTURES[index_code][0]
+        results[index_code] = pair_forward_rates(term_structure, index_code, nearest)
+        if checkpoint_dir is not None and not results[index_code].empty:
+            write_checkpoint(results[index_code], f"{index_code}_Forward_Rates", checkpoint_dir)
+
+    if plot:
+        plot_all_indices(results, keep_dates=True)
+    return {"ois": ois_df, "calendar_spreads": spreads, "forward_rates": results,
+            "forward_term_structure": term_structure}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--indices", nargs="+", default=INDEX_CODES, choices=INDEX_CODES)
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Processes for the per-index stage (default: one per index, up to the CPU count)")
+    parser.add_argument("--contracts", type=int, default=N_CONTRACTS,
+                        help="Nearest contracts per index in the forward-rate term structure")
+    parser.add_argument("--no-plot", action="store_true", help="Skip the combined spread plots")
+    parser.add_argument("--checkpoint-dir", type=Path, nargs="?", const=PROCESSED_DIR, default=None,
+                        help="Save every stage output as Parquet (default directory: PROCESSED_DIR)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    run(args.indices, max_workers=args.max_workers, plot=not args.no_plot, checkpoint_dir=args.checkpoint_dir,
+        n_contracts=args.contracts)
+    logger.info(f"Equity pipeline finished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
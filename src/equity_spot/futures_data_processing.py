@@ -49,12 +49,14 @@ We have a timeseries dataframe containing futures multi-index nature with column
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import calendar
 import logging
+import os
 import sys
 from pathlib import Path
 sys.path.insert(1, "./src")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
 from settings import config
+import contract_calendar
 from datetime import datetime
 # Configuration from settings
 DATA_DIR      = Path(config("DATA_DIR"))
@@ -82,6 +84,14 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Futures contracts of each index, nearest first
+INDEX_FUTURES = {
+    'SPX': ['ES1', 'ES2', 'ES3', 'ES4'],
+    'NDX': ['NQ1', 'NQ2', 'NQ3', 'NQ4'],
+    'INDU': ['DM1', 'DM2', 'DM3', 'DM4']
+}
+FUTURES_FIELDS = ['PX_LAST', 'PX_VOLUME', 'OPEN_INT', 'CURRENT_CONTRACT_MONTH_YR']
+
 
 def get_third_friday(year, month):
     """
@@ -94,13 +104,7 @@ def get_third_friday(year, month):
     Returns:
         datetime: Date object for the third Friday
     """
-    # Use calendar.monthcalendar: each week is a list of ints (0 if day not in month)
-    month_cal = calendar.monthcalendar(year, month)
-    # The first week that has a Friday (weekday index 4)
-    fridays = [week[calendar.FRIDAY] for week in month_cal if week[calendar.FRIDAY] != 0]
-    if len(fridays) < 3:
-        raise ValueError(f"Not enough Fridays in {year}-{month}")
-    return datetime(year, month, fridays[2])  # third Friday
+    return contract_calendar.third_friday(year, month)
 
 def parse_contract_month_year(contract_str):
     """
@@ -113,23 +117,9 @@ def parse_contract_month_year(contract_str):
     Returns:
         tuple: (month_num, year_full) or (None, None) if invalid.
     """
-    if pd.isna(contract_str) or contract_str.strip() == '':
-        return None, None
-    parts = contract_str.split()
-    if len(parts) != 2:
-        logger.warning(f"Unexpected contract format: {contract_str}")
-        return None, None
-    month_abbr, year_abbr = parts
-    allowed = {"MAR": 3, "JUN": 6, "SEP": 9, "DEC": 12}
-    if month_abbr.upper() not in allowed:
-        raise ValueError(f"Contract month {month_abbr} not in allowed set {list(allowed.keys())}")
-    month_num = allowed[month_abbr.upper()]
-    try:
-        yr = int(year_abbr)
-        year_full = 2000 + yr if yr < 50 else 1900 + yr
-    except ValueError:
-        logger.warning(f"Could not parse year: {year_abbr}")
-        return None, None
+    month_num, year_full = contract_calendar.parse_contract_month_year(contract_str)
+    if month_num is not None and month_num not in contract_calendar.QUARTERLY_MONTHS:
+        raise ValueError(f"Contract month of {contract_str} not in allowed set ['MAR', 'JUN', 'SEP', 'DEC']")
     return month_num, year_full
 
 def process_index_futures(data, futures_codes):
@@ -172,14 +162,10 @@ def process_index_futures(data, futures_codes):
             df_contract = df_contract.reset_index(drop=True)
             
             # Parse contract specification and compute settlement date
-            settlement_dates = []
-            for cs in df_contract['ContractSpec']:
-                month_num, year_full = parse_contract_month_year(cs)
-                if month_num is None or year_full is None:
-                    settlement_dates.append(None)
-                else:
-                    settlement_dates.append(get_third_friday(year_full, month_num))
-            df_contract['SettlementDate'] = pd.to_datetime(settlement_dates)
+            # (once per distinct contract, see contract_calendar.py)
+            df_contract['SettlementDate'] = contract_calendar.settlement_dates(
+                df_contract['ContractSpec'], "third_friday", strict=True
+            )
             
             # Compute TTM in days: SettlementDate - Date
             df_contract['Date'] = pd.to_datetime(df_contract['Date'])
@@ -194,76 +180,140 @@ def process_index_futures(data, futures_codes):
             continue
     return result_dfs
 
-def merge_calendar_spreads(all_futures):
+def index_calendar_spread(index_code, fut_dict, save=True):
     """
-    For each index, merge the processed data for the two nearest futures contracts (Term 1 and Term 2)
-    on the Date field, and then combine the calendar spreads for all indices.
-    
+    Merge the processed data for the two nearest futures contracts (Term 1 and Term 2)
+    of one index on the Date field, and save it as {index_code}_calendar_spread.csv.
+
     Args:
-        all_futures (dict): Dictionary keyed by index code (e.g., 'SPX', 'NDX', 'INDU') where the value is
-                            another dictionary mapping futures code to its processed DataFrame.
-                            
+        index_code (str): Index code (e.g., 'SPX').
+        fut_dict (dict): Futures code -> processed DataFrame, nearest contract first.
+        save (bool): Write the CSV file.
+
     Returns:
-        pd.DataFrame: Combined calendar spread data for all indices.
+        pd.DataFrame: Calendar spread data of the index, or None without two contracts.
     """
-    combined = []
-    # For each index, assume the first two codes in the list are the two nearest contracts.
+    # Assume the first two codes in the list are the two nearest contracts.
     # For SPX, these would be ['ES1', 'ES2'].
-    for index_code, fut_dict in all_futures.items():
-        # Identify term1 and term2 codes:
-        codes = list(fut_dict.keys())
-        if len(codes) < 2:
-            logger.warning(f"Not enough futures data for {index_code}")
-            continue
-        term1 = fut_dict[codes[0]].copy()
-        term2 = fut_dict[codes[1]].copy()
-        # Add a prefix so that we can merge and distinguish columns:
-        term1 = term1.add_prefix('Term1_')
-        term2 = term2.add_prefix('Term2_')
-        # Rename the Date columns back to 'Date' for merging
-        term1.rename(columns={'Term1_Date': 'Date'}, inplace=True)
-        term2.rename(columns={'Term2_Date': 'Date'}, inplace=True)
-        merged = pd.merge(term1, term2, on='Date', how='inner')
-        merged['Index'] = index_code
-        combined.append(merged)
-        # Save each index’s calendar spread separately
+    codes = list(fut_dict.keys())
+    if len(codes) < 2:
+        logger.warning(f"Not enough futures data for {index_code}")
+        return None
+    term1 = fut_dict[codes[0]].copy()
+    term2 = fut_dict[codes[1]].copy()
+    # Add a prefix so that we can merge and distinguish columns:
+    term1 = term1.add_prefix('Term1_')
+    term2 = term2.add_prefix('Term2_')
+    # Rename the Date columns back to 'Date' for merging
+    term1.rename(columns={'Term1_Date': 'Date'}, inplace=True)
+    term2.rename(columns={'Term2_Date': 'Date'}, inplace=True)
+    merged = pd.merge(term1, term2, on='Date', how='inner')
+    merged['Index'] = index_code
+    # Save each index’s calendar spread separately
+    if save:
         output_file = PROCESSED_DIR / f"{index_code}_calendar_spread.csv"
         merged.to_csv(output_file , index=False)
         logger.info(f"Saved calendar spread for {index_code}: {len(merged)} rows")
-        logger.info(f"DataFrame merged:\n{merged.head()}")
+    logger.info(f"DataFrame merged:\n{merged.head()}")
+    return merged
+
+def contract_pairs(all_futures):
+    """
+    Calendar spreads of every adjacent contract pair (Term1 = near, Term2 = far:
+    ES1/ES2, ES2/ES3, ES3/ES4, ...) of every index, stacked in one DataFrame.
+
+    Args:
+        all_futures (dict): Index code -> {futures code -> processed DataFrame},
+                            nearest contract first (as from process_index_futures).
+
+    Returns:
+        pd.DataFrame: columns Index, Near, Far (futures codes), Date and the
+                      Term1_/Term2_ columns of index_calendar_spread.
+    """
+    pairs = []
+    for index_code, fut_dict in all_futures.items():
+        codes = list(fut_dict.keys())
+        for near, far in zip(codes[:-1], codes[1:]):
+            term1 = fut_dict[near].add_prefix('Term1_').rename(columns={'Term1_Date': 'Date'})
+            term2 = fut_dict[far].add_prefix('Term2_').rename(columns={'Term2_Date': 'Date'})
+            merged = pd.merge(term1, term2, on='Date', how='inner')
+            merged.insert(0, 'Index', index_code)
+            merged.insert(1, 'Near', near)
+            merged.insert(2, 'Far', far)
+            pairs.append(merged)
+    if not pairs:
+        logger.warning("No adjacent contract pairs to combine")
+        return None
+    return pd.concat(pairs, ignore_index=True)
+
+def combine_calendar_spreads(spreads, save=True):
+    """
+    Concatenate the calendar spreads of several indices and save them as
+    all_indices_calendar_spreads.csv.
+
+    Args:
+        spreads (list): Calendar spread DataFrames (None entries are skipped).
+        save (bool): Write the CSV file.
+
+    Returns:
+        pd.DataFrame: Combined calendar spread data, or None if there is none.
+    """
+    combined = [df for df in spreads if df is not None]
     if combined:
         combined_df = pd.concat(combined, ignore_index=True)
-        output_file = PROCESSED_DIR / "all_indices_calendar_spreads.csv"
-        combined_df.to_csv(output_file, index=False)
-        logger.info(f"Saved combined calendar spread data: {len(combined_df)} rows")
+        if save:
+            output_file = PROCESSED_DIR / "all_indices_calendar_spreads.csv"
+            combined_df.to_csv(output_file, index=False)
+            logger.info(f"Saved combined calendar spread data: {len(combined_df)} rows")
         logger.info(f"DataFrame combined:\n{combined_df.head()}")
         return combined_df
     else:
         logger.warning("No valid calendar spread data to combine")
         return None
 
-def main():
+def merge_calendar_spreads(all_futures):
+    """
+    For each index, merge the processed data for the two nearest futures contracts (Term 1 and Term 2)
+    on the Date field, and then combine the calendar spreads for all indices.
+    
+    Args:
+        all_futures (dict): Dictionary keyed by index code (e.g., 'SPX', 'NDX', 'INDU') where the value is
+                            another dictionary mapping futures code to its processed DataFrame.
+                            
+    Returns:
+        pd.DataFrame: Combined calendar spread data for all indices.
+    """
+    return combine_calendar_spreads(
+        [index_calendar_spread(index_code, fut_dict) for index_code, fut_dict in all_futures.items()]
+    )
+
+def main(raw_data=None, indices=None):
     """
     Main function to process raw futures data from a parquet file.
     
     It:
       - Loads the multi-index raw data from DATA_DIR/input/bloomberg_historical_data.parquet
+        (unless `raw_data` is given, e.g. by equity_pipeline.py)
       - Processes each index (SPX, NDX, INDU) futures for the two nearest contracts
       - Extracts settlement dates and computes TTM
       - Merges the Term 1 and Term 2 data to form calendar spread datasets
       - Saves both individual and combined outputs for downstream spread calculations.
+
+    Args:
+        raw_data (pd.DataFrame): Multi-index Bloomberg data already loaded.
+        indices (dict): Index code -> futures codes (default INDEX_FUTURES).
+
+    Returns:
+        pd.DataFrame: Combined calendar spread data for all indices.
     """
     try:
-        INPUT_FILE = DATA_MANUAL / "bloomberg_historical_data.parquet"
-        raw_data = pd.read_parquet(INPUT_FILE)
-        logger.info(f"Loading raw data from {INPUT_FILE}")
+        if raw_data is None:
+            INPUT_FILE = DATA_MANUAL / "bloomberg_historical_data.parquet"
+            raw_data = pd.read_parquet(INPUT_FILE)
+            logger.info(f"Loading raw data from {INPUT_FILE}")
         if not isinstance(raw_data.index, pd.DatetimeIndex):
             raw_data.index = pd.to_datetime(raw_data.index)
-        indices = {
-            'SPX': ['ES1', 'ES2', 'ES3', 'ES4'],
-            'NDX': ['NQ1', 'NQ2', 'NQ3', 'NQ4'],
-            'INDU': ['DM1', 'DM2', 'DM3', 'DM4']
-        }
+        indices = INDEX_FUTURES if indices is None else indices
         
         all_futures = {}
         for index_code, futures_codes in indices.items():
@@ -274,6 +324,7 @@ def main():
         # Merge calendar spreads (using only Term 1 and Term 2)
         combined_spreads = merge_calendar_spreads(all_futures)
         logger.info("Futures data processing completed successfully")
+        return combined_spreads
     
     except Exception as e:
         logger.error(f"Error in main: {e}")
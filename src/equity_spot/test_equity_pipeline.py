@@ -0,0 +1,88 @@
+"""
+Tests for the single-read equity pipeline driver (equity_pipeline.py).
+
+They check that the projected read returns exactly the columns of a full
+read, that running the indices in a process pool gives the same results as
+running them one after the other, that the in-memory handoff and its
+Parquet checkpoints give the same results as the CSV files, and that the
+forward rates taken from the batched term-structure kernel reproduce those of
+process_index_forward_rates.
+"""
+
+import numpy as np
+import pandas as pd
+
+import equity_pipeline
+import futures_data_processing
+from Spread_calculations import process_index_forward_rates
+
+RATE_COLUMNS = ["cal_{}_rf", "ois_fwd_{}", "spread_{}"]
+
+
+def assert_matches_reference(rates, reference, index_code, atol=0.0):
+    """Same dates and rates as process_index_forward_rates, to rounding."""
+    reference = reference.sort_index()
+    assert rates.index.equals(reference.index)
+    for col in RATE_COLUMNS:
+        col = col.format(index_code)
+        np.testing.assert_allclose(rates[col], reference[col], rtol=1e-12, atol=atol, equal_nan=True,
+                                   err_msg=col)
+
+
+def test_projected_read_matches_full_read():
+    columns = equity_pipeline.required_columns()
+    full = pd.read_parquet(equity_pipeline.bloomberg_input_file())
+    projected = equity_pipeline.read_bloomberg_data(columns)
+
+    assert list(projected.columns) == [c for c in columns if c in full.columns]
+    pd.testing.assert_frame_equal(projected, full.loc[:, projected.columns])
+
+
+def test_process_pool_matches_serial_run():
+    serial = equity_pipeline.run(max_workers=1, plot=False)["forward_rates"]
+    pooled = equity_pipeline.run(max_workers=3, plot=False)["forward_rates"]
+
+    assert list(serial) == list(pooled) == equity_pipeline.INDEX_CODES
+    for index_code in serial:
+        assert not serial[index_code].empty
+        pd.testing.assert_frame_equal(serial[index_code], pooled[index_code])
+
+
+def test_in_memory_handoff_matches_csv_files(tmp_path):
+    out = equity_pipeline.run(["SPX"], max_workers=1, plot=False, checkpoint_dir=tmp_path)
+    rates = out["forward_rates"]["SPX"]
+
+    # The same stage fed from CSV round-trips of the upstream outputs
+    out["calendar_spreads"].to_csv(tmp_path / "spread.csv", index=False)
+    out["ois"].to_csv(tmp_path / "ois.csv")
+    from_csv = process_index_forward_rates(
+        "SPX",
+        fut_df=pd.read_csv(tmp_path / "spread.csv"),
+        ois_df=pd.read_csv(tmp_path / "ois.csv", index_col=0),
+        save=False,
+    )
+    # The CSV text of the OIS rates can be off by an ulp
+    assert_matches_reference(rates, from_csv, "SPX", atol=1e-10)
+
+    # Checkpoints come back with their dtypes and index
+    pd.testing.assert_frame_equal(equity_pipeline.read_checkpoint("SPX_Forward_Rates", tmp_path), rates)
+    pd.testing.assert_frame_equal(equity_pipeline.read_checkpoint("cleaned_ois_rates", tmp_path), out["ois"])
+    spread = equity_pipeline.read_checkpoint("SPX_calendar_spread", tmp_path)
+    assert pd.api.types.is_datetime64_any_dtype(spread["Term1_SettlementDate"])
+
+
+def test_forward_rates_are_the_nearest_pair_of_the_term_structure():
+    out = equity_pipeline.run(max_workers=1, plot=False)
+    term = out["forward_term_structure"]
+
+    pairs = term.groupby("Index")["Near"].nunique()
+    assert (pairs == equity_pipeline.N_CONTRACTS - 1).all()
+    spreads = out["calendar_spreads"]
+    for index_code, rates in out["forward_rates"].items():
+        nearest = futures_data_processing.INDEX_FUTURES[index_code][0]
+        near = term[(term["Index"] == index_code) & (term["Near"] == nearest)]
+        np.testing.assert_array_equal(near["spread"], rates[f"spread_{index_code}"])
+
+        reference = process_index_forward_rates(index_code, fut_df=spreads[spreads["Index"] == index_code],
+                                                ois_df=out["ois"], save=False)
+        assert_matches_reference(rates, reference, index_code)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+execution_context.py
+
+One lazily created Dask execution context shared by the pipelines.
+
+Modules used to create a `dask.distributed.Client` at import, so importing
+them from a test, a figure script or a notebook started a whole LocalCluster.
+Here nothing is started until a computation asks for it, and the way work is
+executed is a setting:
+
+    - "sync":      dask's synchronous scheduler, in the calling thread.
+    - "threads":   dask's threaded scheduler (default without a scheduler address).
+    - "processes": dask's multiprocessing scheduler.
+    - "local":     a distributed LocalCluster, started on first use.
+    - "remote":    the distributed scheduler at DASK_SCHEDULER_ADDRESS
+                   (default when that address is set).
+
+The mode comes from DASK_EXECUTION_MODE (else from DASK_SCHEDULER_ADDRESS as
+above) and can be changed with `set_mode` or, temporarily, `use_mode`. The
+client and cluster are created once per process, reused by every module, and
+closed by `shutdown` (also registered at exit).
+
+Usage:
+    import execution_context
+    result = execution_context.compute(ddf)          # runs in the current mode
+    with execution_context.activate():               # ... as does every compute in the block
+        ...
+    npartitions = execution_context.n_workers()
+    with execution_context.use_mode("sync"):
+        ...
+"""
+
+import atexit
+import contextlib
+import os
+import threading
+
+import dask
+
+from settings import config
+
+MODES = ("sync", "threads", "processes", "local", "remote")
+
+# dask.compute scheduler names of the modes that need no client.
+_SCHEDULERS = {"sync": "synchronous", "threads": "threads", "processes": "processes"}
+
+_lock = threading.RLock()
+_state = {"mode": None, "client": None, "cluster": None, "client_kwargs": {}}
+
+
+def _scheduler_address():
+    return config("DASK_SCHEDULER_ADDRESS", default=None)
+
+
+def default_mode():
+    """DASK_EXECUTION_MODE if set, else "remote" with a scheduler address, else "threads"."""
+    mode = config("DASK_EXECUTION_MODE", default=None)
+    if mode:
+        return mode
+    return "remote" if _scheduler_address() else "threads"
+
+
+def get_mode():
+    """The current execution mode."""
+    with _lock:
+        if _state["mode"] is None:
+            _state["mode"] = _check_mode(default_mode())
+        return _state["mode"]
+
+
+def _check_mode(mode):
+    if mode not in MODES:
+        raise ValueError(f"Unknown execution mode {mode!r}; expected one of {MODES}")
+    return mode
+
+
+def set_mode(mode, **client_kwargs):
+    """
+    Switch the execution mode. A running client is closed when the new mode
+    does not use it. `client_kwargs` are passed to LocalCluster ("local") or
+    Client ("remote") when the client is next created.
+    """
+    _check_mode(mode)
+    with _lock:
+        if mode != _state["mode"] or client_kwargs != _state["client_kwargs"]:
+            shutdown()
+        _state["mode"] = mode
+        _state["client_kwargs"] = client_kwargs
+
+
+@contextlib.contextmanager
+def use_mode(mode, **client_kwargs):
+    """Run a block in another execution mode, then restore the previous one."""
+    with _lock:
+        previous = (get_mode(), dict(_state["client_kwargs"]))
+    set_mode(mode, **client_kwargs)
+    try:
+        yield
+    finally:
+        set_mode(previous[0], **previous[1])
+
+
+def get_client():
+    """
+    The shared distributed Client, created on first call, or None in the
+    "sync", "threads" and "processes" modes.
+    """
+    mode = get_mode()
+    if mode in _SCHEDULERS:
+        return None
+    with _lock:
+        if _state["client"] is None:
+            from dask.distributed import Client, LocalCluster
+
+            kwargs = dict(_state["client_kwargs"])
+            if mode == "remote":
+                address = kwargs.pop("address", None) or _scheduler_address()
+                if not address:
+                    raise ValueError("Execution mode 'remote' needs DASK_SCHEDULER_ADDRESS")
+                _state["client"] = Client(address, set_as_default=False, **kwargs)
+            else:
+                _state["cluster"] = LocalCluster(**kwargs)
+                _state["client"] = Client(_state["cluster"], set_as_default=False)
+            print("Connected to scheduler at:", _state["client"].scheduler.address)
+        return _state["client"]
+
+
+def n_workers():
+    """Workers of the cluster, else the CPU count (1 in "sync" mode); e.g. for npartitions."""
+    mode = get_mode()
+    if mode == "sync":
+        return 1
+    client = get_client()
+    if client is None:
+        return os.cpu_count() or 1
+    return max(1, len(client.nthreads()))
+
+
+def _scheduler():
+    mode = get_mode()
+    return _SCHEDULERS[mode] if mode in _SCHEDULERS else get_client()
+
+
+def compute(*collections, **kwargs):
+    """
+    `dask.compute` in the current mode. Returns a single result for a single
+    collection, like `collection.compute()`.
+    """
+    kwargs.setdefault("scheduler", _scheduler())
+    results = dask.compute(*collections, **kwargs)
+    return results[0] if len(collections) == 1 else results
+
+
+@contextlib.contextmanager
+def activate():
+    """
+    Make the current mode dask's scheduler inside the block, so implicit
+    computations (e.g. divisions in `set_index(sorted=True)`) use it too.
+    """
+    with dask.config.set(scheduler=_scheduler()):
+        yield
+
+
+def shutdown():
+    """Close the shared client and its LocalCluster, if any."""
+    with _lock:
+        client, cluster = _state["client"], _state["cluster"]
+        _state["client"] = _state["cluster"] = None
+    if client is not None:
+        client.close()
+    if cluster is not None:
+        cluster.close()
+
+
+atexit.register(shutdown)
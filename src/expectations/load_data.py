@@ -4,6 +4,7 @@ import os
 from settings import config
 from pathlib import Path
 import numpy as np
+from pull_ken_french_data import load_sheet
 
 DATA_DIR = config("DATA_DIR")
 START_DATE = config("START_DATE")
@@ -49,17 +50,15 @@ def load_and_compute_log_returns():
     excess_returns = market_return
     return excess_returns
 
-def load_ken_french(dataset_name="6_Portfolios_2x3", weighting="value-weighted"):
+def load_ken_french(dataset_name="6_Portfolios_2x3", weighting="value-weighted", columns=None):
     """
-    Load Ken French portfolio data from the Excel file saved by pull_ken_french_data.py.
+    Load Ken French portfolio data from the Parquet store (or Excel file) saved by pull_ken_french_data.py.
+    Only the table for `weighting` is read, restricted to `columns` when given.
     If weighting is 'BE_FYt-1_to_ME_June_t', then shift the date index backward by 7 months 
     to align the valuation ratio with the time the information is available.
     
     Additionally, convert the numeric (BM ratio) columns to log form.
     """
-    excel_name = f"{dataset_name.replace('/', '_')}.xlsx"
-    excel_path = DATA_DIR / excel_name
-    
     if weighting == "value-weighted":
         sheet_name = "0"
     elif weighting == "equal-weighted":
@@ -71,7 +70,7 @@ def load_ken_french(dataset_name="6_Portfolios_2x3", weighting="value-weighted")
     else:
         raise ValueError("Invalid weighting: must be 'value-weighted', 'equal-weighted', or 'BE_FYt-1_to_ME_June_t'.")
     
-    df = pd.read_excel(excel_path, sheet_name=sheet_name)
+    df = load_sheet(dataset_name, sheet_name=sheet_name, data_dir=DATA_DIR, columns=columns)
     
     # If using the BE_FYt-1_to_ME_June_t measure, shift the dates backward by 7 months 
     # so that the valuation ratio is aligned with the time it would be available for forecasting.
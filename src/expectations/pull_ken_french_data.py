@@ -1,3 +1,16 @@
+"""
+Pulls Ken French portfolio data and stores it on disk.
+
+Each dataset is written to a Parquet store, DATA_DIR/ken_french/<dataset_name>/:
+one <table>.parquet file per DataReader table plus a manifest.json with the
+description, the table index (sheet names) and row counts. The loaders read
+only the requested table (and columns) from the store, memory-mapped. The
+multi-sheet Excel workbook is an optional side output; datasets that only
+exist as a workbook are still read from it.
+"""
+import argparse
+import json
+import re
 import warnings
 from pathlib import Path
 #import xlsxwriter
@@ -11,6 +24,137 @@ START_DATE = config("START_DATE")
 END_DATE = config("END_DATE")
 
 
+def _read_datareader(dataset_name, start_date, end_date):
+    # Suppress the specific FutureWarning about date_parser
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore",
+            category=FutureWarning,
+            message="The argument 'date_parser' is deprecated",
+        )
+        return web.DataReader(
+            dataset_name,
+            "famafrench",
+            start=start_date,
+            end=end_date,
+        )
+
+
+def store_dir(dataset_name, data_dir=DATA_DIR):
+    """Directory of the Parquet store for a dataset."""
+    return Path(data_dir) / "ken_french" / dataset_name.replace('/', '_')
+
+
+def _table_titles(description):
+    """
+    Map table keys to titles from the DESCR lines, e.g.
+    '0 : Average Value Weighted Returns -- Monthly (1129 rows x 6 cols)' -> {'0': 'Average Value ...'}
+    """
+    titles = {}
+    for line in description.splitlines():
+        match = re.match(r"\s*(\d+)\s*:\s*(.*?)\s*(\(\d+ rows x \d+ cols\))?\s*$", line)
+        if match:
+            titles[match.group(1)] = match.group(2)
+    return titles
+
+
+def write_ken_french_store(data, dataset_name, data_dir=DATA_DIR):
+    """
+    Write the tables returned by DataReader to the Parquet store.
+
+    Tables are stored as the Excel sheets used to read them back: the
+    (monthly or annual) period index becomes a 'Date' column of period start
+    dates.
+
+    Returns:
+    - Path: The store directory.
+    """
+    path = store_dir(dataset_name, data_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    description = data.get("DESCR", "")
+    titles = _table_titles(description)
+
+    tables = {}
+    for table_key, df in data.items():
+        if table_key == "DESCR":
+            continue
+        name = str(table_key)
+        df = df.copy()
+        if isinstance(df.index, pd.PeriodIndex):
+            df.index = df.index.to_timestamp()
+        if df.index.name is not None or not isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index()
+        df.columns = [str(c) for c in df.columns]
+        df.to_parquet(path / f"{name}.parquet", index=False)
+        tables[name] = {
+            "file": f"{name}.parquet",
+            "title": titles.get(name, ""),
+            "rows": len(df),
+            "columns": list(df.columns),
+        }
+
+    manifest = {
+        "dataset_name": dataset_name,
+        "description": description,
+        "sheet_index": list(tables),
+        "tables": tables,
+    }
+    (path / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return path
+
+
+def write_ken_french_excel(data, excel_path):
+    """Write the DataReader tables to a multi-sheet Excel workbook."""
+    with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
+        # Write the description to the first sheet
+        if "DESCR" in data:
+            description_df = pd.DataFrame([data["DESCR"]], columns=["Description"])
+            description_df.to_excel(writer, sheet_name="Description", index=False)
+
+        # Write each table in the data to subsequent sheets
+        for table_key, df in data.items():
+            if table_key == "DESCR":
+                continue  # Skip the description since it's already handled
+            sheet_name = str(table_key)  # Naming sheets by their table_key
+            df.to_excel(
+                writer, sheet_name=sheet_name[:31]
+            )  # Sheet name limited to 31 characters
+    return excel_path
+
+
+def pull_ken_french_data(
+    dataset_name="Portfolios_Formed_on_INV",
+    data_dir=DATA_DIR,
+    log=True,
+    start_date=START_DATE,
+    end_date=END_DATE,
+    excel=False,
+):
+    """
+    Pulls the Ken French portfolio data into the Parquet store.
+
+    Parameters:
+    - dataset_name (str): Name of the dataset to pull.
+    - data_dir (str): Directory holding the store (and the Excel file).
+    - log (bool): Whether to log the paths written.
+    - start_date (str): Start date in 'YYYY-MM-DD' format.
+    - end_date (str): End date in 'YYYY-MM-DD' format.
+    - excel (bool): Also write the multi-sheet Excel workbook.
+
+    Returns:
+    - Path: The store directory.
+    """
+    data = _read_datareader(dataset_name, start_date, end_date)
+    path = write_ken_french_store(data, dataset_name, data_dir)
+    if log:
+        print(f"Parquet store saved to {path}")
+    if excel:
+        excel_path = write_ken_french_excel(data, Path(data_dir) / f"{dataset_name.replace('/', '_')}.xlsx")
+        if log:
+            print(f"Excel file saved to {excel_path}")
+    return path
+
+
 def pull_ken_french_excel(
     dataset_name="Portfolios_Formed_on_INV",
     data_dir=DATA_DIR,
@@ -30,59 +174,57 @@ def pull_ken_french_excel(
     
     Returns:
     - Excel File: Contains date, return, and other key fields.
+
+    The Parquet store is written alongside the workbook.
     """
+    pull_ken_french_data(dataset_name, data_dir, log=log, start_date=start_date, end_date=end_date, excel=True)
+    return Path(data_dir) / f"{dataset_name.replace('/', '_')}.xlsx"
 
-    data_dir = Path(data_dir)
-    # Suppress the specific FutureWarning about date_parser
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore",
-            category=FutureWarning,
-            message="The argument 'date_parser' is deprecated",
-        )
-        data = web.DataReader(
-            dataset_name,
-            "famafrench",
-            start=start_date,
-            end=end_date,
-        )
-        excel_path = (
-            data_dir / f"{dataset_name.replace('/', '_')}.xlsx"
-        )  # Ensure the name is file-path friendly
-
-        with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
-            # Write the description to the first sheet
-            if "DESCR" in data:
-                description_df = pd.DataFrame([data["DESCR"]], columns=["Description"])
-                description_df.to_excel(writer, sheet_name="Description", index=False)
-
-            # Write each table in the data to subsequent sheets
-            for table_key, df in data.items():
-                if table_key == "DESCR":
-                    continue  # Skip the description since it's already handled
-                sheet_name = str(table_key)  # Naming sheets by their table_key
-                df.to_excel(
-                    writer, sheet_name=sheet_name[:31]
-                )  # Sheet name limited to 31 characters
-    if log:
-        print(f"Excel file saved to {excel_path}")
-    return excel_path
 
+def read_manifest(dataset_name, data_dir=DATA_DIR):
+    """Return the store manifest of a dataset, or None if it has no store."""
+    manifest_file = store_dir(dataset_name, data_dir) / "manifest.json"
+    if not manifest_file.exists():
+        return None
+    return json.loads(manifest_file.read_text())
 
-def load_returns(dataset_name, weighting="value-weighted", data_dir=DATA_DIR):
-    data_dir = Path(data_dir)
-    excel_path = data_dir / f"{dataset_name.replace('/', '_')}.xlsx"
+
+def read_table(dataset_name, table="0", columns=None, data_dir=DATA_DIR):
+    """
+    Read one table of a dataset from the Parquet store.
+
+    Parameters:
+    - dataset_name (str): Name of the dataset.
+    - table (str): Table key (sheet name), or "Description".
+    - columns (list): Columns to read; all when None.
+    - data_dir (str): Directory holding the store.
+
+    Returns:
+    - DataFrame, or the description string for table="Description".
+    """
+    manifest = read_manifest(dataset_name, data_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No Parquet store for {dataset_name} in {data_dir}")
+    table = str(table)
+    if table == "Description":
+        return manifest["description"]
+    if table not in manifest["tables"]:
+        raise ValueError(f"Invalid table {table!r} for {dataset_name}; available: {manifest['sheet_index']}")
+    path = store_dir(dataset_name, data_dir) / manifest["tables"][table]["file"]
+    return pd.read_parquet(path, columns=columns, memory_map=True)
+
+
+def load_returns(dataset_name, weighting="value-weighted", data_dir=DATA_DIR, columns=None):
     if weighting == "value-weighted":
         sheet_name = "0"
     elif weighting == "equal-weighted":
         sheet_name = "1"
     else:
         raise ValueError(f"Invalid weighting: {weighting}")
-    df = pd.read_excel(excel_path, sheet_name=sheet_name)
-    return df
+    return load_sheet(dataset_name, sheet_name=sheet_name, data_dir=data_dir, columns=columns)
 
 
-def load_sheet(dataset_name, sheet_name: str = "0", data_dir=DATA_DIR):
+def load_sheet(dataset_name, sheet_name: str = "0", data_dir=DATA_DIR, columns=None):
     """For example, for dataset_name = '6_Portfolios_2x3V', the full data
     is the description and the 10 tables of returns and properties.
 
@@ -106,9 +248,13 @@ def load_sheet(dataset_name, sheet_name: str = "0", data_dir=DATA_DIR):
     if isinstance(sheet_name, int):
         sheet_name = str(sheet_name)
 
+    # Prefer the Parquet store; fall back to a workbook written by older pulls.
+    if read_manifest(dataset_name, data_dir) is not None:
+        return read_table(dataset_name, sheet_name, columns=columns, data_dir=data_dir)
+
     data_dir = Path(data_dir)
     excel_path = data_dir / f"{dataset_name.replace('/', '_')}.xlsx"
-    df = pd.read_excel(excel_path, sheet_name=sheet_name)
+    df = pd.read_excel(excel_path, sheet_name=sheet_name, usecols=columns)
     if sheet_name == "Description":
         return df.iloc[0, 0]
     return df
@@ -132,12 +278,9 @@ def _demo():
 
 
 if __name__ == "__main__":
-    _ = pull_ken_french_excel(
-        dataset_name="6_Portfolios_2x3",
-    )  # Save 6_Portfolios_2x3.xlsx
-    _ = pull_ken_french_excel(
-        dataset_name="25_Portfolios_5x5",
-    )  # Save 25_Portfolios_5x5.xlsx
-    _ = pull_ken_french_excel(
-        dataset_name="100_Portfolios_10x10",
-    )  # Save 100_Portfolios_10x10.xlsx
+    parser = argparse.ArgumentParser(description="Pull Ken French portfolio data into the Parquet store.")
+    parser.add_argument("--excel", action="store_true", help="Also write the multi-sheet Excel workbooks")
+    args = parser.parse_args()
+
+    for dataset_name in ["6_Portfolios_2x3", "25_Portfolios_5x5", "100_Portfolios_10x10"]:
+        _ = pull_ken_french_data(dataset_name=dataset_name, excel=args.excel)
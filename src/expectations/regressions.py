@@ -6,6 +6,7 @@ from load_data import load_crsp_index, load_ken_french, load_and_compute_log_ret
 import matplotlib.pyplot as plt
 from sklearn.cross_decomposition import PLSRegression
 from settings import config
+from three_pass_filter import expanding_forecasts, first_stage_slopes, second_stage_factors
 script_dir = os.path.dirname(os.path.abspath(__file__))
 save_path = os.path.join(script_dir, "../reports/plots/")  # Correct relative path
 os.makedirs(save_path, exist_ok=True)
@@ -18,45 +19,109 @@ DATA_DIR = config("DATA_DIR")
 START_DATE = config("START_DATE")
 END_DATE = config("END_DATE")
 
-def first_stage_regressions(v_df, y_series, h=1):
+def _load_returns(returns=None):
+    """
+    Excess returns from `returns` when given (e.g. preloaded by run_regressions.py), else from disk.
+    The entry points only derive new series from it, so it may be a read-only shared view.
+    """
+    return load_and_compute_log_returns() if returns is None else returns
+
+def _load_portfolios(dataset_name, weighting, portfolios=None):
+    """
+    Ken French portfolio data from `portfolios` when given, else from disk.
+    A frame with a 'Date' column is copied, since the entry points convert that column in place.
+    """
+    if portfolios is None:
+        return load_ken_french(dataset_name, weighting)
+    return portfolios.copy() if "Date" in portfolios.columns else portfolios
+
+def _first_stage_ols(v_i, y_series, h=1):
+    """
+    Slope of one portfolio's valuation ratio on y_{t+h} with statsmodels.
+    `v_i` is the numeric column with missing values already dropped.
+    """
+    # Align with future excess returns: y_{t+h}
+    y_shifted = y_series.shift(-h).loc[v_i.index]
+    # Only keep dates where both v_i and y_shifted are available
+    valid = v_i.index.intersection(y_shifted.dropna().index)
+    #if len(valid) < 10:
+        #continue  # Skip if too few observations
+    v_i = v_i.loc[valid]
+    y_i = y_shifted.loc[valid]
+    X = sm.add_constant(y_i)
+    model = sm.OLS(v_i, X).fit()
+    # Use positional indexing to get the slope coefficient (position 1)
+    return model.params.iloc[1]
+
+def first_stage_regressions(v_df, y_series, h=1, engine="numpy"):
     """
     For each portfolio (each column in v_df), regress the valuation ratio at time t 
     on the future excess market return y_{t+h} to estimate the sensitivity (phi).
     Returns a dictionary of slope coefficients (phi_i) for each portfolio.
+
+    engine="numpy" computes all slopes at once in closed form (see three_pass_filter);
+    columns it cannot estimate (fewer than two observations, no variation in y) fall
+    back to statsmodels. engine="statsmodels" fits one OLS per column.
     """
+    if engine not in ("numpy", "statsmodels"):
+        raise ValueError(f"Unknown engine {engine!r}; expected 'numpy' or 'statsmodels'")
+    v_num = v_df.apply(pd.to_numeric, errors='coerce')
+    if engine == "numpy":
+        y_future = y_series.shift(-h).loc[v_num.index].to_numpy(dtype=float)
+        phi, _, _ = first_stage_slopes(v_num.to_numpy(dtype=float), y_future)
+
     phi_dict = {}
-    for col in v_df.columns:
-        # Convert the column to numeric
-        v_i = pd.to_numeric(v_df[col], errors='coerce').dropna()
+    for i, col in enumerate(v_df.columns):
+        v_i = v_num[col].dropna()
         if v_i.empty:
             continue
-        # Align with future excess returns: y_{t+h}
-        y_shifted = y_series.shift(-h).loc[v_i.index]
-        # Only keep dates where both v_i and y_shifted are available
-        valid = v_i.index.intersection(y_shifted.dropna().index)
-        #if len(valid) < 10:
-            #continue  # Skip if too few observations
-        v_i = v_i.loc[valid]
-        y_i = y_shifted.loc[valid]
-        X = sm.add_constant(y_i)
+        if engine == "numpy" and np.isfinite(phi[i]):
+            phi_dict[col] = phi[i]
+            continue
         try:
-            model = sm.OLS(v_i, X).fit()
-            # Use positional indexing to get the slope coefficient (position 1)
-            phi_dict[col] = model.params.iloc[1]
+            phi_dict[col] = _first_stage_ols(v_i, y_series, h)
         except Exception as e:
             print(f"Error in first stage for column {col}: {e}")
     return phi_dict
 
-def second_stage_regressions(v_df, phi_dict):
+def second_stage_regressions(v_df, phi_dict, engine="numpy"):
     """
     For each time t, run a cross-sectional regression of the observed portfolio valuation ratios 
     (v_{i,t}) on the estimated loadings (phi_i). We build a DataFrame for the independent 
     variable so that the regression returns a Series with named coefficients.
     The coefficient on the loadings (named 'phi') is taken as the latent factor F_t.
+
+    Every date shares the design matrix [1, phi], so engine="numpy" gets all F_t from one
+    batched least squares (see three_pass_filter); engine="statsmodels" fits one OLS per date.
+    Dates with a missing valuation ratio give NaN with either engine.
     """
+    if engine not in ("numpy", "statsmodels"):
+        raise ValueError(f"Unknown engine {engine!r}; expected 'numpy' or 'statsmodels'")
+    valid_cols = list(phi_dict.keys())
+    V = None
+    if engine == "numpy" and valid_cols:
+        try:
+            V = v_df[valid_cols].to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            pass  # Non-numeric entries: let the per-date path skip those rows.
+    if engine == "numpy" and not valid_cols:
+        F_series = pd.Series(dtype=float)
+    elif V is not None:
+        phi = np.array([phi_dict[col] for col in valid_cols], dtype=float)
+        F_series = pd.Series(second_stage_factors(V, phi), index=v_df.index)
+    else:
+        F_series = _second_stage_ols(v_df, valid_cols, phi_dict)
+    # Set frequency to match the input v_df if possible.
+    try:
+        F_series.index = pd.DatetimeIndex(F_series.index).asfreq(v_df.index.freq)
+    except Exception:
+        pass  # If unable to set frequency, leave as is.
+    return F_series
+
+def _second_stage_ols(v_df, valid_cols, phi_dict):
+    """One statsmodels cross-sectional OLS per date; returns the unfrequenced F_t series."""
     F_list = []
     dates = []
-    valid_cols = list(phi_dict.keys())
     # Build a DataFrame for the loadings with a constant column.
     X_df = pd.DataFrame({
         'const': 1,
@@ -78,13 +143,7 @@ def second_stage_regressions(v_df, phi_dict):
             dates.append(t)
         except Exception as e:
             print(f"Error in second stage regression at time {t}: {e}")
-    F_series = pd.Series(F_list, index=dates)
-    # Set frequency to match the input v_df if possible.
-    try:
-        F_series.index = pd.DatetimeIndex(F_series.index).asfreq(v_df.index.freq)
-    except Exception:
-        pass  # If unable to set frequency, leave as is.
-    return F_series
+    return pd.Series(F_list, index=dates)
 
 
 def third_stage_regression(F_series, y_series, h=1):
@@ -95,7 +154,7 @@ def third_stage_regression(F_series, y_series, h=1):
     """
     y_future = y_series.shift(-h)
     common_dates = F_series.index.intersection(y_future.index)
-    F_aligned = F_series.loc[common_dates]
+    F_aligned = F_series.loc[common_dates].rename("F")
     y_aligned = y_future.loc[common_dates].astype(float)
 
     # <<< ADD THIS GUARD >>>
@@ -104,10 +163,11 @@ def third_stage_regression(F_series, y_series, h=1):
         return None
 
     X = sm.add_constant(F_aligned)
-    model = sm.OLS(y_aligned, X).fit()
+    # The last h dates have no y_{t+h}; drop them (and dates without F_t).
+    model = sm.OLS(y_aligned, X, missing="drop").fit()
     return model
 
-def run_in_sample_pls(dataset_name, weighting="value-weighted", h=1, end_date=None):
+def run_in_sample_pls(dataset_name, weighting="value-weighted", h=1, end_date=None, returns=None, portfolios=None):
     """
     Runs the in-sample three-stage PLS procedure:
       1. Loads and aligns excess market returns (market return minus TB3MS) and Ken French portfolio data.
@@ -116,12 +176,14 @@ def run_in_sample_pls(dataset_name, weighting="value-weighted", h=1, end_date=No
       4. Runs the predictive regression of excess return y_{t+h} on F_t.
     
     Returns a dictionary with intermediate results.
+    `returns` and `portfolios` take preloaded excess returns and Ken French data
+    (see run_regressions.py); both are read from disk when None.
     """
     # Compute excess returns
-    y_excess = load_and_compute_log_returns()
+    y_excess = _load_returns(returns)
     
     # Load Ken French portfolio data
-    ken_df = load_ken_french(dataset_name, weighting)
+    ken_df = _load_portfolios(dataset_name, weighting, portfolios)
     if "Date" in ken_df.columns:
         ken_df["Date"] = pd.to_datetime(ken_df["Date"])
         ken_df = ken_df.set_index("Date")
@@ -189,19 +251,30 @@ def run_recursive_forecast(
     h=1, 
     start_train_date='1930-01-01', 
     end_train_date='1980-01-01',
-    end_forecast_date='2011-01-01'
+    end_forecast_date='2011-01-01',
+    method="incremental",
+    returns=None,
+    portfolios=None
 ):
     """
     Implements a recursive (rolling-window) out-of-sample forecasting procedure.
     For each forecast date (after the training period), re-estimates the model using data 
     available up to that point, and generates a forecast for y_{t+h} (excess return).
+
+    method="refit" re-runs the three stages on every window. method="incremental"
+    (default) gives the same forecasts from running sums that are updated as each
+    month enters the window (see three_pass_filter.expanding_forecasts).
     
     Returns a dictionary containing forecasted series, actual excess returns, and the out-of-sample R².
+    `returns` and `portfolios` take preloaded excess returns and Ken French data
+    (see run_regressions.py); both are read from disk when None.
     """
+    if method not in ("incremental", "refit"):
+        raise ValueError(f"Unknown method {method!r}; expected 'incremental' or 'refit'")
     # Compute excess returns
-    y_excess = load_and_compute_log_returns()
+    y_excess = _load_returns(returns)
     
-    ken_df = load_ken_french(dataset_name, weighting)
+    ken_df = _load_portfolios(dataset_name, weighting, portfolios)
     if "Date" in ken_df.columns:
         ken_df["Date"] = pd.to_datetime(ken_df["Date"])
         ken_df = ken_df.set_index("Date")
@@ -223,35 +296,42 @@ def run_recursive_forecast(
     forecast_dates = v_df.loc[train_end:].index
     forecasts = {}
     actuals = {}
-    
-    for forecast_date in forecast_dates:
-        train_idx = v_df.index < forecast_date
-        v_train = v_df.loc[train_idx]
-        y_train = y_excess.loc[train_idx]
-        #if len(v_train) < 30:
-            #continue
-        phi_dict = first_stage_regressions(v_train, y_train, h)
-        if not phi_dict:
-            continue
-        F_train = second_stage_regressions(v_train, phi_dict)
-        if F_train.empty:
-            continue
-        F_forecast = F_train.iloc[-1]
-        third_model = third_stage_regression(F_train, y_train, h)
-        # determine forecast_value in all cases
-        if third_model is None or 'F' not in third_model.params:
-            logger.warning(
-                f"Skipping forecast for {forecast_date}: no 'F' coefficient found."
-            )
-            forecast_value = np.nan
-        else:
-            forecast_value = (
-                third_model.params['const']
-                + third_model.params['F'] * F_forecast
-            )
-        forecasts[forecast_date] = forecast_value
-        if forecast_date in y_excess.index:
-            actuals[forecast_date] = y_excess.loc[forecast_date]
+
+    if method == "incremental":
+        start = len(v_df) - len(forecast_dates)
+        values, fitted = expanding_forecasts(v_df.to_numpy(dtype=float),
+                                             y_excess.to_numpy(dtype=float), h, start)
+        forecasts = dict(zip(v_df.index[fitted], values[fitted]))
+        actuals = y_excess.loc[fitted].to_dict()
+    else:
+        for forecast_date in forecast_dates:
+            train_idx = v_df.index < forecast_date
+            v_train = v_df.loc[train_idx]
+            y_train = y_excess.loc[train_idx]
+            #if len(v_train) < 30:
+                #continue
+            phi_dict = first_stage_regressions(v_train, y_train, h)
+            if not phi_dict:
+                continue
+            F_train = second_stage_regressions(v_train, phi_dict)
+            if F_train.empty:
+                continue
+            F_forecast = F_train.iloc[-1]
+            third_model = third_stage_regression(F_train, y_train, h)
+            # determine forecast_value in all cases
+            if third_model is None or 'F' not in third_model.params:
+                logger.warning(
+                    f"Skipping forecast for {forecast_date}: no 'F' coefficient found."
+                )
+                forecast_value = np.nan
+            else:
+                forecast_value = (
+                    third_model.params['const']
+                    + third_model.params['F'] * F_forecast
+                )
+            forecasts[forecast_date] = forecast_value
+            if forecast_date in y_excess.index:
+                actuals[forecast_date] = y_excess.loc[forecast_date]
     
     forecast_series = pd.Series(forecasts)
     actual_series = pd.Series(actuals)
@@ -346,13 +426,17 @@ def aggregate_to_annual_returns(returns_series):
 # Annual In-Sample and Recursive Forecasting Functions
 #############################
 
-def run_in_sample_pls_annual(dataset_name, weighting="BE_FYt-1_to_ME_June_t", h=1, end_date='1980-01-01'):
+def run_in_sample_pls_annual(dataset_name, weighting="BE_FYt-1_to_ME_June_t", h=1, end_date='1980-01-01',
+                             returns=None, portfolios=None):
     """
     Runs the in-sample three-stage PLS procedure on annualized data.
       - Aggregates monthly log returns to annual log returns (by summing).
       - Selects a single snapshot for predictors from each year (using the June observation if available).
       - Uses h=1 on the annual series (i.e., forecasting next year's log return).
 
+    `returns` and `portfolios` take preloaded excess returns and Ken French data
+    (see run_regressions.py); both are read from disk when None.
+
     Returns:
         dict: A dictionary with intermediate results including:
             - phi: Dictionary of first-stage estimated loadings.
@@ -362,7 +446,7 @@ def run_in_sample_pls_annual(dataset_name, weighting="BE_FYt-1_to_ME_June_t", h=
             - y_excess: The aligned annual log returns Series.
     """
     # Compute monthly log returns and aggregate to annual
-    monthly_excess = load_and_compute_log_returns()
+    monthly_excess = _load_returns(returns)
     annual_excess = aggregate_to_annual_returns(monthly_excess)
     # Convert annual_excess index to annual frequency (set to January 1 of each year)
     annual_excess.index = pd.to_datetime(annual_excess.index).to_period('Y').to_timestamp()
@@ -370,7 +454,7 @@ def run_in_sample_pls_annual(dataset_name, weighting="BE_FYt-1_to_ME_June_t", h=
     annual_excess = annual_excess.groupby(annual_excess.index).first()
     
     # Load monthly predictor data and select a snapshot for each year.
-    ken_df = load_ken_french(dataset_name, weighting)
+    ken_df = _load_portfolios(dataset_name, weighting, portfolios)
     if "Date" in ken_df.columns:
         ken_df["Date"] = pd.to_datetime(ken_df["Date"])
         ken_df = ken_df.set_index("Date")
@@ -423,7 +507,9 @@ def run_recursive_forecast_annual(
     start_train_year=1930, 
     end_train_year=1979,
     end_forecast_year=2010,
-    n_components=1
+    n_components=1,
+    returns=None,
+    portfolios=None
 ):
     """
     Implements a recursive (expanding window) out-of-sample forecasting procedure on annual data.
@@ -434,13 +520,16 @@ def run_recursive_forecast_annual(
       3. Runs a predictive OLS regression on the training window.
       4. Uses the last observation of the PLS factor to forecast next year's log return.
     
+    `returns` and `portfolios` take preloaded excess returns and Ken French data
+    (see run_regressions.py); both are read from disk when None.
+
     Returns:
         A tuple (forecast_series, actual_series, R2_oos) for the out-of-sample period.
     """
-    monthly_excess = load_and_compute_log_returns()
+    monthly_excess = _load_returns(returns)
     annual_excess = aggregate_to_annual_returns(monthly_excess)
     
-    ken_df = load_ken_french(dataset_name, weighting)
+    ken_df = _load_portfolios(dataset_name, weighting, portfolios)
     if "Date" in ken_df.columns:
         ken_df["Date"] = pd.to_datetime(ken_df["Date"])
         ken_df = ken_df.set_index("Date")
@@ -0,0 +1,301 @@
+"""
+Grid runner for the cross-section present-value regressions.
+
+Runs the in-sample and recursive out-of-sample three-pass regressions of
+regressions.py for every (dataset, weighting, h, frequency) job of a grid:
+
+    - The CRSP excess returns and each (dataset, weighting) Ken French table are
+      loaded once, in the parent process, and shared with the workers as
+      read-only memory-mapped blocks (see shared_inputs.py). Workers never read
+      the CSV/Excel/Parquet inputs themselves.
+    - Jobs run on a process pool (default), on a Dask cluster (the scheduler at
+      DASK_SCHEDULER_ADDRESS, else a local one), or serially.
+    - Results are collected into one tidy table with one row per job:
+      dataset, weighting, h, frequency, r2_in_sample, r2_out_of_sample,
+      n_forecasts, seconds, error. A failing job is reported in `error`
+      and does not stop the grid.
+    - OUTPUT_DIR/expectations_grid.csv holds the table, and
+      OUTPUT_DIR/expectations_grid_report.txt the timing report.
+
+Usage:
+    python run_regressions.py
+    python run_regressions.py --datasets 6_Portfolios_2x3 --horizons 1 3 12 --backend dask
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+
+import pandas as pd
+
+import regressions
+import shared_inputs
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import execution_context
+from load_data import load_and_compute_log_returns, load_ken_french
+from settings import config
+
+OUTPUT_DIR = Path(config("OUTPUT_DIR"))
+
+DATASETS = {
+    '6-Portfolios': '6_Portfolios_2x3',
+    '25-Portfolios': '25_Portfolios_5x5',
+    '100-Portfolios': '100_Portfolios_10x10'
+}
+WEIGHTINGS = ['BE_FYt-1_to_ME_June_t']
+HORIZONS = [1]
+FREQUENCIES = ['monthly', 'annual']
+
+# Sample splits used in run_regressions.ipynb
+END_DATE = '2262-04-11'  # Keep the full sample in-sample
+START_TRAIN = '1930-01-01'
+END_TRAIN = '1980-01-01'
+END_FORECAST = '2011-01-01'
+START_TRAIN_YEAR = 1930
+END_TRAIN_YEAR = 1979
+END_FORECAST_YEAR = 2010
+
+BACKENDS = ("process", "dask", "serial")
+
+
+def make_grid(datasets=None, weightings=None, horizons=None, frequencies=None):
+    """All (dataset, weighting, h, frequency) jobs, as a list of dicts."""
+    return [
+        dict(dataset=d, weighting=w, h=int(h), frequency=f)
+        for d, w, h, f in product(datasets or list(DATASETS.values()), weightings or WEIGHTINGS,
+                                  horizons or HORIZONS, frequencies or FREQUENCIES)
+    ]
+
+
+def load_inputs(jobs):
+    """
+    Load the inputs of a grid once: the excess returns and one Ken French table
+    per (dataset, weighting) pair.
+
+    Returns:
+        dict: {"returns": Series, "portfolios": {(dataset, weighting): DataFrame}}
+    """
+    pairs = dict.fromkeys((job["dataset"], job["weighting"]) for job in jobs)
+    return {
+        "returns": load_and_compute_log_returns(),
+        "portfolios": {pair: load_ken_french(*pair) for pair in pairs},
+    }
+
+
+def run_job(job, inputs, verbose=False):
+    """
+    Run the in-sample and recursive regressions of one job on preloaded inputs.
+
+    Returns:
+        dict: the job's row of the results table.
+    """
+    row = dict(job, r2_in_sample=float("nan"), r2_out_of_sample=float("nan"),
+               n_forecasts=0, seconds=0.0, error=None)
+    data = dict(returns=inputs["returns"], portfolios=inputs["portfolios"][job["dataset"], job["weighting"]])
+    start = time.perf_counter()
+    out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with out:
+            if job["frequency"] == "monthly":
+                in_sample = regressions.run_in_sample_pls(
+                    job["dataset"], job["weighting"], job["h"], end_date=END_DATE, **data)
+                recursive = regressions.run_recursive_forecast(
+                    job["dataset"], job["weighting"], job["h"],
+                    start_train_date=START_TRAIN, end_train_date=END_TRAIN,
+                    end_forecast_date=END_FORECAST, **data)
+                forecast_series, R2_oos = recursive["forecast_series"], recursive["R2_oos"]
+            elif job["frequency"] == "annual":
+                in_sample = regressions.run_in_sample_pls_annual(
+                    job["dataset"], job["weighting"], job["h"], end_date=END_DATE, **data)
+                forecast_series, _, R2_oos = regressions.run_recursive_forecast_annual(
+                    job["dataset"], job["weighting"], job["h"],
+                    start_train_year=START_TRAIN_YEAR, end_train_year=END_TRAIN_YEAR,
+                    end_forecast_year=END_FORECAST_YEAR, **data)
+            else:
+                raise ValueError(f"Unknown frequency {job['frequency']!r}; expected 'monthly' or 'annual'")
+        if in_sample["third_model"] is not None:
+            row["r2_in_sample"] = in_sample["third_model"].rsquared
+        row["r2_out_of_sample"] = R2_oos
+        row["n_forecasts"] = int(forecast_series.notna().sum())
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+# Inputs of the current pool worker, attached once by the pool initializer.
+_worker_inputs = None
+
+
+def _init_worker(handles):
+    global _worker_inputs
+    _worker_inputs = shared_inputs.attach_inputs(handles)
+
+
+def _run_worker_job(job):
+    return run_job(job, _worker_inputs)
+
+
+def _run_shared_job(job, handles):
+    return run_job(job, shared_inputs.attach_inputs(handles))
+
+
+def _report_progress(row, done, total, start):
+    status = "ok" if row["error"] is None else f"FAILED ({row['error']})"
+    print(f"[{done}/{total}] {time.perf_counter() - start:7.1f}s  {row['dataset']} {row['weighting']} "
+          f"h={row['h']} {row['frequency']}: {row['seconds']:.1f}s {status}")
+
+
+def _run_process_pool(jobs, inputs, max_workers, start):
+    # Workers map the inputs from shared .npy blocks instead of receiving a pickled copy each.
+    rows = []
+    with shared_inputs.shared_directory() as directory:
+        handles = shared_inputs.share_inputs(inputs, directory)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(handles,)) as pool:
+            futures = [pool.submit(_run_worker_job, job) for job in jobs]
+            for future in as_completed(futures):
+                rows.append(future.result())
+                _report_progress(rows[-1], len(rows), len(jobs), start)
+    return rows
+
+
+def _run_dask(jobs, inputs, max_workers, start):
+    from dask.distributed import as_completed as dask_as_completed
+
+    scheduler = config("DASK_SCHEDULER_ADDRESS", default=None)
+    rows = []
+    with contextlib.ExitStack() as stack:
+        if scheduler:
+            stack.enter_context(execution_context.use_mode("remote"))
+        else:
+            stack.enter_context(execution_context.use_mode("local", n_workers=max_workers, threads_per_worker=1))
+        client = execution_context.get_client()
+        if scheduler:
+            # Remote workers cannot see local files: broadcast the inputs to every worker once.
+            [inputs_future] = client.scatter([inputs], broadcast=True)
+            futures = [client.submit(run_job, job, inputs_future, pure=False) for job in jobs]
+        else:
+            directory = stack.enter_context(shared_inputs.shared_directory())
+            handles = shared_inputs.share_inputs(inputs, directory)
+            futures = [client.submit(_run_shared_job, job, handles, pure=False) for job in jobs]
+        for future in dask_as_completed(futures, loop=client.loop):
+            rows.append(future.result())
+            _report_progress(rows[-1], len(rows), len(jobs), start)
+    return rows
+
+
+def run_grid(jobs, backend="process", max_workers=None, inputs=None):
+    """
+    Run every job of the grid and return the tidy results table.
+
+    Args:
+        jobs (list): jobs from `make_grid`.
+        backend (str): "process", "dask" or "serial".
+        max_workers (int): pool size; defaults to min(#jobs, #CPUs).
+        inputs (dict): preloaded inputs from `load_inputs`; loaded when None.
+
+    Returns:
+        DataFrame: one row per job, in grid order.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+    start = time.perf_counter()
+    if inputs is None:
+        inputs = load_inputs(jobs)
+        print(f"Loaded inputs in {time.perf_counter() - start:.1f}s")
+    max_workers = max_workers or max(1, min(len(jobs), os.cpu_count() or 1))
+
+    if backend == "serial" or len(jobs) <= 1:
+        rows = []
+        for job in jobs:
+            rows.append(run_job(job, inputs))
+            _report_progress(rows[-1], len(rows), len(jobs), start)
+    elif backend == "process":
+        rows = _run_process_pool(jobs, inputs, max_workers, start)
+    else:
+        rows = _run_dask(jobs, inputs, max_workers, start)
+
+    key = ["dataset", "weighting", "h", "frequency"]
+    order = pd.DataFrame(jobs).reset_index()
+    results = pd.DataFrame(rows, columns=key + ["r2_in_sample", "r2_out_of_sample", "n_forecasts",
+                                                "seconds", "error"])
+    results = order.merge(results, on=key).sort_values("index").drop(columns="index").reset_index(drop=True)
+    results.attrs["wall_seconds"] = round(time.perf_counter() - start, 3)
+    return results
+
+
+def write_report(results, backend, output_dir=OUTPUT_DIR):
+    """
+    Write the results table (expectations_grid.csv) and the timing report
+    (expectations_grid_report.txt) to `output_dir`.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results.to_csv(output_dir / "expectations_grid.csv", index=False)
+
+    wall = results.attrs.get("wall_seconds", float("nan"))
+    cpu = results["seconds"].sum()
+    failed = results[results["error"].notna()]
+    lines = [
+        f"Expectations grid: {len(results)} jobs on backend '{backend}'",
+        f"Wall time: {wall:.1f}s; summed job time: {cpu:.1f}s; speed-up: {cpu / wall if wall else float('nan'):.2f}x",
+        f"Failed jobs: {len(failed)}",
+        "",
+        results.drop(columns="error").to_string(index=False),
+    ]
+    if not failed.empty:
+        lines += ["", "Errors:"] + [
+            f"  {r.dataset} {r.weighting} h={r.h} {r.frequency}: {r.error}" for r in failed.itertuples()
+        ]
+    (output_dir / "expectations_grid_report.txt").write_text("\n".join(lines) + "\n")
+
+
+def write_summary_tables(results, tables_dir, h=1):
+    """
+    Write the R² summary tables of run_regressions.ipynb
+    (summary_table_monthly.tex, summary_table_annual.tex) for horizon `h`.
+    """
+    tables_dir = Path(tables_dir)
+    tables_dir.mkdir(parents=True, exist_ok=True)
+    labels = {name: label for label, name in DATASETS.items()}
+    for frequency in FREQUENCIES:
+        rows = results[(results["frequency"] == frequency) & (results["h"] == h)]
+        summary = pd.DataFrame({
+            'R2 In-Sample': rows["r2_in_sample"].to_numpy(),
+            'R2 Out-of-Sample': rows["r2_out_of_sample"].to_numpy(),
+        }, index=rows["dataset"].map(lambda d: labels.get(d, d)).to_numpy())
+        summary.to_latex(tables_dir / f'summary_table_{frequency}.tex', index=True, float_format='%.6f')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", nargs="+", default=list(DATASETS.values()))
+    parser.add_argument("--weightings", nargs="+", default=WEIGHTINGS)
+    parser.add_argument("--horizons", type=int, nargs="+", default=HORIZONS)
+    parser.add_argument("--frequencies", nargs="+", default=FREQUENCIES, choices=FREQUENCIES)
+    parser.add_argument("--backend", default="process", choices=BACKENDS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--tables-dir", type=Path, default=None,
+                        help="Also write the LaTeX R² summary tables (h=1) to this directory")
+    args = parser.parse_args()
+
+    jobs = make_grid(args.datasets, args.weightings, args.horizons, args.frequencies)
+    results = run_grid(jobs, backend=args.backend, max_workers=args.workers)
+    write_report(results, args.backend, args.output_dir)
+    if args.tables_dir is not None:
+        write_summary_tables(results, args.tables_dir)
+    print()
+    print(results.to_string(index=False))
+    print(f"\nResults and timing report written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Zero-copy sharing of the expectations inputs across worker processes.
+
+run_regressions.py loads the CRSP excess returns and the Ken French predictor
+matrices once. Pickling them into every worker would cost one copy per process.
+Instead, `share_inputs` writes each of them once into memory-mapped .npy blocks:
+
+    - <directory>/returns.values.npy, returns.index.npy
+    - <directory>/portfolios_<i>.values.npy, portfolios_<i>.index.npy
+
+and returns small picklable handles (paths, column names). `attach_inputs`
+maps the blocks read-only in a worker and rebuilds the Series/DataFrames as
+views, so every process reads the same pages of the OS page cache. Memory use
+and start-up stay flat as the number of workers grows. Memory-mapped files are
+used rather than `multiprocessing.shared_memory` segments: they need no
+explicit unlink, and they also work for local Dask workers, which are not
+children of the process that created the data.
+
+Usage:
+    with shared_directory() as directory:
+        handles = share_inputs(inputs, directory)
+        ...  # send `handles` to the workers
+        inputs = attach_inputs(handles)  # in each worker
+"""
+import contextlib
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from settings import config
+
+SHARED_DIR = Path(config("DATA_DIR")) / "expectations_shared"
+
+# Inputs attached in this process, keyed by directory: jobs reuse the mapping.
+_attached = {}
+
+
+@contextlib.contextmanager
+def shared_directory(parent=None):
+    """Temporary directory for the blocks of one run, removed on exit."""
+    parent = Path(parent) if parent is not None else SHARED_DIR
+    parent.mkdir(parents=True, exist_ok=True)
+    directory = Path(tempfile.mkdtemp(dir=parent))
+    try:
+        yield directory
+    finally:
+        _attached.pop(str(directory), None)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _save(path, values):
+    np.save(path, np.ascontiguousarray(values))
+    return str(path)
+
+
+def share_frame(obj, directory, key):
+    """
+    Write a Series or DataFrame with a datetime index to memory-mapped blocks.
+
+    A 'Date' column (as returned by load_ken_french) becomes the index, and the
+    other columns are stored as one float64 (dates x columns) block, coerced
+    with pd.to_numeric as the regressions do.
+
+    Returns:
+        dict: handle for `attach_frame`.
+    """
+    directory = Path(directory)
+    if isinstance(obj, pd.DataFrame) and "Date" in obj.columns:
+        obj = obj.set_index(pd.to_datetime(obj["Date"])).drop(columns="Date")
+    index = pd.DatetimeIndex(obj.index)
+    handle = {
+        "kind": "series" if isinstance(obj, pd.Series) else "frame",
+        "index": _save(directory / f"{key}.index.npy", index.asi8),
+        "index_name": index.name,
+    }
+    if handle["kind"] == "series":
+        handle["name"] = obj.name
+        values = pd.to_numeric(obj, errors="coerce").to_numpy(dtype=float)
+    else:
+        handle["columns"] = list(obj.columns)
+        values = obj.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    handle["values"] = _save(directory / f"{key}.values.npy", values)
+    return handle
+
+
+def attach_frame(handle):
+    """Read-only Series/DataFrame view over the blocks written by `share_frame`."""
+    values = np.load(handle["values"], mmap_mode="r")
+    index = pd.DatetimeIndex(np.load(handle["index"]).view("M8[ns]"), name=handle["index_name"])
+    if handle["kind"] == "series":
+        return pd.Series(values, index=index, name=handle["name"], copy=False)
+    return pd.DataFrame(values, index=index, columns=handle["columns"], copy=False)
+
+
+def share_inputs(inputs, directory):
+    """
+    Write the inputs of run_regressions.load_inputs to `directory`.
+
+    Returns:
+        dict: picklable handles for `attach_inputs`.
+    """
+    return {
+        "directory": str(directory),
+        "returns": share_frame(inputs["returns"], directory, "returns"),
+        "portfolios": [
+            (pair, share_frame(df, directory, f"portfolios_{i}"))
+            for i, (pair, df) in enumerate(inputs["portfolios"].items())
+        ],
+    }
+
+
+def attach_inputs(handles):
+    """
+    Inputs in the layout of run_regressions.load_inputs, as views over the
+    shared blocks. Attached once per process and directory.
+    """
+    key = handles["directory"]
+    if key not in _attached:
+        _attached[key] = {
+            "returns": attach_frame(handles["returns"]),
+            "portfolios": {tuple(pair): attach_frame(h) for pair, h in handles["portfolios"]},
+        }
+    return _attached[key]
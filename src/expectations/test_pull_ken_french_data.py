@@ -83,3 +83,38 @@ def test_load_sheet(tmp_path, monkeypatch):
     
     df_loaded = pull_ken_french_data.load_sheet(dataset_name=dataset_name, sheet_name="0", data_dir=tmp_path)
     pd.testing.assert_frame_equal(df_loaded, df_dummy)
+
+# Test that pull_ken_french_data writes one Parquet file per table plus a manifest
+def test_pull_ken_french_data_store(tmp_path, monkeypatch):
+    descr = (
+        "6 Portfolios 2x3\n----------------\n\n"
+        "  0 : Average Value Weighted Returns -- Monthly (3 rows x 2 cols)\n"
+        "  1 : Average Equal Weighted Returns -- Monthly (3 rows x 2 cols)"
+    )
+    index = pd.period_range("2020-01", periods=3, freq="M", name="Date")
+    df_vw = pd.DataFrame({"SMALL LoBM": [1.5, 2.5, 3.5], "BIG HiBM": [0.5, -1.0, 2.0]}, index=index)
+    df_ew = df_vw * 2
+
+    def dummy_datareader(dataset_name, source, start, end):
+        return {"DESCR": descr, 0: df_vw, 1: df_ew}
+
+    dummy_web = type("DummyWeb", (), {"DataReader": dummy_datareader})
+    monkeypatch.setattr(pull_ken_french_data, "web", dummy_web)
+
+    store = pull_ken_french_data.pull_ken_french_data(dataset_name="Test_Dataset", data_dir=tmp_path, log=False)
+    assert not (tmp_path / "Test_Dataset.xlsx").exists(), "Excel output should be opt-in"
+
+    manifest = pull_ken_french_data.read_manifest("Test_Dataset", data_dir=tmp_path)
+    assert manifest["sheet_index"] == ["0", "1"]
+    assert manifest["tables"]["0"]["rows"] == 3
+    assert manifest["tables"]["1"]["title"] == "Average Equal Weighted Returns -- Monthly"
+    assert sorted(p.name for p in store.glob("*.parquet")) == ["0.parquet", "1.parquet"]
+
+    # Tables come back like the Excel sheets: a 'Date' column of period start dates
+    df_loaded = pull_ken_french_data.load_sheet("Test_Dataset", sheet_name=1, data_dir=tmp_path)
+    expected = df_ew.set_axis(index.to_timestamp(), axis=0).reset_index()
+    pd.testing.assert_frame_equal(df_loaded, expected)
+
+    subset = pull_ken_french_data.load_returns("Test_Dataset", data_dir=tmp_path, columns=["Date", "BIG HiBM"])
+    assert list(subset.columns) == ["Date", "BIG HiBM"]
+    assert pull_ken_french_data.load_sheet("Test_Dataset", "Description", data_dir=tmp_path) == descr
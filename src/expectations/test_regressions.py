@@ -22,6 +22,21 @@ def dummy_load_ken_french(dataset_name, weighting):
     }
     return pd.DataFrame(data)
 
+# --- Helpers ---
+def _random_panel(seed=0, n_dates=120, n_cols=12):
+    """Monthly panel that loads on next month's return, with gaps, an empty and a one-observation column."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start="1950-01-31", periods=n_dates, freq="ME")
+    y_series = pd.Series(rng.normal(0, 0.05, n_dates), index=dates)
+    loadings = rng.normal(1, 0.5, n_cols)
+    v = np.outer(y_series.shift(-1).fillna(0), loadings) + rng.normal(0, 0.1, (n_dates, n_cols))
+    v[rng.random(v.shape) < 0.1] = np.nan
+    v_df = pd.DataFrame(v, index=dates, columns=[f"P{i}" for i in range(n_cols)])
+    v_df["Empty"] = np.nan        # skipped
+    v_df["Single"] = np.nan
+    v_df.iloc[3, -1] = 0.5        # one observation: falls back to statsmodels
+    return v_df, y_series
+
 # --- Tests for first_stage_regressions ---
 def test_first_stage_regressions():
     # Create synthetic y_series and v_df where v = 2 * y_future.
@@ -36,6 +51,15 @@ def test_first_stage_regressions():
     assert "A" in phi_dict, "Expected key 'A' not found in phi_dict"
     np.testing.assert_almost_equal(phi_dict["A"], 2, decimal=5)
 
+def test_first_stage_engines_match():
+    v_df, y_series = _random_panel()
+    for h in (1, 3):
+        expected = regressions.first_stage_regressions(v_df, y_series, h=h, engine="statsmodels")
+        phi_dict = regressions.first_stage_regressions(v_df, y_series, h=h, engine="numpy")
+        assert list(phi_dict) == list(expected)
+        assert "Empty" not in phi_dict
+        np.testing.assert_allclose(list(phi_dict.values()), list(expected.values()), rtol=1e-9, atol=1e-12)
+
 def test_second_stage_regressions():
     # Create a simple DataFrame and corresponding phi_dict with three assets.
     # For each row, we set the observed values so that Y_i = beta1 * phi_i,
@@ -58,6 +82,17 @@ def test_second_stage_regressions():
         check_freq=False  # Ignore differences in the frequency attribute.
     )
 
+def test_second_stage_engines_match():
+    v_df, y_series = _random_panel(seed=1)
+    phi_dict = regressions.first_stage_regressions(v_df, y_series, h=1, engine="statsmodels")
+    expected = regressions.second_stage_regressions(v_df, phi_dict, engine="statsmodels")
+    F_series = regressions.second_stage_regressions(v_df, phi_dict, engine="numpy")
+    pd.testing.assert_series_equal(F_series, expected, rtol=1e-9, atol=1e-12, check_freq=False)
+
+    complete = v_df[list(phi_dict)].notna().all(axis=1)
+    assert F_series[~complete].isna().all()
+    assert F_series[complete].notna().all()
+
 # --- Tests for third_stage_regression ---
 def test_third_stage_regression():
     # Create synthetic F_series and y_series so that y_future = 3 * F.
@@ -99,6 +134,23 @@ def test_run_recursive_forecast(monkeypatch):
     assert isinstance(results["actual_series"], pd.Series), "actual_series is not a Series"
     assert isinstance(results["R2_oos"], float), "R2_oos is not a float"
 
+def test_recursive_forecast_incremental_matches_refit(monkeypatch):
+    v_df, y_series = _random_panel(seed=2, n_dates=90, n_cols=6)
+    v_df.iloc[:40, 2] = np.nan    # portfolio enters the window late
+    y_series.iloc[0] = np.nan
+    monkeypatch.setattr(regressions, "load_and_compute_log_returns", lambda: y_series)
+    monkeypatch.setattr(regressions, "load_ken_french",
+                        lambda dataset_name, weighting: v_df.reset_index(names="Date"))
+
+    for h in (1, 2):
+        kwargs = dict(h=h, end_train_date="1952-01-31", end_forecast_date="1957-06-30")
+        expected = regressions.run_recursive_forecast("dummy", method="refit", **kwargs)
+        results = regressions.run_recursive_forecast("dummy", method="incremental", **kwargs)
+        assert expected["forecast_series"].notna().sum() > 30
+        pd.testing.assert_series_equal(results["forecast_series"], expected["forecast_series"], rtol=1e-8)
+        pd.testing.assert_series_equal(results["actual_series"], expected["actual_series"])
+        np.testing.assert_allclose(results["R2_oos"], expected["R2_oos"], rtol=1e-8)
+
 # --- Test for select_predictors_annual ---
 def test_select_predictors_annual():
     # Create a DataFrame with multiple observations per year.
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import regressions
+import run_regressions
+
+
+@pytest.fixture
+def inputs():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start="1926-07-31", end="2015-12-31", freq="ME")
+    returns = pd.Series(rng.normal(0.005, 0.05, len(dates)), index=dates)
+    portfolios = {}
+    for dataset, n in [("6_Portfolios_2x3", 6), ("25_Portfolios_5x5", 25)]:
+        v = np.outer(returns.shift(-1).fillna(0), rng.normal(1, 0.5, n)) + rng.normal(0, 0.1, (len(dates), n))
+        df = pd.DataFrame(v, columns=[f"P{i}" for i in range(n)])
+        df.insert(0, "Date", dates)
+        portfolios[dataset, "BE_FYt-1_to_ME_June_t"] = df
+    return {"returns": returns, "portfolios": portfolios}
+
+
+def test_make_grid():
+    jobs = run_regressions.make_grid(["A", "B"], ["w"], [1, 3], ["monthly"])
+    assert jobs == [
+        dict(dataset="A", weighting="w", h=1, frequency="monthly"),
+        dict(dataset="A", weighting="w", h=3, frequency="monthly"),
+        dict(dataset="B", weighting="w", h=1, frequency="monthly"),
+        dict(dataset="B", weighting="w", h=3, frequency="monthly"),
+    ]
+
+
+def test_run_job_matches_direct_call(inputs):
+    job = dict(dataset="6_Portfolios_2x3", weighting="BE_FYt-1_to_ME_June_t", h=1, frequency="monthly")
+    row = run_regressions.run_job(job, inputs)
+    assert row["error"] is None
+
+    data = dict(returns=inputs["returns"], portfolios=inputs["portfolios"][job["dataset"], job["weighting"]])
+    recursive = regressions.run_recursive_forecast(
+        job["dataset"], job["weighting"], 1, start_train_date=run_regressions.START_TRAIN,
+        end_train_date=run_regressions.END_TRAIN, end_forecast_date=run_regressions.END_FORECAST, **data)
+    assert row["r2_out_of_sample"] == recursive["R2_oos"]
+    assert row["n_forecasts"] == recursive["forecast_series"].notna().sum() > 0
+    # The preloaded inputs are not modified by the job.
+    assert "Date" in data["portfolios"].columns
+
+
+def test_run_grid_backends_agree(inputs, tmp_path):
+    jobs = run_regressions.make_grid(list(dict.fromkeys(d for d, _ in inputs["portfolios"])),
+                                     horizons=[1, 2])
+    jobs.append(dict(dataset="6_Portfolios_2x3", weighting="BE_FYt-1_to_ME_June_t", h=1, frequency="weekly"))
+    serial = run_regressions.run_grid(jobs, backend="serial", inputs=inputs)
+    pooled = run_regressions.run_grid(jobs, backend="process", max_workers=2, inputs=inputs)
+
+    assert len(serial) == len(jobs)
+    assert serial["error"].notna().tolist() == [False] * (len(jobs) - 1) + [True]
+    cols = ["dataset", "weighting", "h", "frequency", "r2_in_sample", "r2_out_of_sample", "n_forecasts", "error"]
+    pd.testing.assert_frame_equal(pooled[cols], serial[cols])
+
+    run_regressions.write_report(pooled, "process", tmp_path)
+    assert len(pd.read_csv(tmp_path / "expectations_grid.csv")) == len(jobs)
+    assert "Failed jobs: 1" in (tmp_path / "expectations_grid_report.txt").read_text()
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import shared_inputs
+
+
+@pytest.fixture
+def inputs():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start="1990-01-31", periods=60, freq="ME")
+    returns = pd.Series(rng.normal(size=60), index=pd.DatetimeIndex(dates, name="date"))
+    df = pd.DataFrame(rng.normal(size=(60, 4)), columns=["SMALL LoBM", "ME1 BM2", "BIG HiBM", "x"])
+    df["x"] = df["x"].astype(str)
+    df.loc[5, "x"] = "-99.99 "
+    df.insert(0, "Date", dates)
+    return {"returns": returns, "portfolios": {("6_Portfolios_2x3", "value-weighted"): df}}
+
+
+def test_attached_inputs_match_and_share_memory(inputs, tmp_path):
+    with shared_inputs.shared_directory(tmp_path) as directory:
+        handles = shared_inputs.share_inputs(inputs, directory)
+        attached = shared_inputs.attach_inputs(handles)
+        assert shared_inputs.attach_inputs(handles) is attached
+
+        pd.testing.assert_series_equal(attached["returns"], inputs["returns"], check_freq=False)
+        df = inputs["portfolios"]["6_Portfolios_2x3", "value-weighted"]
+        expected = df.set_index("Date").apply(pd.to_numeric, errors="coerce")
+        frame = attached["portfolios"]["6_Portfolios_2x3", "value-weighted"]
+        pd.testing.assert_frame_equal(frame, expected, check_freq=False)
+
+        # Views over the read-only memory map, not copies.
+        for obj in (frame, attached["returns"]):
+            base = obj.to_numpy()
+            while not isinstance(base, np.memmap):
+                base = base.base
+                assert base is not None
+        with pytest.raises(ValueError):
+            attached["returns"].to_numpy()[0] = 1.0
+    assert not directory.exists()
@@ -0,0 +1,162 @@
+"""
+Closed-form, batched stages of the three-pass regression filter.
+
+`regressions.first_stage_regressions` and `regressions.second_stage_regressions`
+used to fit one statsmodels OLS per portfolio and one per date. Both stages
+are simple regressions with a constant, so their slopes have closed forms:
+
+    - First stage: for every portfolio column i, the slope of v_i on y_{t+h}
+      over the dates where both are observed,
+          phi_i = sum((y - ybar_i) * (v_i - vbar_i)) / sum((y - ybar_i) ** 2),
+      computed for all columns at once with a (dates x portfolios) mask.
+    - Second stage: every date's cross-sectional regression of v_t on
+      [1, phi] shares the same design matrix, so all factors come from one
+      product F = V @ pinv([1, phi])[1]. A date with any missing value gives
+      NaN, as it does with statsmodels.
+"""
+import numpy as np
+
+
+def first_stage_slopes(V, y_future):
+    """
+    OLS slopes of each column of V on y_future, with NaN masking.
+
+    Args:
+        V (np.ndarray): (dates x portfolios) valuation ratios; NaN = missing.
+        y_future (np.ndarray): (dates,) future returns y_{t+h}; NaN = missing.
+
+    Returns:
+        tuple: (phi, n_obs, ss_y). `phi` is NaN for columns with fewer than
+               two observations or no variation in y; `n_obs` and `ss_y`
+               (centered sum of squares of y) let the caller spot those.
+    """
+    V = np.asarray(V, dtype=float)
+    y = np.asarray(y_future, dtype=float)
+    mask = ~np.isnan(V) & ~np.isnan(y)[:, None]
+    n_obs = mask.sum(axis=0)
+
+    Vm = np.where(mask, V, 0.0)
+    Ym = np.where(mask, y[:, None], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        v_bar = Vm.sum(axis=0) / n_obs
+        y_bar = Ym.sum(axis=0) / n_obs
+        y_c = np.where(mask, Ym - y_bar, 0.0)
+        v_c = np.where(mask, Vm - v_bar, 0.0)
+        ss_y = (y_c * y_c).sum(axis=0)
+        phi = (y_c * v_c).sum(axis=0) / ss_y
+    phi[(n_obs < 2) | ~(ss_y > 0)] = np.nan
+    return phi, n_obs, ss_y
+
+
+def second_stage_factors(V, phi):
+    """
+    Cross-sectional slope on `phi` of every row of V, in one least squares.
+
+    Args:
+        V (np.ndarray): (dates x portfolios) valuation ratios.
+        phi (np.ndarray): (portfolios,) first-stage loadings.
+
+    Returns:
+        np.ndarray: (dates,) latent factor F_t.
+    """
+    V = np.asarray(V, dtype=float)
+    X = np.column_stack([np.ones(len(phi)), np.asarray(phi, dtype=float)])
+    return V @ np.linalg.pinv(X)[1]
+
+
+def _third_stage_moments(V, y, h, cols, stop):
+    """
+    Cross-products over the rows s < stop - h whose valuation ratios are complete
+    on `cols` and whose y_{s+h} is observed: (n, sum v, sum v v', sum v y, sum y, sum y^2).
+    """
+    Vc = V[:max(stop - h, 0)][:, cols]
+    yf = y[h:stop]
+    rows = ~np.isnan(Vc).any(axis=1) & ~np.isnan(yf)
+    Vc, yf = Vc[rows], yf[rows]
+    return [len(yf), Vc.sum(axis=0), Vc.T @ Vc, Vc.T @ yf, yf.sum(), yf @ yf]
+
+
+def expanding_forecasts(V, y, h=1, start=1):
+    """
+    Recursive out-of-sample forecasts of y_{t+h} on an expanding window.
+
+    The forecast at row k uses rows 0..k-1 only, exactly as refitting the three
+    stages on that window would (first stage with statsmodels semantics, second
+    stage F_s = pinv([1, phi])[1] @ v_s, third stage OLS of y_{s+h} on F_s over
+    the rows where both are observed). Instead of refitting, running sums are
+    updated as each row arrives:
+
+        - first stage: per portfolio n, sum y, sum y^2, sum v, sum v y;
+        - third stage: over the rows complete on the estimable portfolios,
+          sum v, sum v v', sum v y, sum y, sum y^2. The slope on F is
+          a'Cov(v, y) / a'Cov(v, v)a with a = pinv([1, phi])[1].
+
+    The third-stage sums are rebuilt only when a portfolio becomes estimable,
+    which happens at most once per portfolio.
+
+    Args:
+        V (np.ndarray): (dates x portfolios) valuation ratios; NaN = missing.
+        y (np.ndarray): (dates,) excess returns y_t; NaN = missing.
+        h (int): forecast horizon in rows.
+        start (int): first row to forecast.
+
+    Returns:
+        tuple: (forecasts, fitted). `fitted[k]` is False where no portfolio
+               could be estimated, i.e. where a refit would skip the date;
+               forecasts are NaN there and where the third stage is degenerate.
+    """
+    V = np.asarray(V, dtype=float)
+    y = np.asarray(y, dtype=float)
+    T, N = V.shape
+    obs = ~np.isnan(V)
+    n1 = np.zeros(N)
+    sy, syy, sv, svy = np.zeros(N), np.zeros(N), np.zeros(N), np.zeros(N)
+
+    forecasts = np.full(T, np.nan)
+    fitted = np.zeros(T, dtype=bool)
+    cols = None
+    for k in range(1, T):
+        # Row k - 1 joins the window: y_{k-1} completes the pair (v_s, y_{s+h}), s = k-1-h.
+        s = k - 1 - h
+        if s >= 0 and not np.isnan(y[k - 1]):
+            m = obs[s]
+            yk, vs = y[k - 1], np.where(m, V[s], 0.0)
+            n1 += m
+            sy += m * yk
+            syy += m * yk * yk
+            sv += vs
+            svy += vs * yk
+            if cols is not None and m[cols].all():
+                vc = V[s, cols]
+                moments[0] += 1
+                moments[1] += vc
+                moments[2] += np.outer(vc, vc)
+                moments[3] += vc * yk
+                moments[4] += yk
+                moments[5] += yk * yk
+        if k < start:
+            continue
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ss_y = syy - sy * sy / n1
+            valid = (n1 >= 2) & (ss_y > 0)
+        if not valid.any():
+            continue
+        fitted[k] = True
+        if cols is None or not np.array_equal(valid, cols):
+            cols = valid
+            moments = _third_stage_moments(V, y, h, cols, k)
+
+        phi = (svy[cols] - sy[cols] * sv[cols] / n1[cols]) / ss_y[cols]
+        a = np.linalg.pinv(np.column_stack([np.ones(len(phi)), phi]))[1]
+        n3, s_v, s_vv, s_vy, s_y, s_yy = moments
+        if n3 < 2:
+            continue
+        var_F = a @ (s_vv - np.outer(s_v, s_v) / n3) @ a
+        cov_Fy = a @ (s_vy - s_v * s_y / n3)
+        if not var_F > 1e-12 * abs(a @ s_vv @ a) / n3:
+            continue  # F constant over the window: no slope to estimate
+        beta = cov_Fy / var_F
+        alpha = (s_y - beta * (a @ s_v)) / n3
+        forecasts[k] = alpha + beta * (V[k - 1, cols] @ a)
+    return forecasts, fitted
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+fed_curve_store.py
+
+Append-only, incremental store of the Federal Reserve yield-curve files.
+
+The Fed publishes each curve as one CSV with the whole daily history since
+1961 (nominal, feds200628.csv) or 1999 (TIPS, feds200805.csv), oldest date
+first. The pull scripts used to download and parse all of it and rewrite the
+Parquet output on every run. Here each curve is a date-partitioned Parquet
+dataset,
+
+    <DATA_DIR>/<store>/year=YYYY/<first date>-<last date>.parquet
+    <DATA_DIR>/<store>/_state.json
+
+where `_state.json` holds the high-water mark (last stored date), the CSV
+columns and the size of the file at the last pull. An update:
+
+    1. asks the server only for the tail of the file (an HTTP Range request
+       starting a little before the previous end of file). If the server
+       ignores the range, or the tail no longer overlaps the stored dates,
+       it streams the whole file instead.
+    2. parses the lines as they arrive and converts only rows dated after
+       the high-water mark.
+    3. writes those rows as new fragments, one per calendar year spanned
+       (usually one small file), and then advances the state.
+
+A daily refresh thus downloads and writes kilobytes. The pipeline reads flat
+files (e.g. fed_yield_curve.parquet), which `update(..., export_flat=True)`
+and `compact(..., export_flat=True)` rewrite from the store. `compact` merges
+the fragments of each year into a single file. Because an update only looks
+at new dates, revisions to past rows are picked up by `update(..., full=True)`,
+which rebuilds the store from the whole file.
+
+Usage:
+    python fed_curve_store.py update nominal tips --export
+    python fed_curve_store.py update tips --full
+    python fed_curve_store.py compact nominal tips --export
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+import http_cache
+from settings import config
+
+DATA_DIR = Path(config("DATA_DIR"))
+
+CURVES = {
+    "nominal": {
+        "url": "https://www.federalreserve.gov/data/yield-curve-tables/feds200628.csv",
+        "store": "fed_yield_curve_store",
+    },
+    "tips": {
+        "url": "https://www.federalreserve.gov/data/yield-curve-tables/feds200805.csv",
+        "store": "fed_tips_yield_curve_store",
+    },
+}
+
+# Bytes re-read before the previous end of file: enough for a few rows of the
+# widest curve, so the tail always overlaps the stored dates.
+TAIL_OVERLAP = 16 * 1024
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 60
+
+
+# ------------------------------------------------------------------------------
+# State and fragments
+# ------------------------------------------------------------------------------
+def store_path(curve, data_dir=DATA_DIR):
+    """Dataset directory of a curve ("nominal" or "tips")."""
+    return Path(data_dir) / CURVES[curve]["store"]
+
+
+def read_state(store):
+    """State of a store: {"high_water_mark", "columns", "bytes"}, or {} if empty."""
+    path = Path(store) / "_state.json"
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _write_state(store, state):
+    path = Path(store) / "_state.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, path)
+
+
+def fragments(store):
+    """Parquet fragments of a store, in date order."""
+    return sorted(Path(store).glob("year=*/*.parquet"), key=lambda p: (p.parent.name, p.name))
+
+
+def _fragment_name(frame):
+    return f"{frame.index[0]:%Y%m%d}-{frame.index[-1]:%Y%m%d}.parquet"
+
+
+def write_fragments(store, frame):
+    """Write a Date-indexed frame as one new fragment per calendar year. Returns the paths."""
+    paths = []
+    for year, part in frame.groupby(frame.index.year, sort=True):
+        directory = Path(store) / f"year={year}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / _fragment_name(part)
+        part.to_parquet(path)
+        paths.append(path)
+    return paths
+
+
+def load(store, columns=None):
+    """
+    The stored curve as one Date-indexed frame. Overlapping fragments (from a
+    re-pulled day) resolve to the most recently written row.
+    """
+    files = fragments(store)
+    if not files:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+    return load_files(files, columns)
+
+
+def load_files(files, columns=None):
+    """Date-indexed frame of some fragments; on overlap, the row written last wins."""
+    df = pd.concat([pd.read_parquet(p, columns=columns) for p in sorted(files, key=os.path.getmtime)])
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+# ------------------------------------------------------------------------------
+# Streaming download and parse
+# ------------------------------------------------------------------------------
+def _iter_lines(chunks, skip_partial=False, counter=None):
+    """
+    Decoded lines of a stream of byte chunks, without holding it in memory.
+    `skip_partial` drops the first (cut) line of a range; `counter["bytes"]`
+    accumulates the bytes read.
+    """
+    buffer = b""
+    first = skip_partial
+    for chunk in chunks:
+        if counter is not None:
+            counter["bytes"] += len(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if first:
+                first = False
+                continue
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if buffer and not first:
+        yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def parse_rows(lines, after=None, columns=None):
+    """
+    Parse Fed curve CSV lines, keeping rows dated after `after`.
+
+    Without `columns`, the header is the first row whose first field is "Date"
+    (the notes above it are skipped); with `columns`, `lines` are data rows.
+    Dates are ISO strings, so comparing them as strings avoids converting rows
+    that are then dropped.
+
+    Returns:
+        tuple: (columns, first_date, rows) where `first_date` is the date of
+               the first data row seen (new or not) and `rows` the new rows.
+    """
+    after = str(after) if after is not None else ""
+    reader = csv.reader(lines)
+    if columns is None:
+        for row in reader:
+            if row and row[0].strip() == "Date":
+                columns = [c.strip() for c in row]
+                break
+        else:
+            raise ValueError("No 'Date' header row in the curve file")
+
+    first_date, rows = None, []
+    for row in reader:
+        if len(row) != len(columns) or not row[0][:1].isdigit():
+            continue
+        if first_date is None:
+            first_date = row[0]
+        if row[0] > after:
+            rows.append(row)
+    return columns, first_date, rows
+
+
+def rows_to_frame(columns, rows):
+    """Date-indexed float frame of parsed rows ("NA" and blanks become NaN)."""
+    df = pd.DataFrame(rows, columns=columns)
+    index = pd.DatetimeIndex(pd.to_datetime(df.pop("Date")), name="Date")
+    df = df.apply(pd.to_numeric, errors="coerce").astype(float)
+    df.index = index
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def fetch_new_rows(url, state, session=None):
+    """
+    Rows of `url` dated after state["high_water_mark"].
+
+    Returns:
+        tuple: (frame, new_state, mode) with mode "tail" when only the end of
+               the file was downloaded, else "full".
+    """
+    session = session or http_cache.get_session()
+    hwm = state.get("high_water_mark")
+    if hwm and state.get("columns") and state.get("bytes"):
+        start = max(state["bytes"] - TAIL_OVERLAP, 0)
+        with session.get(url, headers={"Range": f"bytes={start}-"}, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 206:
+                total = int(response.headers.get("Content-Range", "*/0").rsplit("/", 1)[-1] or 0)
+                lines = _iter_lines(response.iter_content(CHUNK_SIZE), skip_partial=start > 0)
+                columns, first_date, rows = parse_rows(lines, hwm, state["columns"])
+                # The tail must start on or before the stored dates, else rows were missed
+                if first_date is not None and first_date <= hwm and total >= state["bytes"]:
+                    new_state = dict(state, bytes=total)
+                    return _with_rows(columns, rows, new_state), new_state, "tail"
+            elif response.status_code not in (200, 416):
+                response.raise_for_status()
+
+    with session.get(url, stream=True, timeout=TIMEOUT) as response:
+        response.raise_for_status()
+        counter = {"bytes": 0}
+        columns, _, rows = parse_rows(_iter_lines(response.iter_content(CHUNK_SIZE), counter=counter), hwm)
+    new_state = dict(state, columns=columns, bytes=counter["bytes"])
+    return _with_rows(columns, rows, new_state), new_state, "full"
+
+
+def _with_rows(columns, rows, state):
+    frame = rows_to_frame(columns, rows)
+    if len(frame):
+        state["high_water_mark"] = f"{frame.index[-1]:%Y-%m-%d}"
+    return frame
+
+
+# ------------------------------------------------------------------------------
+# Commands
+# ------------------------------------------------------------------------------
+def update(curve, data_dir=DATA_DIR, full=False, url=None, session=None, export_flat=False):
+    """
+    Append the rows published since the last update as new fragments.
+
+    Args:
+        curve (str): "nominal" or "tips".
+        full (bool): rebuild the store from the whole file (picks up revisions).
+        url (str): override of the curve's URL (e.g. a mirror).
+        export_flat (bool): also rewrite the flat files of `export` when there
+                            are new rows (or the files do not exist yet).
+
+    Returns:
+        tuple: (new rows, paths of the fragments written, "tail" or "full").
+    """
+    store = store_path(curve, data_dir)
+    if full and store.exists():
+        shutil.rmtree(store)
+    store.mkdir(parents=True, exist_ok=True)
+
+    state = read_state(store)
+    frame, new_state, mode = fetch_new_rows(url or CURVES[curve]["url"], state, session)
+    paths = write_fragments(store, frame) if len(frame) else []
+    _write_state(store, new_state)
+    if export_flat and (len(frame) or not all(p.exists() for p in flat_paths(curve, data_dir))):
+        export(curve, data_dir)
+    print(f"{curve}: {len(frame)} new rows ({mode} read), high-water mark {new_state.get('high_water_mark')}")
+    return frame, paths, mode
+
+
+def flat_paths(curve, data_dir=DATA_DIR):
+    """The flat Parquet files of a curve written by `export`."""
+    data_dir = Path(data_dir)
+    if curve == "nominal":
+        return [data_dir / "fed_yield_curve_all.parquet", data_dir / "fed_yield_curve.parquet"]
+    return [data_dir / "fed_tips_yield_curve.parquet"]
+
+
+def export(curve, data_dir=DATA_DIR, frame=None):
+    """Write the flat Parquet files that the pipeline reads, from the store."""
+    df = load(store_path(curve, data_dir)) if frame is None else frame
+    paths = flat_paths(curve, data_dir)
+    if curve == "nominal":
+        df.to_parquet(paths[0])
+        df[[c for c in df.columns if c.startswith("SVENY")]].to_parquet(paths[1])
+    else:
+        df.reset_index().to_parquet(paths[0])
+
+
+def compact(curve, data_dir=DATA_DIR, export_flat=False):
+    """
+    Merge the fragments of every year into one file per year. With
+    `export_flat`, also write the flat files of `export`.
+
+    Returns:
+        int: number of fragments after compaction.
+    """
+    store = store_path(curve, data_dir)
+    for directory in sorted(store.glob("year=*")):
+        files = list(directory.glob("*.parquet"))
+        if len(files) < 2:
+            continue
+        df = load_files(files)
+        target = directory / _fragment_name(df)
+        tmp = target.with_suffix(".tmp")
+        df.to_parquet(tmp)
+        # Publish the merged file before removing the fragments: an interruption
+        # leaves duplicates, which `load` resolves, rather than a missing year
+        os.replace(tmp, target)
+        for path in files:
+            if path != target:
+                path.unlink()
+    if export_flat:
+        export(curve, data_dir)
+    return len(fragments(store))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("update", help="Append the rows published since the last update")
+    up.add_argument("curves", nargs="+", choices=sorted(CURVES))
+    up.add_argument("--full", action="store_true", help="Rebuild the store from the whole file")
+    up.add_argument("--export", action="store_true", help="Also write the flat Parquet files of the pipeline")
+    co = sub.add_parser("compact", help="Merge each year's fragments into one file")
+    co.add_argument("curves", nargs="+", choices=sorted(CURVES))
+    co.add_argument("--export", action="store_true", help="Also write the flat Parquet files of the pipeline")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    for curve in args.curves:
+        if args.command == "update":
+            update(curve, args.data_dir, full=args.full, export_flat=args.export)
+        else:
+            n = compact(curve, args.data_dir, export_flat=args.export)
+            print(f"{curve}: {n} fragments after compaction")
+
+
+if __name__ == "__main__":
+    main()
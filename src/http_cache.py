@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+http_cache.py
+
+Shared download layer with an on-disk, conditional response cache.
+
+The pull scripts downloaded their sources in full on every run, even when the
+upstream file had not changed. `fetch(url)` keeps the last response body per
+URL in
+
+    <DATA_DIR>/http_cache/<sha256(url)>.body   the response body
+    <DATA_DIR>/http_cache/<sha256(url)>.json   url, ETag, Last-Modified, times
+
+and revalidates it with a conditional request (If-None-Match /
+If-Modified-Since): an unchanged file costs a 304 and no transfer. All
+requests go through one `requests.Session`, so connections are pooled, and
+failed connections and 429/5xx answers are retried with exponential backoff.
+
+Offline mode (HTTP_CACHE_OFFLINE=1 or `offline=True`) makes no request and
+serves the cached copy. When the network fails, or the server still answers
+429/5xx, after the retries, a cached copy is also served, with a warning.
+
+Usage:
+    import http_cache
+    path = http_cache.fetch(url)                 # Path of the cached body
+    df = pd.read_csv(http_cache.fetch(url), skiprows=9)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from settings import config
+
+CACHE_DIR = Path(config("DATA_DIR")) / "http_cache"
+OFFLINE = str(config("HTTP_CACHE_OFFLINE", default="0")).lower() in ("1", "true", "yes")
+
+RETRIES = 4
+BACKOFF = 0.5  # seconds, doubled after each retry
+RETRY_STATUS = (429, 500, 502, 503, 504)
+TIMEOUT = 60
+CHUNK_SIZE = 1 << 20
+
+_lock = threading.Lock()
+_session = None
+
+
+def get_session():
+    """The shared Session: pooled connections, retries with backoff."""
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(total=RETRIES, backoff_factor=BACKOFF, status_forcelist=RETRY_STATUS,
+                          allowed_methods=("GET", "HEAD"), raise_on_status=False)
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=8, pool_maxsize=8)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def cache_paths(url, cache_dir=None):
+    """(body, metadata) paths of a URL in the cache."""
+    key = hashlib.sha256(url.encode()).hexdigest()
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    return cache_dir / f"{key}.body", cache_dir / f"{key}.json"
+
+
+def read_metadata(url, cache_dir=None):
+    """Cached metadata of a URL, or {} when it has no usable cached body."""
+    body, meta = cache_paths(url, cache_dir)
+    if not (body.exists() and meta.exists()):
+        return {}
+    return json.loads(meta.read_text())
+
+
+def _write_json(path, data):
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def fetch(url, cache_dir=None, offline=None, max_age=None, session=None, timeout=TIMEOUT):
+    """
+    Path of an up-to-date local copy of `url`.
+
+    Args:
+        url (str): resource to download.
+        cache_dir (Path): cache directory (default CACHE_DIR).
+        offline (bool): serve the cached copy without any request (default OFFLINE).
+        max_age (float): seconds during which a cached copy is used without
+                         revalidation (e.g. for servers that send no validators).
+        session (requests.Session): default: the shared session.
+
+    Returns:
+        Path: the cached response body. Its metadata records whether the last
+              call downloaded it ("status": 200) or revalidated it (304).
+
+    Raises:
+        FileNotFoundError: offline, or the network failed, and nothing is cached.
+        requests.HTTPError: the server answered with an error, and either
+                            nothing is cached or the error is a 4xx other than 429.
+    """
+    body, meta_path = cache_paths(url, cache_dir)
+    meta = read_metadata(url, cache_dir)
+    offline = OFFLINE if offline is None else offline
+    if offline:
+        if not meta:
+            raise FileNotFoundError(f"Offline and no cached copy of {url}")
+        return body
+    if meta and max_age is not None and time.time() - meta["validated_at"] < max_age:
+        return body
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    session = session or get_session()
+    try:
+        response = session.get(url, headers=headers, stream=True, timeout=timeout)
+    except requests.RequestException as exc:
+        if not meta:
+            raise FileNotFoundError(f"Could not download {url} and no cached copy: {exc}") from exc
+        warnings.warn(f"Serving the cached copy of {url}: {exc}")
+        return body
+
+    with response:
+        if response.status_code == 304 and meta:
+            meta.update(status=304, validated_at=time.time())
+            _write_json(meta_path, meta)
+            return body
+        if meta and (response.status_code >= 500 or response.status_code == 429):
+            warnings.warn(f"Serving the cached copy of {url}: HTTP {response.status_code} after retries")
+            return body
+        response.raise_for_status()
+
+        body.parent.mkdir(parents=True, exist_ok=True)
+        tmp = body.with_suffix(".body.tmp")
+        size = 0
+        with open(tmp, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp, body)
+        now = time.time()
+        _write_json(meta_path, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "bytes": size,
+            "status": 200,
+            "downloaded_at": now,
+            "validated_at": now,
+        })
+    return body
+
+
+def fetch_bytes(url, **kwargs):
+    """Content of `url`, through the cache (see `fetch`)."""
+    return fetch(url, **kwargs).read_bytes()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+outlier_filter.py
+
+Rolling median / mean-absolute-deviation (MAD) outlier filter shared by the
+CIP, equity spot and Treasury spot-futures pipelines.
+
+Each pipeline flags an observation when its distance from a rolling median is
+at least `threshold` times a rolling MAD. They differ only in the window:
+
+    - "trailing":  the last `window` rows, current row included
+                   (CIP, pandas `rolling(window)`).
+    - "centered":  `window` rows centered on the current row
+                   (equity spot, pandas `rolling(window, center=True)`).
+    - leave-one-out: all *other* observations within ±`window_days` calendar
+                   days (Treasury spot-futures).
+
+Every window is a contiguous slice [lo, hi) of time-ordered rows, so all the
+statistics come from one kernel, `window_stat`, that runs over a 2-D block
+(rows x series) and handles every column in a single call:
+
+    - The NumPy engine gathers the windows of a chunk of rows into a
+      NaN-padded block and sorts it once along the window axis.
+    - The numba engine (used when numba is installed) slides each window
+      down the rows, keeping its values in a sorted buffer, so a step costs
+      one insertion and one deletion instead of a sort.
+
+Without numba, `rolling_outlier_mask` defaults to the pandas reference, one
+column at a time: for the fixed windows pandas' own rolling median is several
+times faster than the NumPy engine, which stays available with engine="numpy".
+
+Medians are taken exactly as numpy/pandas take them (middle element, or
+(a + b) / 2 of the two middle elements), so they are bit-identical. Means are
+sums whose floating-point order differs from pandas. Rows whose deviation
+ratio lands within a relative `RECHECK_RTOL` band of the threshold are
+re-evaluated with the original pandas expressions, so the flags are identical
+to the pandas reference implementations.
+
+Usage:
+    mask = rolling_outlier_mask(df[cip_cols], window=45, mode="trailing")
+    flags = leave_one_out_outlier_flags(dates, values, window_days=45)
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ModuleNotFoundError:
+    numba = None
+
+# Number of gathered window cells processed per chunk (bounds peak memory).
+CHUNK_CELLS = 2_000_000
+
+# Relative band around the threshold inside which flags are re-checked exactly.
+RECHECK_RTOL = 1e-9
+
+MODES = ("trailing", "centered")
+ENGINES = ("numba", "numpy")
+
+# Statistic codes understood by both engines.
+_MEDIAN, _MEAN, _MAD = 0, 1, 2
+_STATS = {"median": _MEDIAN, "mean": _MEAN, "mad": _MAD}
+
+
+# -------------------------
+# Window bounds
+# -------------------------
+def row_window_bounds(n, window, mode="trailing"):
+    """
+    Return the [lo, hi) row bounds of fixed-size windows, as pandas builds them.
+
+    Args:
+        n (int): Number of rows.
+        window (int): Window length in rows.
+        mode (str): "trailing" (`rolling(window)`) or "centered"
+                    (`rolling(window, center=True)`).
+
+    Returns:
+        tuple: (lo, hi) int64 arrays, one entry per row.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    offset = (window - 1) // 2 if mode == "centered" else 0
+    end = np.arange(n, dtype=np.int64) + offset + 1
+    return np.maximum(end - window, 0), np.minimum(end, n)
+
+
+def window_bounds(dates, window_days=45):
+    """
+    Return the [lo, hi) row bounds of the ±window_days window around each date.
+
+    Args:
+        dates (np.ndarray): Sorted datetime64[ns] (or int64 nanosecond) array.
+        window_days (int): Half-width of the window in calendar days.
+
+    Returns:
+        tuple: (lo, hi) int64 arrays, one entry per row.
+    """
+    d = np.asarray(dates).astype("datetime64[ns]").astype(np.int64)
+    half_width = np.int64(pd.Timedelta(days=window_days).value)
+    lo = np.searchsorted(d, d - half_width, side="left")
+    hi = np.searchsorted(d, d + half_width, side="right")
+    return lo, hi
+
+
+# -------------------------
+# Kernels
+# -------------------------
+def _as_block(values):
+    """View `values` as a float (rows x series) block."""
+    block = np.asarray(values, dtype=float)
+    return block.reshape(len(block), -1) if block.ndim == 1 else block
+
+
+def _median_from_sorted(sorted_windows, counts):
+    """Median of each window of a NaN-last sorted block, as numpy computes it."""
+    median = np.full(counts.shape, np.nan)
+    has_obs = counts > 0
+    s = sorted_windows[has_obs]
+    c = counts[has_obs]
+    r = np.arange(len(c))
+    upper = s[r, c // 2]
+    lower = s[r, np.maximum(c // 2 - 1, 0)]
+    median[has_obs] = np.where(c % 2 == 1, upper, (lower + upper) / 2)
+    return median
+
+
+def _gather_windows(block, lo, hi, rows, exclude_self):
+    """Gather the windows of `rows` into a NaN-padded (rows, series, width) block."""
+    n = len(block)
+    width = int((hi[rows] - lo[rows]).max())
+    offsets = lo[rows, None] + np.arange(width)[None, :]
+    inside = offsets < hi[rows, None]
+    if exclude_self:
+        inside &= offsets != rows[:, None]
+    windows = block[np.minimum(offsets, n - 1)]
+    windows = np.where(inside[:, :, None], windows, np.nan)
+    return windows.transpose(0, 2, 1)
+
+
+def _window_stat_numpy(block, lo, hi, stat, exclude_self, center):
+    n, k = block.shape
+    out = np.full((n, k), np.nan)
+    counts = np.zeros((n, k), dtype=np.int64)
+    if n == 0:
+        return out, counts
+
+    width = max(int((hi - lo).max()), 1)
+    step = max(CHUNK_CELLS // (width * k), 1)
+    for start in range(0, n, step):
+        rows = np.arange(start, min(start + step, n))
+        windows = _gather_windows(block, lo, hi, rows, exclude_self)
+        c = np.count_nonzero(~np.isnan(windows), axis=2)
+        if stat == _MEDIAN:
+            res = _median_from_sorted(np.sort(windows, axis=2), c)
+        else:
+            if stat == _MAD:
+                windows = np.abs(windows - center[rows, :, None])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                res = np.where(c > 0, np.nansum(windows, axis=2) / c, np.nan)
+            if stat == _MAD:
+                res[np.isnan(center[rows])] = np.nan
+        out[rows] = res
+        counts[rows] = c
+    return out, counts
+
+
+def _window_median_loops(block, lo, hi, exclude_self):
+    """
+    Sliding-window median for non-decreasing bounds: the non-NaN values of the
+    current window are kept sorted in `buf`, so each step costs one binary
+    search and one shift per value entering or leaving the window.
+    """
+    n, k = block.shape
+    out = np.full((n, k), np.nan)
+    counts = np.zeros((n, k), dtype=np.int64)
+    width = 0
+    for i in range(n):
+        width = max(width, hi[i] - lo[i])
+    buf = np.empty(width)
+    for j in range(k):
+        m = 0
+        cur_lo = 0
+        cur_hi = 0
+        for i in range(n):
+            while cur_lo < lo[i]:
+                if cur_lo < cur_hi:
+                    x = block[cur_lo, j]
+                    if not np.isnan(x):
+                        pos = np.searchsorted(buf[:m], x)
+                        buf[pos:m - 1] = buf[pos + 1:m].copy()
+                        m -= 1
+                cur_lo += 1
+            cur_hi = max(cur_hi, cur_lo)
+            while cur_hi < hi[i]:
+                x = block[cur_hi, j]
+                if not np.isnan(x):
+                    pos = np.searchsorted(buf[:m], x, side="right")
+                    buf[pos + 1:m + 1] = buf[pos:m].copy()
+                    buf[pos] = x
+                    m += 1
+                cur_hi += 1
+
+            # Leave the current row out by skipping one copy of its value.
+            c = m
+            skip = m
+            x = block[i, j]
+            if exclude_self and lo[i] <= i < hi[i] and not np.isnan(x):
+                skip = np.searchsorted(buf[:m], x)
+                c = m - 1
+            counts[i, j] = c
+            if c == 0:
+                continue
+            r = c // 2
+            upper = buf[r] if r < skip else buf[r + 1]
+            if c % 2 == 1:
+                out[i, j] = upper
+            else:
+                lower = buf[r - 1] if r - 1 < skip else buf[r]
+                out[i, j] = (lower + upper) / 2
+    return out, counts
+
+
+def _window_mean_loops(block, lo, hi, stat, exclude_self, center):
+    n, k = block.shape
+    out = np.full((n, k), np.nan)
+    counts = np.zeros((n, k), dtype=np.int64)
+    for j in range(k):
+        for i in range(n):
+            c = 0
+            total = 0.0
+            for r in range(lo[i], hi[i]):
+                x = block[r, j]
+                if (exclude_self and r == i) or np.isnan(x):
+                    continue
+                total += abs(x - center[i, j]) if stat == _MAD else x
+                c += 1
+            counts[i, j] = c
+            if c > 0:
+                out[i, j] = total / c
+    return out, counts
+
+
+if numba is not None:
+    _window_median_numba = numba.njit(nogil=True, cache=True)(_window_median_loops)
+    _window_mean_numba = numba.njit(nogil=True, cache=True)(_window_mean_loops)
+
+
+def _resolve_engine(engine):
+    if engine is None:
+        return "numba" if numba is not None else "numpy"
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if engine == "numba" and numba is None:
+        raise ModuleNotFoundError("engine='numba' requires the numba package")
+    return engine
+
+
+def window_stat(values, lo, hi, stat, exclude_self=False, center=None, engine=None):
+    """
+    Compute a statistic over the [lo, hi) window of every row of every column.
+
+    NaNs are ignored. Windows with no observations give NaN.
+
+    Args:
+        values (array-like): (rows x series) block, or a single series.
+        lo, hi (np.ndarray): Window bounds per row, shared by all columns.
+            The numba median needs them non-decreasing, as they are for every
+            window built by `row_window_bounds` and `window_bounds`.
+        stat (str): "median", "mean", or "mad" (mean of |x - center|).
+        exclude_self (bool): Leave the current row out of its own window.
+        center (array-like): Same shape as `values`; required for "mad".
+        engine (str): "numba", "numpy", or None for numba when installed.
+
+    Returns:
+        tuple: (result, counts) float and int64 (rows x series) arrays, where
+               `counts` is the number of non-NaN observations in each window.
+    """
+    block = np.ascontiguousarray(_as_block(values))
+    if stat not in _STATS:
+        raise ValueError(f"stat must be one of {tuple(_STATS)}, got {stat!r}")
+    if stat == "mad" and center is None:
+        raise ValueError("stat='mad' requires `center`")
+    center = block if center is None else np.ascontiguousarray(_as_block(center))
+    lo = np.asarray(lo, dtype=np.int64)
+    hi = np.asarray(hi, dtype=np.int64)
+
+    if _resolve_engine(engine) == "numba":
+        if stat == "median":
+            if np.any(np.diff(lo) < 0) or np.any(np.diff(hi) < 0):
+                raise ValueError("engine='numba' requires non-decreasing window bounds")
+            return _window_median_numba(block, lo, hi, exclude_self)
+        return _window_mean_numba(block, lo, hi, _STATS[stat], exclude_self, center)
+    return _window_stat_numpy(block, lo, hi, _STATS[stat], exclude_self, center)
+
+
+# -------------------------
+# Fixed-window filters (CIP, equity spot)
+# -------------------------
+def _shift(block, lag):
+    """Shift rows down by `lag`, as `DataFrame.shift(lag)` does."""
+    if lag == 0:
+        return block
+    out = np.full_like(block, np.nan)
+    out[lag:] = block[:-lag]
+    return out
+
+
+def _wrap(mask, like):
+    """Return `mask` with the index/columns (or shape) of `like`."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(mask, index=like.index, columns=like.columns)
+    if isinstance(like, pd.Series):
+        return pd.Series(mask[:, 0], index=like.index, name=like.name)
+    return mask.reshape(np.shape(like))
+
+
+def rolling_outlier_mask_pandas(values, window=45, mode="trailing", threshold=10.0, min_periods=None, lag=0):
+    """
+    Reference pandas implementation of `rolling_outlier_mask` for one series.
+    Used to re-check borderline rows, and by tests and benchmarks.
+    """
+    x = pd.Series(np.asarray(values, dtype=float))
+    roll = dict(window=window, center=(mode == "centered"), min_periods=min_periods)
+    median = x.rolling(**roll).median().shift(lag)
+    abs_dev = (x - median).abs()
+    mad = abs_dev.rolling(**roll).mean().shift(lag)
+    return ((abs_dev / mad) >= threshold).to_numpy()
+
+
+def rolling_outlier_mask(values, window=45, mode="trailing", threshold=10.0, min_periods=None, lag=0,
+                         engine=None):
+    """
+    Flag outliers in every column of a block of time-ordered series.
+
+    For each column x:
+        median  = rolling median of x (NaN below `min_periods` observations)
+        abs_dev = |x - median.shift(lag)|
+        mad     = rolling mean of abs_dev over the same windows
+        flag    = abs_dev / mad.shift(lag) >= threshold
+
+    mode="trailing", lag=0 is the CIP filter; mode="centered", lag=1,
+    min_periods=1 is the equity-spot filter. NaN observations are never flagged.
+
+    Args:
+        values (pd.DataFrame, pd.Series or array-like): Rows in time order,
+            one column per series.
+        window (int): Window length in rows.
+        mode (str): "trailing" or "centered".
+        threshold (float): Ratio at or above which an observation is flagged.
+        min_periods (int): Minimum observations per window; defaults to `window`.
+        lag (int): Rows by which the median and MAD are lagged.
+        engine (str): "numba", "numpy", or None for numba when installed and
+            else `rolling_outlier_mask_pandas` on each column.
+
+    Returns:
+        Boolean mask with the shape, index and columns of `values`.
+    """
+    block = _as_block(values)
+    if engine is None and numba is None:
+        mask = np.zeros(block.shape, dtype=bool)
+        for j in range(block.shape[1]):
+            mask[:, j] = rolling_outlier_mask_pandas(block[:, j], window, mode, threshold, min_periods, lag)
+        return _wrap(mask, values)
+
+    min_periods = window if min_periods is None else min_periods
+    lo, hi = row_window_bounds(len(block), window, mode)
+
+    median, counts = window_stat(block, lo, hi, "median", engine=engine)
+    median[counts < min_periods] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        abs_dev = np.abs(block - _shift(median, lag))
+        mad, counts = window_stat(abs_dev, lo, hi, "mean", engine=engine)
+        mad[counts < min_periods] = np.nan
+        ratio = abs_dev / _shift(mad, lag)
+        mask = ratio >= threshold
+        near = np.abs(ratio - threshold) <= RECHECK_RTOL * threshold
+
+    for j in np.nonzero(near.any(axis=0))[0]:
+        exact = rolling_outlier_mask_pandas(block[:, j], window, mode, threshold, min_periods, lag)
+        mask[near[:, j], j] = exact[near[:, j]]
+    return _wrap(mask, values)
+
+
+# -------------------------
+# Leave-one-out calendar-window filter (Treasury spot-futures)
+# -------------------------
+def leave_one_out_median_mad(dates, values, window_days=45, engine=None):
+    """
+    Leave-self-out median and MAD over a ±window_days calendar window.
+
+    Args:
+        dates (array-like): Sorted dates shared by the series (no NaT).
+        values (array-like): Observations aligned with `dates`, one series or
+            a (rows x series) block; NaNs are ignored.
+        window_days (int): Half-width of the window in calendar days.
+        engine (str): "numba", "numpy", or None for numba when installed.
+
+    Returns:
+        tuple: (median, mad, lo, hi): statistics shaped like `values` plus the
+               window bounds. `mad` is the mean absolute deviation from
+               `median` and may differ from pandas in the last few ulps.
+    """
+    shape = np.shape(values)
+    block = _as_block(values)
+    lo, hi = window_bounds(dates, window_days)
+    median, _ = window_stat(block, lo, hi, "median", exclude_self=True, engine=engine)
+    mad, _ = window_stat(block, lo, hi, "mad", exclude_self=True, center=median, engine=engine)
+    return median.reshape(shape), mad.reshape(shape), lo, hi
+
+
+def _exact_ratio(values, i, lo, hi, median_val):
+    """Deviation ratio of row i computed with the original pandas expressions."""
+    window_vals = pd.Series(np.delete(values[lo:hi], i - lo))
+    abs_dev = abs(values[i] - median_val)
+    mad = window_vals.subtract(median_val).abs().mean()
+    if not mad > 0:
+        return np.nan
+    return abs_dev / mad
+
+
+def leave_one_out_outlier_flags(dates, values, window_days=45, threshold=10, engine=None):
+    """
+    Flag observations whose distance from the leave-self-out window median is
+    at least `threshold` times the window's mean absolute deviation.
+
+    Args:
+        dates (array-like): Sorted dates shared by the series (no NaT).
+        values (array-like): Observations aligned with `dates`, one series or
+            a (rows x series) block.
+        window_days (int): Half-width of the window in calendar days.
+        threshold (float): Ratio at or above which an observation is flagged.
+        engine (str): "numba", "numpy", or None for numba when installed.
+
+    Returns:
+        np.ndarray: Boolean flags shaped like `values`, identical to the
+                    row-by-row loop in `calc_treasury_data`.
+    """
+    shape = np.shape(values)
+    block = _as_block(values)
+    median, mad, lo, hi = leave_one_out_median_mad(dates, block, window_days, engine=engine)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.abs(block - median) / mad
+        flags = (mad > 0) & (ratio >= threshold)
+        near = (mad > 0) & (np.abs(ratio - threshold) <= RECHECK_RTOL * threshold)
+
+    for i, j in zip(*np.nonzero(near)):
+        flags[i, j] = _exact_ratio(block[:, j], i, lo[i], hi[i], median[i, j]) >= threshold
+    return flags.reshape(shape)
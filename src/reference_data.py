@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+reference_data.py
+
+Local Parquet store of the Siriwardane et al. reference spreads.
+
+`load_combined_spreads_wide` read arbitrage_spread_wide.dta straight from
+Dropbox with `pd.read_stata(url)` on every call, so every test and comparison
+run waited on the network and the Stata parser. Here the .dta is downloaded
+once (through http_cache) and converted to
+
+    <DATA_DIR>/arbitrage_spread_wide.parquet
+
+indexed by date, with the `SPREAD_NAMES` renames applied (raw_tfut_10 ->
+Treasury_SF_10Y, ...). Later loads memory-map that file and read only the
+requested columns. `refresh=True` revalidates the download and rebuilds the
+Parquet file if the .dta changed.
+
+Usage:
+    import reference_data
+    df = reference_data.load_spreads_wide()                          # the renamed raw_* spreads
+    df = reference_data.load_spreads_wide(["Treasury_SF_10Y"])
+    df = reference_data.load_spreads_wide(raw=True)                  # every column, Stata names
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import http_cache
+from settings import config
+
+DATA_DIR = Path(config("DATA_DIR"))
+
+SPREADS_WIDE_URL = "https://www.dropbox.com/scl/fi/81jm3dbe856i7p17rjy87/arbitrage_spread_wide.dta?rlkey=ke78u464vucmn43zt27nzkxya&st=59g2n7dt&dl=1"
+SPREADS_WIDE_FILE = "arbitrage_spread_wide.parquet"
+
+# Stata name of each raw spread -> name used across the pipeline
+SPREAD_NAMES = {
+    "raw_box_12m": "Box_06m",
+    "raw_box_18m": "Box_12m",
+    "raw_box_6m": "Box_18m",
+    "raw_cal_dow": "Eq_SF_Dow",
+    "raw_cal_ndaq": "Eq_SF_NDAQ",
+    "raw_cal_spx": "Eq_SF_SPX",
+    "raw_cds_bond_hy": "CDS_Bond_HY",
+    "raw_cds_bond_ig": "CDS_Bond_IG",
+    "raw_cip_aud": "CIP_AUD",
+    "raw_cip_cad": "CIP_CAD",
+    "raw_cip_chf": "CIP_CHF",
+    "raw_cip_eur": "CIP_EUR",
+    "raw_cip_gbp": "CIP_GBP",
+    "raw_cip_jpy": "CIP_JPY",
+    "raw_cip_nzd": "CIP_NZD",
+    "raw_cip_sek": "CIP_SEK",
+    "raw_tfut_10": "Treasury_SF_10Y",
+    "raw_tfut_2": "Treasury_SF_02Y",
+    "raw_tfut_20": "Treasury_SF_20Y",
+    "raw_tfut_30": "Treasury_SF_30Y",
+    "raw_tfut_5": "Treasury_SF_05Y",
+    "raw_tips_treas_10": "TIPS_Treasury_10Y",
+    "raw_tips_treas_2": "TIPS_Treasury_02Y",
+    "raw_tips_treas_20": "TIPS_Treasury_20Y",
+    "raw_tips_treas_5": "TIPS_Treasury_05Y",
+    "raw_tswap_1": "Treasury_Swap_01Y",
+    "raw_tswap_10": "Treasury_Swap_10Y",
+    "raw_tswap_2": "Treasury_Swap_02Y",
+    "raw_tswap_20": "Treasury_Swap_20Y",
+    "raw_tswap_3": "Treasury_Swap_03Y",
+    "raw_tswap_30": "Treasury_Swap_30Y",
+    "raw_tswap_5": "Treasury_Swap_05Y",
+}
+STATA_NAMES = {v: k for k, v in SPREAD_NAMES.items()}
+
+
+def convert_spreads_wide(dta_path, out_path):
+    """Convert the .dta to a date-indexed Parquet file with the renames applied."""
+    df = pd.read_stata(dta_path).set_index("date").rename(columns=SPREAD_NAMES)
+    if df.columns.duplicated().any():
+        dupes = sorted(df.columns[df.columns.duplicated()])
+        raise ValueError(f"Renamed spread columns collide with existing columns: {dupes}")
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def spreads_wide_path(data_dir=DATA_DIR, refresh=False):
+    """
+    Path of the Parquet store, downloading and converting the .dta on first use.
+    With `refresh`, the download is revalidated and the store rebuilt if it changed.
+    """
+    path = Path(data_dir) / SPREADS_WIDE_FILE
+    if path.exists() and not refresh:
+        return path
+    dta_path = http_cache.fetch(SPREADS_WIDE_URL)
+    if not path.exists() or dta_path.stat().st_mtime > path.stat().st_mtime:
+        convert_spreads_wide(dta_path, path)
+    return path
+
+
+def load_spreads_wide(columns=None, raw=False, data_dir=DATA_DIR, refresh=False):
+    """
+    Reference spreads indexed by date, read from the memory-mapped Parquet store.
+
+    Args:
+        columns (list): spreads to read (pipeline names); default: all of SPREAD_NAMES.
+        raw (bool): every column of the .dta, with its Stata names (ignores `columns`).
+        refresh (bool): revalidate the download first.
+
+    Returns:
+        DataFrame: indexed by 'date'.
+    """
+    path = spreads_wide_path(data_dir, refresh)
+    if raw:
+        return pd.read_parquet(path, memory_map=True).rename(columns=STATA_NAMES)
+    columns = list(SPREAD_NAMES.values()) if columns is None else list(columns)
+    return pd.read_parquet(path, columns=columns, memory_map=True)
@@ -51,6 +51,8 @@ pip install {deps}
 # 3) Download settings.py and the scraper
 aws s3 cp s3://{s3_bucket}/{s3_scripts_prefix}settings.py   ./settings.py
 aws s3 cp s3://{s3_bucket}/{s3_scripts_prefix}{script}     ./{script}
+aws s3 cp s3://{s3_bucket}/{s3_scripts_prefix}fed_curve_store.py ./fed_curve_store.py
+aws s3 cp s3://{s3_bucket}/{s3_scripts_prefix}http_cache.py ./http_cache.py
 
 # 4) If CRSP scraper, export both WRDS creds
 if [[ "{script}" == "scraper_4_pull_CRSP.py" ]]; then
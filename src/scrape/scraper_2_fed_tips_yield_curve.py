@@ -5,7 +5,13 @@ from io import BytesIO
 from pathlib import Path
 
 import argparse
+import os
+import sys
 import boto3
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import fed_curve_store
 
 DATA_DIR = config("DATA_DIR")
 
@@ -42,8 +48,29 @@ if __name__ == '__main__':
     p.add_argument('--s3_bucket',   required=True)
     p.add_argument('--s3_prefix',   default='')
     p.add_argument('--aws_region',  default='us-east-1')
+    p.add_argument('--incremental', action='store_true',
+                   help="Upload only the days published since the last run to the curve store on S3")
     args = p.parse_args()
 
+    if args.incremental:
+        # The instance keeps nothing between runs: the state comes from S3,
+        # and only the new fragments and the state go back.
+        s3 = boto3.client('s3', region_name=args.aws_region)
+        store = fed_curve_store.store_path('tips', DATA_DIR)
+        store.mkdir(parents=True, exist_ok=True)
+        prefix = f"{args.s3_prefix}{store.name}/"
+        try:
+            s3.download_file(args.s3_bucket, f"{prefix}_state.json", str(store / '_state.json'))
+        except ClientError:
+            print("No curve store on S3 yet: pulling the whole history")
+        _, paths, _ = fed_curve_store.update('tips', DATA_DIR)
+        for path in paths + [store / '_state.json']:
+            key = prefix + path.relative_to(store).as_posix()
+            print(f"Uploading → s3://{args.s3_bucket}/{key}")
+            s3.upload_file(str(path), args.s3_bucket, key)
+        print("Done.")
+        sys.exit(0)
+
     df = pull_fed_tips_yield_curve()
     rename_map = {
         'TIPSY02': 'TIPS_Treasury_02Y',
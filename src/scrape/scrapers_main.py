@@ -5,6 +5,7 @@ from settings import config
 from s3_utils import ensure_s3_bucket
 from launch_scraper_instances import launch_scraper_instances
 import time
+from pathlib import Path
 
 '''
 python scrapers_main.py  --num_instances 4
@@ -59,9 +60,11 @@ if __name__ == '__main__':
         'scraper_3_expectations.py',
         #'scraper_4_pull_CRSP.py',
         'requirements.txt',
-        'settings.py'
+        'settings.py',
+        '../fed_curve_store.py',  # used by the Fed curve scrapers' --incremental mode
+        '../http_cache.py',       # imported by fed_curve_store.py
     ):
-        key = f"{S3_SCRIPTS}{fname}"
+        key = f"{S3_SCRIPTS}{Path(fname).name}"
         print(f"Uploading {fname} → s3://{BUCKET}/{key}")
         s3.upload_file(fname, BUCKET, key)
 
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+streaming_stats.py
+
+Mergeable summary statistics for daily spread panels (CIP, TIPS-Treasury,
+Treasury spot-futures, equity spot).
+
+Summary tables (pandas `describe()`, `corr()` and yearly
+`resample('YE').agg([...])`) were recomputed over the full history every time
+a spread series was refreshed. Here the history is kept as one accumulator
+per calendar year. New days are folded into their year's block, and the
+overall, annual and correlation tables are read off the blocks, merging them
+where needed.
+
+Each `MomentAccumulator` covers a block of rows of k series and stores:
+
+    - pairwise-complete counts, means, centered sums of squares and
+      co-moments (k x k), so correlations use the same pairwise-complete
+      rows as `DataFrame.corr()`; the diagonal gives each series' count,
+      mean and variance;
+    - the minimum and maximum of each series;
+    - a `QuantileSketch` per series for the percentiles.
+
+Blocks merge with the pairwise update of Chan, Golub and LeVeque, which
+works on centered moments rather than raw sums of squares and so does not
+lose precision when a mean is large relative to the spread.
+
+The quantile sketch keeps every value until it holds more than `capacity`
+points and then compresses to weighted centroids of equal weight. Until then
+the percentiles equal pandas' (linear interpolation); decades of daily data
+stay well below the default capacity.
+
+Usage:
+    stats = YearlyStats()
+    stats.update(spreads)                 # full history once
+    stats.append(new_spreads)             # later: only days after stats.last_date
+    tables = stats.tables()               # overall / correlation / annual
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 10_000
+ANNUAL_AGGS = ("mean", "std", "min", "max")
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def _divide(a, b):
+    """a / b, NaN where b == 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b > 0, a / np.where(b > 0, b, 1), np.nan)
+
+
+class QuantileSketch:
+    """
+    Mergeable sketch of one series for quantiles.
+
+    Points are (value, weight) pairs. With unit weights the quantiles are
+    exact; once more than `capacity` points are held they are compressed
+    to `capacity` centroids of equal weight.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float)
+        x = x[~np.isnan(x)]
+        self._add(x, np.ones(len(x)))
+        return self
+
+    def merge(self, other):
+        out = QuantileSketch(max(self.capacity, other.capacity))
+        out.values, out.weights = self.values, self.weights
+        out._add(other.values, other.weights)
+        return out
+
+    def _add(self, values, weights):
+        order = np.argsort(np.concatenate([self.values, values]), kind="stable")
+        self.values = np.concatenate([self.values, values])[order]
+        self.weights = np.concatenate([self.weights, weights])[order]
+        if len(self.values) > self.capacity:
+            self._compress()
+
+    def _compress(self):
+        cum = np.cumsum(self.weights)
+        bins = np.minimum(((cum - self.weights) * self.capacity / cum[-1]).astype(np.int64), self.capacity - 1)
+        weights = np.bincount(bins, weights=self.weights, minlength=self.capacity)
+        sums = np.bincount(bins, weights=self.values * self.weights, minlength=self.capacity)
+        keep = weights > 0
+        self.values, self.weights = sums[keep] / weights[keep], weights[keep]
+
+    def quantile(self, q):
+        """
+        Quantiles with linear interpolation between order statistics.
+
+        Each point sits at the middle rank of the observations it stands for,
+        so unit-weight sketches give `numpy.quantile(..., method="linear")`.
+        """
+        q = np.asarray(q, dtype=float)
+        n = self.count
+        if n == 0:
+            return np.full(q.shape, np.nan)
+        ranks = np.cumsum(self.weights) - (self.weights + 1) / 2
+        return np.interp(q * (n - 1), ranks, self.values)
+
+
+class MomentAccumulator:
+    """
+    Mergeable moments of a block of rows of k series.
+
+    Build with `from_block` (or `update`), combine with `merge`, and read the
+    statistics with `count`, `mean`, `var`, `std`, `minimum`, `maximum`,
+    `quantile`, `corr` and `describe`.
+    """
+
+    def __init__(self, columns, capacity=DEFAULT_CAPACITY):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.capacity = capacity
+        self.n = np.zeros((k, k))
+        self.mean_ = np.zeros((k, k))    # mean of series i over the rows where i and j are present
+        self.m2 = np.zeros((k, k))       # centered sum of squares of i over those rows
+        self.comoment = np.zeros((k, k))
+        self.min_ = np.full(k, np.nan)
+        self.max_ = np.full(k, np.nan)
+        self.sketches = [QuantileSketch(capacity) for _ in range(k)]
+
+    @classmethod
+    def from_block(cls, x, columns, capacity=DEFAULT_CAPACITY):
+        """Moments of a (rows x k) array or DataFrame."""
+        acc = cls(columns, capacity)
+        x = np.asarray(x, dtype=float)
+        if len(x) == 0:
+            return acc
+        present = ~np.isnan(x)
+        mask = present.astype(float)
+        # Center on the column means so the sums below stay small
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            shift = np.nan_to_num(np.nanmean(x, axis=0))
+        xc = np.where(present, x - shift, 0.0)
+
+        n = mask.T @ mask
+        s = xc.T @ mask                   # s[i, j]: sum of centered x_i where both present
+        acc.n = n
+        mean_c = _divide(s, n)
+        acc.mean_ = np.where(n > 0, mean_c + shift[:, None], 0.0)
+        acc.m2 = np.where(n > 0, (xc ** 2).T @ mask - s * np.nan_to_num(mean_c), 0.0)
+        acc.comoment = np.where(n > 0, xc.T @ xc - s * np.nan_to_num(mean_c.T), 0.0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            acc.min_ = np.nanmin(x, axis=0)
+            acc.max_ = np.nanmax(x, axis=0)
+        acc.sketches = [QuantileSketch(capacity).update(x[:, i]) for i in range(x.shape[1])]
+        return acc
+
+    def update(self, x):
+        """Fold the rows of x into this accumulator (in place)."""
+        merged = self.merge(MomentAccumulator.from_block(x, self.columns, self.capacity))
+        self.__dict__.update(merged.__dict__)
+        return self
+
+    def merge(self, other):
+        """A new accumulator holding the rows of both."""
+        if other.columns != self.columns:
+            raise ValueError(f"Cannot merge accumulators over different columns: {self.columns} vs {other.columns}")
+        out = MomentAccumulator(self.columns, max(self.capacity, other.capacity))
+        na, nb = self.n, other.n
+        n = na + nb
+        wb = _divide(nb, n)
+        nab = _divide(na * nb, n)
+        delta = other.mean_ - self.mean_
+        out.n = n
+        out.mean_ = np.where(n > 0, self.mean_ + delta * np.nan_to_num(wb), 0.0)
+        out.m2 = np.where(n > 0, self.m2 + other.m2 + delta ** 2 * np.nan_to_num(nab), 0.0)
+        out.comoment = np.where(n > 0, self.comoment + other.comoment + delta * delta.T * np.nan_to_num(nab), 0.0)
+        out.min_ = np.fmin(self.min_, other.min_)
+        out.max_ = np.fmax(self.max_, other.max_)
+        out.sketches = [a.merge(b) for a, b in zip(self.sketches, other.sketches)]
+        return out
+
+    @classmethod
+    def merge_all(cls, accumulators, columns=None):
+        accumulators = list(accumulators)
+        if not accumulators:
+            return cls(columns or [])
+        out = accumulators[0]
+        for acc in accumulators[1:]:
+            out = out.merge(acc)
+        return out
+
+    def _series(self, values):
+        return pd.Series(values, index=self.columns, dtype=float)
+
+    def count(self):
+        return self._series(np.diag(self.n))
+
+    def mean(self):
+        n = np.diag(self.n)
+        return self._series(np.where(n > 0, np.diag(self.mean_), np.nan))
+
+    def var(self, ddof=1):
+        return self._series(_divide(np.diag(self.m2), np.diag(self.n) - ddof))
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+    def minimum(self):
+        return self._series(self.min_)
+
+    def maximum(self):
+        return self._series(self.max_)
+
+    def quantile(self, q):
+        """DataFrame with one row per quantile in q, like `DataFrame.quantile`."""
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        return pd.DataFrame(np.column_stack([s.quantile(q) for s in self.sketches]) if self.sketches
+                            else np.empty((len(q), 0)), index=q, columns=self.columns)
+
+    def corr(self):
+        """Pearson correlations over pairwise-complete rows, like `DataFrame.corr()`."""
+        denom = np.sqrt(self.m2 * self.m2.T)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.where((self.n > 1) & (denom > 0), self.comoment / denom, np.nan)
+        return pd.DataFrame(np.clip(r, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+    def describe(self, percentiles=DESCRIBE_PERCENTILES):
+        """The table of `DataFrame.describe()` for numeric columns."""
+        quantiles = self.quantile(percentiles)
+        quantiles.index = [f"{100 * p:g}%" for p in percentiles]
+        return pd.concat([
+            pd.DataFrame({"count": self.count(), "mean": self.mean(), "std": self.std(),
+                          "min": self.minimum()}).T,
+            quantiles,
+            self.maximum().to_frame("max").T,
+        ])
+
+
+class YearlyStats:
+    """
+    One `MomentAccumulator` per calendar year of a daily panel.
+
+    `update` folds rows into their years' blocks; `append` folds only the
+    rows dated after `last_date`, so a refreshed series can be passed in
+    whole. Only the blocks of the years touched are rebuilt.
+    """
+
+    def __init__(self, columns=None, capacity=DEFAULT_CAPACITY):
+        self.columns = list(columns) if columns is not None else None
+        self.capacity = capacity
+        self.blocks = {}
+        self.last_date = None
+        self.index_name = None
+
+    def update(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        df = df[self.columns]
+        index = pd.DatetimeIndex(df.index)
+        self.index_name = index.name
+        if len(index) == 0:
+            return self
+        values = df.to_numpy(dtype=float)
+        years = index.year
+        for year in np.unique(years).tolist():
+            block = MomentAccumulator.from_block(values[years == year], self.columns, self.capacity)
+            self.blocks[year] = self.blocks[year].merge(block) if year in self.blocks else block
+        last = index.max()
+        self.last_date = last if self.last_date is None else max(self.last_date, last)
+        return self
+
+    def append(self, df):
+        """Fold only the rows after `last_date`."""
+        if self.last_date is not None:
+            df = df.loc[pd.DatetimeIndex(df.index) > self.last_date]
+        return self.update(df)
+
+    def overall(self):
+        return MomentAccumulator.merge_all((self.blocks[y] for y in sorted(self.blocks)), self.columns)
+
+    def annual(self, aggs=ANNUAL_AGGS):
+        """
+        Yearly statistics like `df.resample('YE').agg(list(aggs))`: one row per
+        year end, columns (series, statistic).
+        """
+        if not self.blocks:
+            return pd.DataFrame()
+        years = range(min(self.blocks), max(self.blocks) + 1)
+        getters = {"mean": "mean", "std": "std", "min": "minimum", "max": "maximum", "count": "count"}
+        empty = MomentAccumulator(self.columns, self.capacity)
+        rows = []
+        for year in years:
+            block = self.blocks.get(year, empty)
+            rows.append(np.column_stack([getattr(block, getters[agg])().to_numpy() for agg in aggs]).ravel())
+        index = pd.DatetimeIndex([pd.Timestamp(year, 12, 31) for year in years], freq="YE", name=self.index_name)
+        columns = pd.MultiIndex.from_product([self.columns, list(aggs)])
+        return pd.DataFrame(rows, index=index, columns=columns)
+
+    def tables(self):
+        """Overall describe(), correlation matrix and annual statistics."""
+        overall = self.overall()
+        return {
+            "overall_statistics": overall.describe(),
+            "correlation_matrix": overall.corr(),
+            "annual_statistics": self.annual(),
+        }
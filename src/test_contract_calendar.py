@@ -0,0 +1,55 @@
+import calendar
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from contract_calendar import last_weekday, parse_contract_month_year, settlement_dates, third_friday
+
+
+def test_third_friday_matches_month_calendar():
+    for year in range(1995, 2035):
+        for month in range(1, 13):
+            fridays = [w[calendar.FRIDAY] for w in calendar.monthcalendar(year, month) if w[calendar.FRIDAY]]
+            assert third_friday(year, month) == datetime(year, month, fridays[2])
+
+
+def test_last_weekday():
+    assert last_weekday(2021, 7) == datetime(2021, 7, 30)   # 31st is a Saturday
+    assert last_weekday(2022, 7) == datetime(2022, 7, 29)   # 31st is a Sunday
+    assert last_weekday(2024, 5) == datetime(2024, 5, 31)
+
+
+def test_settlement_dates_match_row_by_row():
+    specs = pd.Series(["DEC 10", "MAR 11", None, "DEC 10", " .NA.", "", "JUN 99", "SEP 11"] * 50,
+                      index=np.arange(400) * 3)
+    expected = []
+    for spec in specs:
+        month, year = parse_contract_month_year(spec)
+        expected.append(None if month is None else third_friday(year, month))
+    expected = pd.Series(pd.to_datetime(expected), index=specs.index)
+
+    pd.testing.assert_series_equal(settlement_dates(specs), expected)
+    pd.testing.assert_series_equal(settlement_dates(specs.astype("category")), expected)
+    assert settlement_dates(specs).iloc[6] == pd.Timestamp("1999-06-18")
+
+
+def test_months_outside_cycle():
+    specs = pd.Series(["DEC 10", "JAN 11"])
+    assert settlement_dates(specs).isna().tolist() == [False, True]
+    with pytest.raises(ValueError, match="JAN 11"):
+        settlement_dates(specs, strict=True)
+
+
+def test_last_business_day_from_trading_days():
+    trading_days = pd.bdate_range("2021-01-01", "2021-12-28")   # data ends before the end of December
+    specs = pd.Series(["MAR 21", "SEP 21", "DEC 21", "MAR 22"])
+
+    out = settlement_dates(specs, "last_business_day", trading_days=trading_days)
+    assert out.tolist()[:3] == [pd.Timestamp("2021-03-31"), pd.Timestamp("2021-09-30"), pd.Timestamp("2021-12-28")]
+    assert pd.isna(out.iloc[3])
+
+    out = settlement_dates(specs, "last_business_day", trading_days=trading_days, overrides={"MAR 22": 31})
+    assert out.iloc[3] == pd.Timestamp("2022-03-31")
+    assert settlement_dates(specs, "last_business_day").iloc[3] == pd.Timestamp("2022-03-31")
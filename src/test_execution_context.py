@@ -0,0 +1,58 @@
+"""
+Unit tests for the shared Dask execution context
+"""
+
+import dask.dataframe as dd
+import pandas as pd
+import pytest
+
+import execution_context
+
+
+@pytest.fixture(autouse=True)
+def fresh_context(monkeypatch):
+    monkeypatch.setattr(execution_context, "_state",
+                        {"mode": None, "client": None, "cluster": None, "client_kwargs": {}})
+    yield
+    execution_context.shutdown()
+
+
+def test_default_mode_starts_nothing(monkeypatch):
+    monkeypatch.setattr(execution_context, "config", lambda key, default=None: default)
+    assert execution_context.get_mode() == "threads"
+    assert execution_context.get_client() is None
+    assert execution_context.n_workers() >= 1
+
+
+def test_scheduler_address_selects_remote(monkeypatch):
+    env = {"DASK_SCHEDULER_ADDRESS": "tcp://scheduler:8786"}
+    monkeypatch.setattr(execution_context, "config", lambda key, default=None: env.get(key, default))
+    assert execution_context.default_mode() == "remote"
+    env["DASK_EXECUTION_MODE"] = "sync"
+    assert execution_context.default_mode() == "sync"
+
+
+def test_compute_in_every_local_mode():
+    ddf = dd.from_pandas(pd.DataFrame({"x": range(100)}), npartitions=4)
+    for mode in ("sync", "threads"):
+        with execution_context.use_mode(mode):
+            assert execution_context.compute(ddf.x.sum()) == 4950
+            with execution_context.activate():
+                assert ddf.x.max().compute() == 99
+
+
+def test_local_cluster_is_shared_and_shut_down():
+    execution_context.set_mode("threads")
+    with execution_context.use_mode("local", n_workers=1, processes=False, dashboard_address=None):
+        client = execution_context.get_client()
+        assert execution_context.get_client() is client
+        assert execution_context.n_workers() == 1
+        ddf = dd.from_pandas(pd.DataFrame({"x": range(10)}), npartitions=2)
+        assert execution_context.compute(ddf.x.sum(), ddf.x.max()) == (45, 9)
+    assert client.status == "closed"
+    assert execution_context.get_mode() == "threads"
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        execution_context.set_mode("gpu")
@@ -0,0 +1,167 @@
+"""
+Unit tests for the incremental Fed yield-curve store, against a local HTTP server
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fed_curve_store
+
+NOTES = "Series notes\nThe yields are continuously compounded\n\n\n"
+
+
+def curve_csv(dates, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(3, 1, (len(dates), 3)).round(4), columns=["SVENY01", "SVENY02", "SVENY03"])
+    df.insert(0, "Date", dates.strftime("%Y-%m-%d"))
+    df.loc[df.index[::50], "SVENY03"] = np.nan
+    return (NOTES + df.to_csv(index=False, na_rep="NA")).encode()
+
+
+class CurveServer:
+    """Serves `body` at /curve.csv, honouring Range requests unless `ranges` is False."""
+
+    def __init__(self):
+        self.body, self.ranges, self.sent = b"", True, 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body, status, headers = server.body, 200, {}
+                spec = self.headers.get("Range")
+                if spec and server.ranges:
+                    start = int(spec.split("=")[1].split("-")[0])
+                    status, headers["Content-Range"] = 206, f"bytes {start}-{len(body) - 1}/{len(body)}"
+                    body = body[start:]
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/curve.csv"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def server():
+    s = CurveServer()
+    yield s
+    s.httpd.shutdown()
+
+
+def expected_frame(body):
+    df = pd.read_csv(StringIO(body.decode()), skiprows=NOTES.count("\n"), index_col=0, parse_dates=True)
+    return df.astype(float)
+
+
+def test_daily_update_reads_only_the_tail(server, tmp_path):
+    dates = pd.bdate_range("1990-01-01", "2020-12-31")
+    server.body = curve_csv(dates[:-3])
+    frame, paths, mode = fed_curve_store.update("nominal", tmp_path, url=server.url)
+    assert mode == "full" and len(frame) == len(dates) - 3
+    assert len(paths) == 31  # one fragment per year
+
+    server.body, server.sent = curve_csv(dates), 0
+    frame, paths, mode = fed_curve_store.update("nominal", tmp_path, url=server.url)
+    assert mode == "tail"
+    assert server.sent < fed_curve_store.TAIL_OVERLAP + 1024
+    assert list(frame.index) == list(dates[-3:])
+    assert len(paths) == 1
+
+    store = fed_curve_store.store_path("nominal", tmp_path)
+    assert fed_curve_store.read_state(store)["high_water_mark"] == "2020-12-31"
+    pd.testing.assert_frame_equal(fed_curve_store.load(store), expected_frame(server.body), check_freq=False)
+
+    frame, paths, mode = fed_curve_store.update("nominal", tmp_path, url=server.url)
+    assert len(frame) == 0 and paths == []
+
+
+def test_server_without_ranges_falls_back_to_streaming(server, tmp_path):
+    dates = pd.bdate_range("2015-01-01", "2016-06-30")
+    server.body, server.ranges = curve_csv(dates[:-5]), False
+    fed_curve_store.update("tips", tmp_path, url=server.url)
+
+    server.body = curve_csv(dates)
+    frame, paths, mode = fed_curve_store.update("tips", tmp_path, url=server.url)
+    assert mode == "full"
+    assert list(frame.index) == list(dates[-5:])
+    store = fed_curve_store.store_path("tips", tmp_path)
+    pd.testing.assert_frame_equal(fed_curve_store.load(store), expected_frame(server.body), check_freq=False)
+
+
+def test_rewritten_file_is_read_in_full(server, tmp_path):
+    dates = pd.bdate_range("2018-01-01", "2019-12-31")
+    server.body = curve_csv(dates[:-2])
+    fed_curve_store.update("nominal", tmp_path, url=server.url)
+
+    # Fewer bytes than before: the tail cannot be trusted
+    server.body = curve_csv(dates[300:])
+    frame, _, mode = fed_curve_store.update("nominal", tmp_path, url=server.url)
+    assert mode == "full"
+    assert list(frame.index) == list(dates[-2:])
+
+
+def test_compact_merges_fragments_and_exports(server, tmp_path):
+    dates = pd.bdate_range("2019-01-01", "2020-03-31")
+    for stop in (-40, -20, None):
+        server.body = curve_csv(dates[:stop])
+        fed_curve_store.update("nominal", tmp_path, url=server.url)
+    store = fed_curve_store.store_path("nominal", tmp_path)
+    before = fed_curve_store.load(store)
+    assert len(fed_curve_store.fragments(store)) == 4
+
+    assert fed_curve_store.compact("nominal", tmp_path, export_flat=True) == 2
+    pd.testing.assert_frame_equal(fed_curve_store.load(store), before)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "fed_yield_curve.parquet"), before)
+
+
+def test_interrupted_compact_keeps_the_year(server, tmp_path, monkeypatch):
+    dates = pd.bdate_range("2019-01-01", "2019-06-28")
+    for stop in (-20, None):
+        server.body = curve_csv(dates[:stop])
+        fed_curve_store.update("nominal", tmp_path, url=server.url)
+    store = fed_curve_store.store_path("nominal", tmp_path)
+    before = fed_curve_store.load(store)
+
+    # Remove one fragment, then stop
+    unlink, calls = fed_curve_store.Path.unlink, []
+
+    def interrupted_unlink(self, *args, **kwargs):
+        calls.append(self)
+        if len(calls) > 1:
+            raise OSError("interrupted")
+        unlink(self, *args, **kwargs)
+
+    monkeypatch.setattr(fed_curve_store.Path, "unlink", interrupted_unlink)
+    with pytest.raises(OSError, match="interrupted"):
+        fed_curve_store.compact("nominal", tmp_path)
+    monkeypatch.undo()
+
+    pd.testing.assert_frame_equal(fed_curve_store.load(store), before)
+    assert fed_curve_store.compact("nominal", tmp_path) == 1
+    pd.testing.assert_frame_equal(fed_curve_store.load(store), before)
+
+
+def test_update_exports_the_new_dates(server, tmp_path):
+    dates = pd.bdate_range("2019-11-01", "2020-01-31")
+    server.body = curve_csv(dates[:-5])
+    fed_curve_store.update("tips", tmp_path, url=server.url, export_flat=True)
+    flat = tmp_path / "fed_tips_yield_curve.parquet"
+    assert pd.read_parquet(flat)["Date"].max() == dates[-6]
+
+    server.body = curve_csv(dates)
+    fed_curve_store.update("tips", tmp_path, url=server.url, export_flat=True)
+    exported = pd.read_parquet(flat).set_index("Date")
+    pd.testing.assert_frame_equal(exported, expected_frame(server.body))
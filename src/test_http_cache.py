@@ -0,0 +1,103 @@
+"""
+Unit tests for the conditional HTTP fetch cache, against a local HTTP server
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import http_cache
+
+
+class Server:
+    """Serves `body` with an ETag; answers conditional requests with 304."""
+
+    def __init__(self):
+        self.body, self.etag, self.failures = b"a,b\n1,2\n", '"v1"', 0
+        self.statuses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.failures:
+                    server.failures -= 1
+                    status, body = 503, b""
+                elif server.etag and self.headers.get("If-None-Match") == server.etag:
+                    status, body = 304, b""
+                else:
+                    status, body = 200, server.body
+                server.statuses.append(status)
+                self.send_response(status)
+                if server.etag:
+                    self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/data.csv"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def server():
+    s = Server()
+    yield s
+    s.httpd.shutdown()
+
+
+def test_unchanged_resource_is_revalidated_not_downloaded(server, tmp_path):
+    first = http_cache.fetch(server.url, cache_dir=tmp_path, offline=False)
+    second = http_cache.fetch(server.url, cache_dir=tmp_path, offline=False)
+    assert first == second and second.read_bytes() == server.body
+    assert server.statuses == [200, 304]
+    assert http_cache.read_metadata(server.url, tmp_path)["status"] == 304
+
+    server.body, server.etag = b"a,b\n3,4\n", '"v2"'
+    assert http_cache.fetch_bytes(server.url, cache_dir=tmp_path, offline=False) == server.body
+    assert server.statuses == [200, 304, 200]
+
+
+def test_max_age_skips_revalidation(server, tmp_path):
+    http_cache.fetch(server.url, cache_dir=tmp_path, offline=False)
+    http_cache.fetch(server.url, cache_dir=tmp_path, offline=False, max_age=3600)
+    assert server.statuses == [200]
+
+
+def test_server_errors_are_retried(server, tmp_path):
+    server.failures = 2
+    path = http_cache.fetch(server.url, cache_dir=tmp_path, offline=False)
+    assert path.read_bytes() == server.body
+    assert server.statuses == [503, 503, 200]
+
+
+def test_offline_mode_and_network_failure_serve_the_cache(server, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        http_cache.fetch(server.url, cache_dir=tmp_path, offline=True)
+    http_cache.fetch(server.url, cache_dir=tmp_path, offline=False)
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+    assert http_cache.fetch_bytes(server.url, cache_dir=tmp_path, offline=True) == server.body
+    with pytest.warns(UserWarning):
+        path = http_cache.fetch(server.url, cache_dir=tmp_path, offline=False, session=requests.Session())
+    assert path.read_bytes() == server.body
+    assert server.statuses == [200]
+
+
+def test_server_error_after_retries_serves_the_cache(server, tmp_path):
+    server.failures = 1
+    with pytest.raises(requests.HTTPError):
+        http_cache.fetch(server.url, cache_dir=tmp_path, offline=False, session=requests.Session())
+
+    http_cache.fetch(server.url, cache_dir=tmp_path, offline=False)
+    server.failures = 1
+    with pytest.warns(UserWarning, match="HTTP 503"):
+        path = http_cache.fetch(server.url, cache_dir=tmp_path, offline=False, session=requests.Session())
+    assert path.read_bytes() == server.body
+    assert server.statuses == [503, 200, 503]
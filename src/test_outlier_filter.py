@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from outlier_filter import (leave_one_out_median_mad, numba, rolling_outlier_mask,
+                            rolling_outlier_mask_pandas, row_window_bounds, window_bounds,
+                            window_stat)
+
+ENGINES = ["numpy", pytest.param("numba", marks=pytest.mark.skipif(numba is None, reason="numba not installed"))]
+
+
+@pytest.fixture(scope="module")
+def block():
+    """Eight random-walk series with spikes, NaN runs and a flat stretch."""
+    rng = np.random.default_rng(0)
+    x = rng.normal(0, 1, (600, 8)).cumsum(axis=0) * 0.2 + rng.normal(0, 1, (600, 8))
+    spikes = rng.choice(x.size, 40, replace=False)
+    x.flat[spikes] += rng.choice([-1, 1], 40) * 60
+    x[rng.random(x.shape) < 0.03] = np.nan
+    x[100:160, 2] = np.nan
+    x[300:400, 5] = 1.5
+    return pd.DataFrame(x, columns=list("ABCDEFGH"))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("mode, window, min_periods, lag, threshold", [
+    ("trailing", 45, None, 0, 10),  # CIP
+    ("centered", 91, 1, 1, 10),     # equity spot
+    ("centered", 10, 3, 0, 2.5),    # even centered window
+])
+def test_mask_matches_pandas(block, engine, mode, window, min_periods, lag, threshold):
+    """Every column of the block gets exactly the pandas reference flags."""
+    mask = rolling_outlier_mask(block, window=window, mode=mode, threshold=threshold,
+                                min_periods=min_periods, lag=lag, engine=engine)
+    assert list(mask.columns) == list(block.columns)
+    for col in block.columns:
+        expected = rolling_outlier_mask_pandas(block[col], window, mode, threshold, min_periods, lag)
+        np.testing.assert_array_equal(mask[col].to_numpy(), expected, err_msg=col)
+    assert mask.to_numpy().sum() > 0, "Synthetic spikes should be flagged"
+
+
+def test_default_without_numba_is_pandas(block, monkeypatch):
+    """Without numba the fixed-window filter runs the pandas reference, not the NumPy engine."""
+    import outlier_filter
+
+    def no_engine(*args, **kwargs):
+        raise AssertionError("window_stat should not be called")
+
+    monkeypatch.setattr(outlier_filter, "numba", None)
+    monkeypatch.setattr(outlier_filter, "window_stat", no_engine)
+    mask = rolling_outlier_mask(block, window=91, mode="centered", min_periods=1, lag=1)
+    for col in block.columns:
+        expected = rolling_outlier_mask_pandas(block[col], 91, "centered", 10.0, 1, 1)
+        np.testing.assert_array_equal(mask[col].to_numpy(), expected, err_msg=col)
+    series = rolling_outlier_mask(block["A"], window=45)
+    assert isinstance(series, pd.Series) and series.name == "A"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_median_is_leave_self_out(engine):
+    """The median for each row ignores the row itself and NaNs in the window."""
+    dates = pd.to_datetime(["2020-01-01", "2020-01-02", "2020-01-03", "2020-03-30"])
+    values = np.array([1.0, 100.0, np.nan, 7.0])
+    median, mad, lo, hi = leave_one_out_median_mad(dates, values, window_days=45, engine=engine)
+    np.testing.assert_array_equal(lo, [0, 0, 0, 3])
+    np.testing.assert_array_equal(hi, [3, 3, 3, 4])
+    np.testing.assert_array_equal(median[:3], [100.0, 1.0, 50.5])
+    assert np.isnan(median[3]) and np.isnan(mad[3]), "An empty window has no statistics"
+
+
+@pytest.mark.skipif(numba is None, reason="numba not installed")
+def test_engines_agree(block):
+    lo, hi = row_window_bounds(len(block), 45, "centered")
+    med_np, n_np = window_stat(block, lo, hi, "median", engine="numpy")
+    med_nb, n_nb = window_stat(block, lo, hi, "median", engine="numba")
+    np.testing.assert_array_equal(med_np, med_nb)
+    np.testing.assert_array_equal(n_np, n_nb)
+    mad_np, _ = window_stat(block, lo, hi, "mad", center=med_np, engine="numpy")
+    mad_nb, _ = window_stat(block, lo, hi, "mad", center=med_nb, engine="numba")
+    np.testing.assert_allclose(mad_np, mad_nb, rtol=1e-12)
+
+
+def test_row_window_bounds_match_pandas():
+    """Bounds follow pandas' fixed-window indexer, including even centered windows."""
+    lo, hi = row_window_bounds(6, 4, "centered")
+    np.testing.assert_array_equal(lo, [0, 0, 0, 1, 2, 3])
+    np.testing.assert_array_equal(hi, [2, 3, 4, 5, 6, 6])
+    lo, hi = row_window_bounds(4, 3, "trailing")
+    np.testing.assert_array_equal(lo, [0, 0, 0, 1])
+    np.testing.assert_array_equal(hi, [1, 2, 3, 4])
+
+
+def test_window_bounds_are_calendar_days():
+    """Window edges are inclusive at exactly ±window_days."""
+    dates = pd.to_datetime(["2020-01-01", "2020-02-15", "2020-02-16"])
+    lo, hi = window_bounds(dates, window_days=45)
+    np.testing.assert_array_equal(lo, [0, 0, 1])
+    np.testing.assert_array_equal(hi, [2, 3, 3])
@@ -0,0 +1,61 @@
+"""
+Unit tests for the local Parquet store of the reference spreads
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import reference_data
+
+
+@pytest.fixture
+def dta(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(40, 4)), columns=["raw_tfut_10", "raw_cip_aud", "tfut_10", "raw_box_6m"])
+    df.iloc[::7, 0] = np.nan
+    df.insert(0, "date", pd.date_range("2010-01-04", periods=40, freq="B"))
+    path = tmp_path / "arbitrage_spread_wide.dta"
+    df.to_stata(path, write_index=False)
+
+    calls = []
+
+    def fetch(url, **kwargs):
+        calls.append(url)
+        return path
+
+    monkeypatch.setattr(reference_data.http_cache, "fetch", fetch)
+    return path, calls
+
+
+def test_dta_is_downloaded_and_converted_once(dta, tmp_path):
+    path, calls = dta
+    store = tmp_path / "store"
+    first = reference_data.load_spreads_wide(["Treasury_SF_10Y", "CIP_AUD"], data_dir=store)
+    second = reference_data.load_spreads_wide(["Treasury_SF_10Y"], data_dir=store)
+    assert len(calls) == 1
+    assert (store / reference_data.SPREADS_WIDE_FILE).exists()
+
+    expected = pd.read_stata(path).set_index("date")
+    pd.testing.assert_series_equal(first["Treasury_SF_10Y"], expected["raw_tfut_10"].rename("Treasury_SF_10Y"))
+    assert list(second.columns) == ["Treasury_SF_10Y"]
+    assert second.index.name == "date"
+
+
+def test_raw_load_keeps_stata_names(dta, tmp_path):
+    path, _ = dta
+    raw = reference_data.load_spreads_wide(raw=True, data_dir=tmp_path / "store")
+    pd.testing.assert_frame_equal(raw, pd.read_stata(path).set_index("date"))
+
+
+def test_refresh_rebuilds_from_a_newer_download(dta, tmp_path):
+    path, calls = dta
+    store = tmp_path / "store"
+    reference_data.load_spreads_wide(["CIP_AUD"], data_dir=store)
+
+    df = pd.read_stata(path)
+    df["raw_cip_aud"] = 1.0
+    df.to_stata(path, write_index=False)
+    assert (reference_data.load_spreads_wide(["CIP_AUD"], data_dir=store)["CIP_AUD"] != 1.0).any()
+    assert (reference_data.load_spreads_wide(["CIP_AUD"], data_dir=store, refresh=True)["CIP_AUD"] == 1.0).all()
+    assert len(calls) == 2
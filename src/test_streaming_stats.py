@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_stats import MomentAccumulator, QuantileSketch, YearlyStats
+
+
+@pytest.fixture(scope="module")
+def panel():
+    """Daily spreads with NaNs, a missing year and a series absent for a year."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2010-01-01", "2016-12-31", name="Date")
+    x = rng.normal(0, 1, (len(dates), 4)).cumsum(axis=0) + 1e4 * np.array([0, 0, 0, 1])
+    df = pd.DataFrame(x, index=dates, columns=["A", "B", "C", "D"])
+    df[rng.random(df.shape) < 0.05] = np.nan
+    df.loc["2012", "C"] = np.nan
+    return df.drop(df.loc["2014"].index)
+
+
+def test_tables_match_pandas(panel):
+    tables = YearlyStats().update(panel).tables()
+
+    pd.testing.assert_frame_equal(tables["overall_statistics"], panel.describe(), rtol=1e-10)
+    pd.testing.assert_frame_equal(tables["correlation_matrix"], panel.corr(), rtol=1e-10)
+    pd.testing.assert_frame_equal(tables["annual_statistics"],
+                                  panel.resample("YE").agg(["mean", "std", "min", "max"]),
+                                  rtol=1e-10, check_freq=False)
+
+
+def test_append_folds_new_days_only(panel):
+    stats = YearlyStats().update(panel.loc[:"2013-06-30"])
+    stats.append(panel)          # overlaps the days already seen
+    stats.append(panel.iloc[-10:])
+    full = YearlyStats().update(panel).tables()
+    for name, table in stats.tables().items():
+        pd.testing.assert_frame_equal(table, full[name], rtol=1e-10)
+
+
+def test_merge_is_order_free(panel):
+    blocks = [MomentAccumulator.from_block(chunk, panel.columns) for chunk in np.array_split(panel.to_numpy(), 7)]
+    forward = MomentAccumulator.merge_all(blocks)
+    backward = MomentAccumulator.merge_all(blocks[::-1])
+    pd.testing.assert_frame_equal(forward.describe(), backward.describe(), rtol=1e-10)
+    pd.testing.assert_series_equal(forward.var(ddof=0), panel.var(ddof=0), rtol=1e-10)
+
+
+def test_quantile_sketch():
+    x = np.random.default_rng(1).standard_normal(50_000)
+    q = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+    exact = QuantileSketch(capacity=len(x)).update(x)
+    np.testing.assert_allclose(exact.quantile(q), np.quantile(x, q), rtol=1e-12)
+
+    merged = QuantileSketch(capacity=1000)
+    for chunk in np.array_split(x, 20):
+        merged = merged.merge(QuantileSketch(capacity=1000).update(chunk))
+    assert len(merged.values) <= 1000 and merged.count == len(x)
+    np.testing.assert_allclose(merged.quantile(q), np.quantile(x, q), atol=0.02)
+    assert np.isnan(QuantileSketch().quantile(0.5))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import misc_tools
+import weighted_stats
+
+
+@pytest.fixture(scope="module")
+def panel():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        "date": rng.integers(0, 300, n),
+        "venue": rng.choice(["A", "B", None], n),
+        "rate": rng.normal(2.0, 0.5, n) + 1e3,
+        "volume": rng.uniform(0, 100, n),
+    })
+    df.loc[rng.random(n) < 0.05, "rate"] = np.nan
+    df.loc[rng.random(n) < 0.05, "volume"] = np.nan
+    df.loc[df["date"] == 7, "volume"] = 0.0
+    return df
+
+
+def _reference(group, ddof):
+    group = group.dropna(subset=["rate", "volume"])
+    x, w, n = group["rate"], group["volume"], len(group)
+    if n == 0 or w.sum() == 0:
+        return pd.Series({"mean": np.nan, "var": np.nan})
+    mean = np.average(x, weights=w)
+    var = np.sum(w * (x - mean) ** 2) / ((n - ddof) / n * w.sum()) if n > ddof else np.nan
+    return pd.Series({"mean": mean, "var": var})
+
+
+@pytest.mark.parametrize("by_col", ["date", ["date", "venue"]])
+@pytest.mark.parametrize("ddof", [0, 1, 2])
+def test_matches_groupby_apply(panel, by_col, ddof):
+    expected = panel.groupby(by_col).apply(_reference, ddof=ddof, include_groups=False)
+    moments = weighted_stats.grouped_weighted_moments(panel, "rate", "volume", by_col, ddof=ddof)
+
+    pd.testing.assert_index_equal(moments.index, expected.index)
+    np.testing.assert_allclose(moments["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(moments["var"], expected["var"], rtol=1e-8, atol=1e-14)
+    assert moments.loc[7, "mean"].isna().all() if isinstance(by_col, list) else np.isnan(moments.loc[7, "mean"])
+
+
+def test_misc_tools_wrappers(panel):
+    before = panel.copy()
+    mean = misc_tools.groupby_weighted_average("rate", "volume", "date", data=panel)
+    rows = misc_tools.groupby_weighted_average("rate", "volume", "date", data=panel,
+                                               transform=True, new_column_name="wavg")
+    std = misc_tools.groupby_weighted_std("rate", "volume", "date", data=panel, ddof=1)
+    pd.testing.assert_frame_equal(panel, before)
+
+    assert rows.name == "wavg" and len(rows) == len(panel)
+    np.testing.assert_array_equal(rows.to_numpy(), mean.loc[panel["date"]].to_numpy())
+    moments = weighted_stats.grouped_weighted_moments(panel, "rate", "volume", "date")
+    pd.testing.assert_series_equal(std, moments["std"], check_names=False)
+    valid = panel.dropna(subset=["rate", "volume"])
+    assert misc_tools.weighted_average("rate", "volume", panel) == pytest.approx(
+        np.average(valid["rate"], weights=valid["volume"]), rel=1e-12)
+
+
+def test_docstring_examples():
+    df_nccb = pd.DataFrame({
+        "trade_direction": ["RECEIVED"] * 4 + ["DELIVERED"] * 4,
+        "rate": [2, 2, 2, 3, 2, 2, 2, 3],
+        "start_leg_amount": [300, 300, 300, 0, 200, 200, 200, 200],
+    })
+    std = misc_tools.groupby_weighted_std("rate", "start_leg_amount", "trade_direction", df_nccb, ddof=1)
+    np.testing.assert_allclose(std, [0.5, 0.0])
+    std = misc_tools.groupby_weighted_std("rate", "start_leg_amount", "trade_direction", df_nccb, ddof=0)
+    np.testing.assert_allclose(std, [np.std([2, 2, 2, 3]), 0.0])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+bench_compute_tips_treasury.py
+
+Benchmark the pandas and Dask engines of
+`compute_tips_treasury.compute_tips_treasury` on synthetic inputs of growing
+size, and report the crossover used by engine="auto" (SMALL_INPUT_ROWS).
+
+Each size N writes the three input files with N rows each: the Fed nominal and
+TIPS curves as parquet and the inflation swaps as CSV. The timestamps are
+spread evenly over 1700-2200 (several per day at large N), so the number of
+decade partitions, and thus the Dask parallelism, is that of a long
+multi-curve history. For every size the two
+results are checked for equality.
+
+Usage:
+    python bench_compute_tips_treasury.py
+    python bench_compute_tips_treasury.py --sizes 10000 1000000 --mode local
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import compute_tips_treasury
+import execution_context
+
+
+def write_synthetic_inputs(directory, n_rows, seed=0):
+    """Write fed_yield_curve.parquet, fed_tips_yield_curve.parquet and treasury_inflation_swaps.csv."""
+    rng = np.random.default_rng(seed)
+    directory = Path(directory)
+    start, end = pd.Timestamp("1700-01-01"), pd.Timestamp("2200-01-01")
+    step = (end.value - start.value) // n_rows // 10**9 * 10**9  # whole seconds
+    dates = pd.DatetimeIndex(start.value + np.arange(n_rows, dtype=np.int64) * step)
+    n = len(dates)
+    labels = dates.strftime("%Y-%m-%d %H:%M:%S")
+
+    nom = pd.DataFrame(rng.normal(3, 1, (n, 30)), columns=[f"SVENY{i:02d}" for i in range(1, 31)],
+                       index=pd.DatetimeIndex(dates, name="Date"))
+    nom.to_parquet(directory / "fed_yield_curve.parquet")
+
+    tips = pd.DataFrame(rng.normal(1, 1, (n, 19)), columns=[f"TIPSY{i:02d}" for i in range(2, 21)])
+    tips.insert(0, "Date", labels)
+    tips.to_parquet(directory / "fed_tips_yield_curve.parquet")
+
+    swaps = pd.DataFrame(rng.normal(2, 0.5, (n, 4)).round(4),
+                         columns=[f"USSWIT{t} BGN Curncy" for t in compute_tips_treasury.TENORS])
+    swaps.insert(0, "Dates", labels)
+    swaps.to_csv(directory / "treasury_inflation_swaps.csv", index=False)
+    return n
+
+
+def _time(func, *args, **kwargs):
+    start = time.perf_counter()
+    out = func(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def run_benchmark(sizes, repeats=1):
+    """Time both engines for each input size and return a results table."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        compute_tips_treasury.DATA_DIR = compute_tips_treasury.OUTPUT_DIR = tmp
+        for n in sizes:
+            n = write_synthetic_inputs(tmp, n)
+            times = {}
+            for engine in ("pandas", "dask"):
+                best = np.inf
+                for _ in range(repeats):
+                    out, t = _time(compute_tips_treasury.compute_tips_treasury, engine=engine, save=False)
+                    best = min(best, t)
+                times[engine] = (out, best)
+            identical = times["pandas"][0].equals(times["dask"][0])
+            rows.append({
+                "rows_per_input": n,
+                "estimated_rows": compute_tips_treasury.estimate_input_rows(),
+                "pandas_s": round(times["pandas"][1], 3),
+                "dask_s": round(times["dask"][1], 3),
+                "dask_speedup": round(times["pandas"][1] / times["dask"][1], 2),
+                "identical": identical,
+            })
+            print(rows[-1])
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 300_000, 1_000_000, 3_000_000])
+    parser.add_argument("--mode", default=None, choices=execution_context.MODES,
+                        help="Execution mode of the Dask engine (default: execution_context default)")
+    parser.add_argument("--repeats", type=int, default=1, help="Best of this many runs per engine")
+    args = parser.parse_args()
+
+    if args.mode:
+        execution_context.set_mode(args.mode)
+    results = run_benchmark(args.sizes, args.repeats)
+    print()
+    print(results.to_string(index=False))
+    faster = results[results["dask_s"] < results["pandas_s"]]
+    if len(faster):
+        print(f"\nDask is faster from ~{faster['estimated_rows'].iloc[0]:,} estimated input rows "
+              f"(SMALL_INPUT_ROWS = {compute_tips_treasury.SMALL_INPUT_ROWS:,})")
+    else:
+        print("\nPandas was faster at every size")
+    if not results["identical"].all():
+        raise SystemExit("Result mismatch between the pandas and Dask engines")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-from dask.distributed import Client
 import dask.dataframe as dd
 import math
 from numba import njit
@@ -8,6 +7,11 @@ import os
 from matplotlib import pyplot as plt
 from settings import config
 from pathlib import Path
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import execution_context
+from compute_tips_treasury import TENORS, synthetic_nominal_rate
 
 # Load environment variables
 DATA_DIR = Path(config("DATA_DIR"))
@@ -17,15 +21,6 @@ WRDS_USERNAME = config("WRDS_USERNAME")
 START_DATE = config("START_DATE")
 END_DATE = config("END_DATE")
 
-scheduler = config("DASK_SCHEDULER_ADDRESS", default=None)
-
-if scheduler:
-    client = Client(scheduler)
-else:
-    # fall‐back to launching a local cluster
-    client = Client()
-print("Connected to scheduler at:", client.scheduler.address)
-
 # Load inflation swaps (Excel or CSV)
 def load_inflation_swaps(data_dir=DATA_DIR):
     base = Path(data_dir)
@@ -44,7 +39,7 @@ def load_inflation_swaps(data_dir=DATA_DIR):
     df = df[['date'] + [c for c in rename.values() if c in df.columns and c!='date']]
     df['date'] = pd.to_datetime(df['date'], errors='coerce')
     df = df.dropna(subset=['date'])
-    return dd.from_pandas(df, npartitions=len(client.ncores()))
+    return dd.from_pandas(df, npartitions=execution_context.n_workers())
 
 # Load nominal yields from parquet
 def load_nominal_dd(data_dir=DATA_DIR):
@@ -52,7 +47,7 @@ def load_nominal_dd(data_dir=DATA_DIR):
     if 'date' not in pdf.columns:
         pdf = pdf.reset_index().rename(columns={pdf.index.name or 'index':'date'})
     pdf['date'] = pd.to_datetime(pdf['date'], errors='coerce')
-    return dd.from_pandas(pdf, npartitions=len(client.ncores()))
+    return dd.from_pandas(pdf, npartitions=execution_context.n_workers())
 
 # Load TIPS yields from parquet
 def load_tips_dd(data_dir=DATA_DIR):
@@ -62,7 +57,7 @@ def load_tips_dd(data_dir=DATA_DIR):
     pdf['date'] = pd.to_datetime(pdf['date'], errors='coerce')
     tip_map = {'TIPSY02':'TIPS_Treasury_02Y','TIPSY05':'TIPS_Treasury_05Y','TIPSY10':'TIPS_Treasury_10Y','TIPSY20':'TIPS_Treasury_20Y'}
     pdf = pdf.rename(columns={k:v for k,v in tip_map.items() if k in pdf.columns})
-    return dd.from_pandas(pdf, npartitions=len(client.ncores()))
+    return dd.from_pandas(pdf, npartitions=execution_context.n_workers())
 
 # Compute zero-coupon yields (bps)
 def process_nominal_yields(nom_ddf):
@@ -86,32 +81,33 @@ def process_tips_yields(tips_ddf):
     cols = ['date'] + [f"real_cc{t}" for t in [2,5,10,20]]
     return tips_ddf[cols]
 
-# Merge and compute arbitrage spreads
-# Note: use explicit array extraction to avoid .values misuse
-def merge_and_compute_arbitrage(nom_ddf, tips_ddf, swaps_ddf):
+# Synthetic nominal rates and spreads for all tenors at once, as (dates x tenors) arrays
+def arbitrage_columns(part, tenors=TENORS):
+    real = part[[f"real_cc{t}" for t in tenors]].to_numpy(dtype=float)
+    nom = part[[f"nom_zc{t}" for t in tenors]].to_numpy(dtype=float)
+    swap = part.reindex(columns=[f"inf_swap_{t}y" for t in tenors], fill_value=0.0).to_numpy(dtype=float)
+    rf = synthetic_nominal_rate(real, swap)
+    data = {f"tips_treas_{t}_rf": rf[:, i] for i, t in enumerate(tenors)}
+    data.update({f"arb{t}": (rf - nom)[:, i] for i, t in enumerate(tenors)})
+    out = pd.concat([part, pd.DataFrame(data, index=part.index)], axis=1)
+    cols = ['date'] + [f"real_cc{t}" for t in tenors] + \
+           [f"nom_zc{t}" for t in tenors] + \
+           [f"tips_treas_{t}_rf" for t in tenors] + \
+           [f"arb{t}" for t in tenors]
+    return out[cols]
+
+# Merge and compute arbitrage spreads in one pass over the partitions
+def merge_and_compute_arbitrage(nom_ddf, tips_ddf, swaps_ddf, tenors=TENORS):
     df = dd.merge(tips_ddf, nom_ddf, on='date', how='inner')
     df = dd.merge(df, swaps_ddf, on='date', how='inner')
-    for t in [2,5,10,20]:
-        swap_col = f"inf_swap_{t}y" if t!=5 else 'inf_swap_5y'
-        real = f"real_cc{t}"; nom = f"nom_zc{t}"; rf = f"tips_treas_{t}_rf"; arb = f"arb{t}"
-        def compute_rf(part):
-            real_arr = part[real].to_numpy()
-            swap_arr = part[swap_col].to_numpy() if swap_col in part.columns else np.zeros_like(real_arr)
-            return 1e4*(np.exp(real_arr + np.log1p(swap_arr)) - 1)
-        df[rf] = df.map_partitions(compute_rf, meta=(rf,'f8'))
-        df[arb] = df[rf] - df[nom]
-    cols = ['date'] + [f"real_cc{t}" for t in [2,5,10,20]] + \
-           [f"nom_zc{t}" for t in [2,5,10,20]] + \
-           [f"tips_treas_{t}_rf" for t in [2,5,10,20]] + \
-           [f"arb{t}" for t in [2,5,10,20]]
-    return df[cols]
+    return df.map_partitions(arbitrage_columns, tenors, meta=arbitrage_columns(df._meta, tenors))
 
 if __name__ == "__main__":
     swaps_ddf = load_inflation_swaps(DATA_MANUAL)
     nom_ddf = process_nominal_yields(load_nominal_dd(DATA_DIR))
     tips_ddf = process_tips_yields(load_tips_dd(DATA_DIR))
     merged_ddf = merge_and_compute_arbitrage(nom_ddf, tips_ddf, swaps_ddf)
-    result = merged_ddf.compute()
+    result = execution_context.compute(merged_ddf)
     out = Path(DATA_DIR)/'output'/'tips_treasury_implied_rf.dta'
     os.makedirs(out.parent, exist_ok=True)
     result.to_stata(out, write_index=False)
@@ -1,156 +1,408 @@
 import os
-from dask.distributed import Client
+import sys
 import dask.dataframe as dd
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 from decouple import config
 
-scheduler = config("DASK_SCHEDULER_ADDRESS", default=None)
-
-if scheduler:
-    client = Client(scheduler)
-else:
-    # fall‐back to launching a local cluster
-    client = Client()
-print("Connected to scheduler at:", client.scheduler.address)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import execution_context
 
 # Configuration
 DATA_DIR = config("DATA_DIR")
 OUTPUT_DIR = config("OUTPUT_DIR")
 
+TENORS = [2, 5, 10, 20]
+# Every maturity of the GSW nominal curve (SVENY01-SVENY30); the TIPS curve
+# covers 2-20 years (TIPSY02-TIPSY20), so the other tenors have no real yield.
+FULL_TENORS = list(range(1, 31))
+
+# Partition boundaries shared by all inputs: January 1 of every tenth year
+# (2000, 2010, ...). Frames with equal divisions are merged partition by
+# partition, without a shuffle. A decade of daily data is ~2,600 rows.
+YEARS_PER_PARTITION = 10
+
+# Inputs with fewer rows in total (as estimated from file metadata) are
+# computed in-process with pandas/NumPy instead of Dask. Per row, Dask's cost
+# falls to ~2x that of pandas on one core by 9M rows (bench_compute_tips_treasury.py),
+# so it only pays off on long multi-curve histories spread over several workers.
+SMALL_INPUT_ROWS = 10_000_000
+ENGINES = ("auto", "pandas", "dask")
+
+# ------------------------------------------------------------------------------
+# Readers: column projection, date-range pushdown, date-indexed partitions
+# ------------------------------------------------------------------------------
+def _date_filters(date_col, start_date, end_date):
+    filters = []
+    if start_date is not None:
+        filters.append((date_col, ">=", pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append((date_col, "<=", pd.Timestamp(end_date)))
+    return filters or None
+
+
+def _restrict_dates(ddf, start_date, end_date):
+    """Drop rows without a date or outside [start_date, end_date] (for sources without pushdown)."""
+    ddf = ddf.dropna(subset=["date"])
+    if start_date is not None:
+        ddf = ddf[ddf["date"] >= pd.Timestamp(start_date)]
+    if end_date is not None:
+        ddf = ddf[ddf["date"] <= pd.Timestamp(end_date)]
+    return ddf
+
+
+def read_parquet_dated(path, value_cols, start_date=None, end_date=None, lazy=True):
+    """
+    Read `value_cols` (those present) and the date of a Fed yield-curve parquet file.
+
+    The date is the 'date'/'Date' column, or the stored pandas index. Only the
+    needed columns are read, and when the date is stored as a timestamp the
+    date range is pushed down to the parquet reader as a row filter.
+
+    Returns:
+        DataFrame with a 'date' column, rows sorted by date: a dask DataFrame
+        if `lazy`, else a pandas one.
+    """
+    schema = pq.read_schema(path)
+    names = schema.names
+    pandas_meta = schema.pandas_metadata or {}
+    index_cols = [c for c in pandas_meta.get("index_columns", []) if isinstance(c, str)]
+    date_col = next((c for c in ("date", "Date") if c in names), index_cols[0] if index_cols else None)
+    if date_col is None:
+        raise ValueError(f"{path} has no date column or stored date index")
+
+    is_timestamp = pa.types.is_timestamp(schema.field(date_col).type)
+    columns = [date_col] + [c for c in value_cols if c in names]
+    filters = _date_filters(date_col, start_date, end_date) if is_timestamp else None
+    if lazy:
+        ddf = dd.read_parquet(path, columns=columns, index=False, filters=filters)
+    else:
+        ddf = pq.read_table(path, columns=columns, filters=filters).to_pandas(ignore_metadata=True)
+    ddf = ddf.rename(columns={date_col: "date"})
+    if not is_timestamp:
+        ddf["date"] = (dd if lazy else pd).to_datetime(ddf["date"], errors="coerce")
+    return _restrict_dates(ddf, start_date, end_date)
+
+
+def _date_indexed(ddf):
+    """Index a date-sorted frame by 'date' (a dask frame gets known divisions)."""
+    if isinstance(ddf, pd.DataFrame):
+        return ddf.set_index("date")
+    return ddf.set_index("date", sorted=True)
+
+
+def align_partitions(*frames, years=YEARS_PER_PARTITION):
+    """
+    Restrict date-indexed frames to their common date range and repartition them
+    onto the same calendar boundaries (January 1 of years divisible by `years`),
+    so that inner index joins between them are partition-wise. Frames without
+    overlap are returned unchanged.
+    """
+    lo = max(f.divisions[0] for f in frames)
+    hi = min(f.divisions[-1] for f in frames)
+    if lo > hi:
+        return list(frames)
+    first = pd.Timestamp(year=lo.year // years * years, month=1, day=1)
+    inner = [d for d in pd.date_range(first, hi, freq=f"{years}YS") if lo < d < hi]
+    divisions = [lo] + inner + [hi]
+    return [f.loc[lo:hi].repartition(divisions=divisions) for f in frames]
+
 # ------------------------------------------------------------------------------
 # Import inflation swap data (from CSV), return Dask DataFrame
 # ------------------------------------------------------------------------------
-def import_inflation_swap_data():
+SWAP_COLUMNS = {
+    "Dates": "date",
+    "USSWITA BGN Curncy": "inf_swap_1m",
+    "USSWITC BGN Curncy": "inf_swap_3m",
+    "USSWITF BGN Curncy": "inf_swap_6m",
+    "USSWIT1 BGN Curncy": "inf_swap_1y",
+    "USSWIT2 BGN Curncy": "inf_swap_2y",
+    "USSWIT3 BGN Curncy": "inf_swap_3y",
+    "USSWIT4 BGN Curncy": "inf_swap_4y",
+    "USSWIT5 BGN Curncy": "inf_swap_5y",
+    "USSWIT10 BGN Curncy": "inf_swap_10y",
+    "USSWIT20 BGN Curncy": "inf_swap_20y",
+    "USSWIT30 BGN Curncy": "inf_swap_30y"
+}
+
+def import_inflation_swap_data(start_date=None, end_date=None, lazy=True):
+    """Inflation swap rates (decimal), indexed by date; a dask DataFrame if `lazy`, else pandas."""
     swaps_path = Path(OUTPUT_DIR) / "treasury_inflation_swaps.csv"
-    pdf = pd.read_csv(swaps_path, parse_dates=["Dates"])
-    col_map = {
-        "Dates": "date",
-        "USSWITA BGN Curncy": "inf_swap_1m",
-        "USSWITC BGN Curncy": "inf_swap_3m",
-        "USSWITF BGN Curncy": "inf_swap_6m",
-        "USSWIT1 BGN Curncy": "inf_swap_1y",
-        "USSWIT2 BGN Curncy": "inf_swap_2y",
-        "USSWIT3 BGN Curncy": "inf_swap_3y",
-        "USSWIT4 BGN Curncy": "inf_swap_4y",
-        "USSWIT5 BGN Curncy": "inf_swap_5y",
-        "USSWIT10 BGN Curncy": "inf_swap_10y",
-        "USSWIT20 BGN Curncy": "inf_swap_20y",
-        "USSWIT30 BGN Curncy": "inf_swap_30y"
-    }
-    pdf = pdf.rename(columns=col_map)
-    inf_cols = [c for c in col_map.values() if c.startswith('inf_swap_')]
+    header = pd.read_csv(swaps_path, nrows=0).columns
+    usecols = [c for c in SWAP_COLUMNS if c in header]
+    xd = dd if lazy else pd
+    ddf = xd.read_csv(swaps_path, usecols=usecols, dtype={c: "object" for c in usecols if c != "Dates"})
+    ddf = ddf.rename(columns=SWAP_COLUMNS)
+    inf_cols = [SWAP_COLUMNS[c] for c in usecols if c != "Dates"]
     for col in inf_cols:
-        if col in pdf.columns:
-            pdf[col] = pd.to_numeric(pdf[col], errors='coerce') / 100.0
-    pdf = pdf[['date'] + [c for c in inf_cols if c in pdf.columns]]
-    pdf['date'] = pd.to_datetime(pdf['date'], errors='coerce')
-    pdf = pdf.dropna(subset=['date'])
-    return dd.from_pandas(pdf, npartitions=len(client.ncores()))
+        ddf[col] = xd.to_numeric(ddf[col], errors='coerce').astype(float) / 100.0
+    ddf["date"] = xd.to_datetime(ddf["date"], errors='coerce')
+    return _date_indexed(_restrict_dates(ddf, start_date, end_date)[['date'] + inf_cols])
 
 # ------------------------------------------------------------------------------
 # Import nominal Treasury yields (parquet)
 # ------------------------------------------------------------------------------
-def import_treasury_yields():
+def import_treasury_yields(start_date=None, end_date=None, lazy=True, tenors=TENORS):
+    """Nominal zero-coupon yields nom_zc{t} (basis points), indexed by date; dask if `lazy`, else pandas."""
     nom_path = Path(DATA_DIR) / "fed_yield_curve.parquet"
-    df = pd.read_parquet(nom_path)
-
-    # if the DataFrame’s index is already named 'date' or 'Date', promote it to a column
-    idx_name = df.index.name
-    if idx_name in ("date", "Date"):
-        df = df.reset_index().rename(columns={idx_name: "date"})
-
-    # otherwise, create a 'date' column from the index
-    if "date" not in df.columns:
-        df["date"] = pd.to_datetime(df.index, errors="coerce")
+    ddf = read_parquet_dated(nom_path, [f"SVENY{t:02d}" for t in tenors], start_date, end_date, lazy)
 
     # compute zero-coupon yields
-    for t in (2, 5, 10, 20):
+    cols = ["date"]
+    for t in tenors:
         col = f"SVENY{t:02d}"
-        if col in df.columns:
-            df[f"nom_zc{t}"] = 1e4 * (np.exp(df[col] / 100.0) - 1)
-
-    # keep only date + the newly created nom_zc columns
-    cols = ["date"] + [f"nom_zc{t}" for t in (2, 5, 10, 20) if f"nom_zc{t}" in df.columns]
-    df = df[cols]
-
-    return dd.from_pandas(df, npartitions=len(client.ncores()))
+        if col in ddf.columns:
+            ddf[f"nom_zc{t}"] = 1e4 * (np.exp(ddf[col] / 100.0) - 1)
+            cols.append(f"nom_zc{t}")
+    return _date_indexed(ddf[cols])
 
 
 # ------------------------------------------------------------------------------
 # Import TIPS real yields (parquet)
 # ------------------------------------------------------------------------------
-def import_tips_yields():
+def import_tips_yields(start_date=None, end_date=None, lazy=True, tenors=TENORS):
+    """Real zero-coupon yields real_cc{t} (decimal), indexed by date; dask if `lazy`, else pandas."""
     real_path = Path(DATA_DIR) / "fed_tips_yield_curve.parquet"
-    pdf = pd.read_parquet(real_path)
-    if 'Date' in pdf.columns:
-        pdf = pdf.rename(columns={'Date':'date'})
-    if 'date' not in pdf.columns:
-        pdf['date'] = pd.to_datetime(pdf.index, errors='coerce')
-    pdf['date'] = pd.to_datetime(pdf['date'], errors='coerce')
-    for t in [2,5,10,20]:
-        col = f"TIPSY{str(t).zfill(2)}"
-        if col in pdf.columns:
-            pdf[f"real_cc{t}"] = pdf[col] / 100.0
-    cols = ['date'] + [f"real_cc{t}" for t in [2,5,10,20] if f"real_cc{t}" in pdf.columns]
-    pdf = pdf[cols]
-    return dd.from_pandas(pdf, npartitions=len(client.ncores()))
+    ddf = read_parquet_dated(real_path, [f"TIPSY{t:02d}" for t in tenors], start_date, end_date, lazy)
+    cols = ["date"]
+    for t in tenors:
+        col = f"TIPSY{t:02d}"
+        if col in ddf.columns:
+            ddf[f"real_cc{t}"] = ddf[col] / 100.0
+            cols.append(f"real_cc{t}")
+    return _date_indexed(ddf[cols])
 
 # ------------------------------------------------------------------------------
 # Merge data and compute arbitrage series
 # ------------------------------------------------------------------------------
-def compute_tips_treasury():
-    swaps = import_inflation_swap_data()
-    nom   = import_treasury_yields()
-    tips  = import_tips_yields()
-
-    df = dd.merge(tips, nom, on='date', how='inner')
-    df = dd.merge(df, swaps, on='date', how='inner')
-
-    # Compute all tenors in one pass
-    def part_calc_all(part):
-        data = {}
-        for t in [2,5,10,20]:
-            real_arr = part[f"real_cc{t}"].to_numpy()
-            inf_arr  = part.get(f"inf_swap_{t}y", np.zeros_like(real_arr)).to_numpy()
-            rf_vals  = 1e4 * (np.exp(real_arr + np.log1p(inf_arr)) - 1)
-            data[f"tips_treas_{t}_rf"] = rf_vals
-            data[f"mi_{t}"] = np.isnan(rf_vals).astype(int)
-            data[f"arb_{t}"] = rf_vals - part[f"nom_zc{t}"].to_numpy()
-        return pd.DataFrame(data, index=part.index)
-
-    # Metadata for new columns
-    meta = {}
-    for t in [2,5,10,20]:
-        meta.update({
-            f"tips_treas_{t}_rf": 'f8',
-            f"mi_{t}": 'i8',
-            f"arb_{t}": 'f8'
-        })
-    comp = df.map_partitions(part_calc_all, meta=meta)
-    df = dd.concat([df, comp], axis=1)
-
-    # Filter rows with too many missing
-    mi_cols = [f"mi_{t}" for t in [2,5,10,20]]
-    df['miss_count'] = df[mi_cols].sum(axis=1)
-    df = df[df['miss_count'] < 4]
-    df = df.drop(mi_cols + ['miss_count'], axis=1)
+def synthetic_nominal_rate(real_cc, inf_swap):
+    """
+    Synthetic nominal zero-coupon rate (basis points) from continuously
+    compounded real yields and inflation swap rates (decimal), elementwise on
+    arrays of any shape.
+    """
+    return 1e4 * (np.exp(real_cc + np.log1p(inf_swap)) - 1)
+
+
+def tips_treasury_kernel(part):
+    """
+    Synthetic nominal rates and arbitrage spreads for every tenor of a merged
+    (date, real_cc*, nom_zc*, inf_swap_*) pandas frame, dropping rows where
+    all tenors are missing. Used unchanged by the pandas and Dask engines.
+    """
+    # (dates x tenors) blocks; a tenor without a swap column uses a zero swap rate
+    real = part[[f"real_cc{t}" for t in TENORS]].to_numpy(dtype=float)
+    nom = part[[f"nom_zc{t}" for t in TENORS]].to_numpy(dtype=float)
+    inf = part.reindex(columns=[f"inf_swap_{t}y" for t in TENORS], fill_value=0.0).to_numpy(dtype=float)
+    rf = synthetic_nominal_rate(real, inf)
+    data = {f"tips_treas_{t}_rf": rf[:, i] for i, t in enumerate(TENORS)}
+    data.update({f"arb_{t}": (rf - nom)[:, i] for i, t in enumerate(TENORS)})
+    df = pd.concat([part, pd.DataFrame(data, index=part.index)], axis=1)
+
+    # Drop rows where every tenor is missing
+    df = df[~np.isnan(rf).all(axis=1)]
 
     # Reorder
     keep = ['date'] + [c for c in df.columns if c.startswith('real_cc')] + \
            [c for c in df.columns if c.startswith('nom_zc')] + \
            [c for c in df.columns if c.startswith('tips_treas_')] + \
            [c for c in df.columns if c.startswith('arb_')]
-    df = df[keep]
+    return df[keep]
+
+
+# ------------------------------------------------------------------------------
+# Full-tenor term structure
+# ------------------------------------------------------------------------------
+def swap_maturity(col):
+    """Maturity in years of an inf_swap_{n}m / inf_swap_{n}y column."""
+    n, unit = col[len("inf_swap_"):-1], col[-1]
+    return int(n) / 12.0 if unit == "m" else float(n)
+
+
+def interpolate_curves(knots, values, maturities):
+    """
+    Linear interpolation of every row of `values` to `maturities`.
 
-    # Compute and save
-    result = df.compute()
-    out_path = Path(DATA_DIR) / "tips_treasury_implied_rf.parquet"
-    result.to_parquet(out_path, compression="snappy")
-    print(f"Data saved to {out_path}")
+    Each row is interpolated between its nearest observed knots on either side,
+    so a missing quote is bridged rather than propagated. Maturities outside a
+    row's observed range are NaN (no extrapolation).
+
+    Args:
+        knots (np.ndarray): (K,) increasing maturities of the columns of `values`.
+        values (np.ndarray): (dates x K) rates; NaN = missing.
+        maturities (np.ndarray): (M,) maturities to interpolate to.
+
+    Returns:
+        np.ndarray: (dates x M) interpolated rates.
+    """
+    knots = np.asarray(knots, dtype=float)
+    values = np.asarray(values, dtype=float)
+    maturities = np.asarray(maturities, dtype=float)
+    T, K = values.shape
+    if K == 0:
+        return np.full((T, len(maturities)), np.nan)
+    observed = ~np.isnan(values)
+    positions = np.arange(K)
+    # Per row and knot: the last observed knot at or before it, the first at or after it
+    last_obs = np.maximum.accumulate(np.where(observed, positions, -1), axis=1)
+    next_obs = np.minimum.accumulate(np.where(observed, positions, K)[:, ::-1], axis=1)[:, ::-1]
+
+    below = np.searchsorted(knots, maturities, side="right") - 1
+    above = np.searchsorted(knots, maturities, side="left")
+    lo = np.where(below >= 0, last_obs[:, np.clip(below, 0, K - 1)], -1)
+    hi = np.where(above < K, next_obs[:, np.clip(above, 0, K - 1)], K)
+    inside = (lo >= 0) & (hi < K)
+    lo, hi = np.clip(lo, 0, K - 1), np.clip(hi, 0, K - 1)
+
+    rows = np.arange(T)[:, None]
+    x_lo, x_hi = knots[lo], knots[hi]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(x_hi > x_lo, (maturities - x_lo) / (x_hi - x_lo), 0.0)
+    out = values[rows, lo] + weight * (values[rows, hi] - values[rows, lo])
+    return np.where(inside, out, np.nan)
+
+
+def term_structure_kernel(part, tenors=FULL_TENORS):
+    """
+    Long (date, tenor) panel of the TIPS-Treasury basis for every tenor of a
+    merged (date, real_cc*, nom_zc*, inf_swap_*) pandas frame.
+
+    The inflation swap curve of each date is interpolated to every tenor, and
+    the synthetic nominal rate and arbitrage are computed for all dates and
+    tenors as (dates x tenors) arrays. Pairs without a real yield, nominal
+    yield or swap rate are dropped. Rows are sorted by date, then tenor.
+    """
+    tenors = np.asarray(tenors)
+    swap_cols = sorted((c for c in part.columns if c.startswith("inf_swap_")), key=swap_maturity)
+    real = part.reindex(columns=[f"real_cc{t}" for t in tenors]).to_numpy(dtype=float)
+    nom = part.reindex(columns=[f"nom_zc{t}" for t in tenors]).to_numpy(dtype=float)
+    inf = interpolate_curves([swap_maturity(c) for c in swap_cols],
+                             part[swap_cols].to_numpy(dtype=float), tenors)
+    rf = synthetic_nominal_rate(real, inf)
+    arb = rf - nom
+
+    keep = ~np.isnan(arb).ravel()
+    dates = np.repeat(part["date"].to_numpy(), len(tenors))
+    panel = pd.DataFrame({
+        "date": dates,
+        "tenor": np.tile(tenors, len(part)),
+        "real_cc": real.ravel(),
+        "nom_zc": nom.ravel(),
+        "inf_swap": inf.ravel(),
+        "tips_treas_rf": rf.ravel(),
+        "arb": arb.ravel(),
+    })
+    return panel[keep].reset_index(drop=True)
+
+
+def compute_term_structure(start_date=None, end_date=None, tenors=FULL_TENORS, engine="auto", save=True):
+    """
+    TIPS-Treasury basis surface: a long (date, tenor) panel over every GSW
+    maturity in `tenors`, with the inflation swap curve interpolated to each.
+    The engines are those of `compute_tips_treasury`.
+    """
+    engine = choose_engine(engine)
+    if engine == "pandas":
+        df = _merge_inputs_pandas(start_date, end_date, tenors)
+        result = term_structure_kernel(df, tenors)
+    else:
+        with execution_context.activate():
+            df = _merge_inputs_dask(start_date, end_date, tenors)
+            meta = term_structure_kernel(df._meta, tenors)
+            result = execution_context.compute(df.map_partitions(term_structure_kernel, tenors, meta=meta))
+    result = result.reset_index(drop=True)
+
+    if save:
+        out_path = Path(DATA_DIR) / "tips_treasury_term_structure.parquet"
+        result.to_parquet(out_path, compression="snappy")
+        print(f"Data saved to {out_path}")
     return result
 
+
+def estimate_input_rows():
+    """
+    Total rows of the three inputs, from file metadata only: the parquet
+    footers, and the CSV size divided by the length of its first lines.
+    """
+    rows = sum(pq.read_metadata(Path(DATA_DIR) / name).num_rows
+               for name in ("fed_yield_curve.parquet", "fed_tips_yield_curve.parquet"))
+    swaps_path = Path(OUTPUT_DIR) / "treasury_inflation_swaps.csv"
+    with open(swaps_path, "rb") as f:
+        sample = f.read(1 << 16)
+    lines = max(sample.count(b"\n"), 1)
+    return rows + int(swaps_path.stat().st_size * lines / max(len(sample), 1))
+
+
+def choose_engine(engine="auto", threshold=SMALL_INPUT_ROWS):
+    """Resolve engine="auto" to "pandas" below `threshold` estimated input rows, else "dask"."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    if engine == "auto":
+        return "pandas" if estimate_input_rows() < threshold else "dask"
+    return engine
+
+
+def compute_tips_treasury(start_date=None, end_date=None, engine="auto", save=True):
+    """
+    Merge the TIPS, nominal and inflation swap curves and compute the
+    TIPS-Treasury arbitrage series.
+
+    engine="pandas" runs in-process; engine="dask" builds a partition-aligned
+    Dask graph in the shared execution context; engine="auto" picks pandas for
+    inputs below SMALL_INPUT_ROWS. Both apply `tips_treasury_kernel`, so their
+    results are identical.
+    """
+    engine = choose_engine(engine)
+    if engine == "pandas":
+        result = _compute_tips_treasury_pandas(start_date, end_date)
+    else:
+        # All computations, including the divisions of the readers, run in the shared execution context.
+        with execution_context.activate():
+            result = _compute_tips_treasury_dask(start_date, end_date)
+    result = result.reset_index(drop=True)
+
+    if save:
+        out_path = Path(DATA_DIR) / "tips_treasury_implied_rf.parquet"
+        result.to_parquet(out_path, compression="snappy")
+        print(f"Data saved to {out_path}")
+    return result
+
+
+def _merge_inputs_pandas(start_date, end_date, tenors=TENORS):
+    swaps = import_inflation_swap_data(start_date, end_date, lazy=False)
+    nom   = import_treasury_yields(start_date, end_date, lazy=False, tenors=tenors)
+    tips  = import_tips_yields(start_date, end_date, lazy=False, tenors=tenors)
+
+    df = pd.merge(tips, nom, left_index=True, right_index=True, how='inner')
+    df = pd.merge(df, swaps, left_index=True, right_index=True, how='inner')
+    return df.reset_index()
+
+
+def _merge_inputs_dask(start_date, end_date, tenors=TENORS):
+    swaps = import_inflation_swap_data(start_date, end_date)
+    nom   = import_treasury_yields(start_date, end_date, tenors=tenors)
+    tips  = import_tips_yields(start_date, end_date, tenors=tenors)
+
+    # Same divisions on all three inputs: both joins run partition by partition.
+    tips, nom, swaps = align_partitions(tips, nom, swaps)
+    df = dd.merge(tips, nom, left_index=True, right_index=True, how='inner')
+    df = dd.merge(df, swaps, left_index=True, right_index=True, how='inner')
+    return df.reset_index()
+
+
+def _compute_tips_treasury_pandas(start_date, end_date):
+    return tips_treasury_kernel(_merge_inputs_pandas(start_date, end_date))
+
+
+def _compute_tips_treasury_dask(start_date, end_date):
+    df = _merge_inputs_dask(start_date, end_date)
+    df = df.map_partitions(tips_treasury_kernel, meta=tips_treasury_kernel(df._meta))
+    return execution_context.compute(df)
+
 # Run as script
 if __name__ == "__main__":
     compute_tips_treasury()
+    compute_term_structure()
@@ -1,9 +1,15 @@
+import argparse
+import os
+import sys
 import pandas as pd
-import requests
-from io import BytesIO
 from pathlib import Path
 
 from settings import config
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import fed_curve_store
+import http_cache
+
 DATA_DIR = config('DATA_DIR')
 
 # Define the URL for the TIPS yield data
@@ -22,13 +28,11 @@ def pull_fed_tips_yield_curve():
     Returns:
         pd.DataFrame: Processed TIPS yield data.
     """
-    # Fetch the data from the Federal Reserve
-    response = requests.get(TIPS_URL)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch TIPS data: HTTP {response.status_code}")
-    
+    # Fetch the data from the Federal Reserve (revalidated against the local copy)
+    path = http_cache.fetch(TIPS_URL)
+
     # Read CSV while skipping the first 19 rows (metadata)
-    df = pd.read_csv(BytesIO(response.content), skiprows=18)
+    df = pd.read_csv(path, skiprows=18)
     
     # Convert 'Date' column to datetime format
     #df.rename(columns={'Date': 'date'}, inplace=True)
@@ -89,7 +93,22 @@ def load_tips_yield_curve(data_dir):
 
 # Example usage
 if __name__ == "__main__":
-    tips_df = pull_fed_tips_yield_curve()
-    save_tips_yield_curve(tips_df, DATA_DIR)
-    # To load the data later
-    #loaded_tips_df = load_tips_yield_curve(DATA_DIR)
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append only the days published since the last pull to the curve store "
+                             "and write the Parquet file(s) from it")
+    parser.add_argument("--compact", action="store_true",
+                        help="Compact the curve store and write the Parquet file(s) from it")
+    args = parser.parse_args()
+
+    if args.incremental or args.compact:
+        if args.incremental:
+            # Rewrite the Parquet file(s) read by the pipeline, unless compact does it below
+            fed_curve_store.update("tips", DATA_DIR, export_flat=not args.compact)
+        if args.compact:
+            fed_curve_store.compact("tips", DATA_DIR, export_flat=True)
+    else:
+        tips_df = pull_fed_tips_yield_curve()
+        save_tips_yield_curve(tips_df, DATA_DIR)
+        # To load the data later
+        #loaded_tips_df = load_tips_yield_curve(DATA_DIR)
@@ -1,9 +1,15 @@
+import argparse
+import os
+import sys
 import pandas as pd
-import requests
-from io import BytesIO
 from pathlib import Path
 
 from settings import config
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import fed_curve_store
+import http_cache
+
 DATA_DIR = config('DATA_DIR')
 
 
@@ -23,9 +29,7 @@ def pull_fed_yield_curve():
     """
     
     url = "https://www.federalreserve.gov/data/yield-curve-tables/feds200628.csv"
-    response = requests.get(url)
-    pdf_stream = BytesIO(response.content)
-    df_all = pd.read_csv(pdf_stream, skiprows=9, index_col=0, parse_dates=True)
+    df_all = pd.read_csv(http_cache.fetch(url), skiprows=9, index_col=0, parse_dates=True)
 
     cols = ['SVENY' + str(i).zfill(2) for i in range(1, 31)]
     df = df_all[cols]
@@ -63,8 +67,23 @@ def _demo():
     
 
 if __name__ == "__main__":
-    df_all, df = pull_fed_yield_curve()
-    path = Path(DATA_DIR) / "fed_yield_curve_all.parquet"
-    df_all.to_parquet(path)
-    path = Path(DATA_DIR) / "fed_yield_curve.parquet"
-    df.to_parquet(path)
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append only the days published since the last pull to the curve store "
+                             "and write the Parquet file(s) from it")
+    parser.add_argument("--compact", action="store_true",
+                        help="Compact the curve store and write the Parquet file(s) from it")
+    args = parser.parse_args()
+
+    if args.incremental or args.compact:
+        if args.incremental:
+            # Rewrite the Parquet file(s) read by the pipeline, unless compact does it below
+            fed_curve_store.update("nominal", DATA_DIR, export_flat=not args.compact)
+        if args.compact:
+            fed_curve_store.compact("nominal", DATA_DIR, export_flat=True)
+    else:
+        df_all, df = pull_fed_yield_curve()
+        path = Path(DATA_DIR) / "fed_yield_curve_all.parquet"
+        df_all.to_parquet(path)
+        path = Path(DATA_DIR) / "fed_yield_curve.parquet"
+        df.to_parquet(path)
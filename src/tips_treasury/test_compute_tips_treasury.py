@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import compute_tips_treasury
+
+
+@pytest.fixture
+def inputs(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    nom_dates = pd.bdate_range("1995-01-02", "2021-12-31")
+    nom = pd.DataFrame(rng.normal(3, 1, (len(nom_dates), 30)), columns=[f"SVENY{i:02d}" for i in range(1, 31)],
+                       index=pd.DatetimeIndex(nom_dates, name="Date"))
+    nom.iloc[::37, 4] = np.nan
+    nom.to_parquet(tmp_path / "fed_yield_curve.parquet")
+
+    tips_dates = pd.bdate_range("1999-01-04", "2021-12-31")
+    tips = pd.DataFrame(rng.normal(1, 1, (len(tips_dates), 19)), columns=[f"TIPSY{i:02d}" for i in range(2, 21)])
+    tips.insert(0, "Date", tips_dates.strftime("%Y-%m-%d"))
+    tips.to_parquet(tmp_path / "fed_tips_yield_curve.parquet")
+
+    swap_dates = pd.bdate_range("2008-06-02", "2020-06-30")
+    swaps = pd.DataFrame(rng.normal(2, 0.5, (len(swap_dates), 4)),
+                         columns=["USSWIT2 BGN Curncy", "USSWIT5 BGN Curncy", "USSWIT10 BGN Curncy",
+                                  "USSWIT20 BGN Curncy"])
+    swaps.insert(0, "Dates", swap_dates.strftime("%Y-%m-%d"))
+    swaps.loc[10, "USSWIT5 BGN Curncy"] = "#N/A"
+    swaps.to_csv(tmp_path / "treasury_inflation_swaps.csv", index=False)
+
+    monkeypatch.setattr(compute_tips_treasury, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(compute_tips_treasury, "OUTPUT_DIR", tmp_path)
+    return nom, tips, swaps
+
+
+def test_importers_project_and_filter_dates(inputs):
+    nom = compute_tips_treasury.import_treasury_yields("2005-01-01", "2006-12-31")
+    assert list(nom.columns) == ["nom_zc2", "nom_zc5", "nom_zc10", "nom_zc20"]
+    assert nom.known_divisions
+    result = nom.compute()
+    assert result.index.min() >= pd.Timestamp("2005-01-01")
+    assert result.index.max() <= pd.Timestamp("2006-12-31")
+
+    swaps = compute_tips_treasury.import_inflation_swap_data().compute()
+    assert list(swaps.columns) == ["inf_swap_2y", "inf_swap_5y", "inf_swap_10y", "inf_swap_20y"]
+    assert (swaps.dtypes == "float64").all()
+    assert np.isnan(swaps["inf_swap_5y"].iloc[10])
+
+
+def test_aligned_partitions_share_divisions(inputs):
+    frames = [compute_tips_treasury.import_tips_yields(), compute_tips_treasury.import_treasury_yields(),
+              compute_tips_treasury.import_inflation_swap_data()]
+    aligned = compute_tips_treasury.align_partitions(*frames)
+    assert len({f.divisions for f in aligned}) == 1
+    assert aligned[0].divisions[1:-1] == (pd.Timestamp("2010-01-01"), pd.Timestamp("2020-01-01"))
+
+
+def test_compute_tips_treasury_matches_pandas(inputs):
+    nom, tips, swaps = inputs
+    result = compute_tips_treasury.compute_tips_treasury()
+
+    df = pd.DataFrame({
+        "date": pd.to_datetime(tips["Date"]),
+        "real_cc10": tips["TIPSY10"] / 100.0,
+    }).merge(pd.DataFrame({"date": nom.index, "nom_zc10": 1e4 * (np.exp(nom["SVENY10"].to_numpy() / 100.0) - 1)}))
+    df = df.merge(pd.DataFrame({"date": pd.to_datetime(swaps["Dates"]),
+                                "inf_swap_10y": swaps["USSWIT10 BGN Curncy"] / 100.0}))
+    rf = 1e4 * (np.exp(df["real_cc10"] + np.log1p(df["inf_swap_10y"])) - 1)
+
+    assert result["date"].tolist() == df["date"].tolist()
+    np.testing.assert_allclose(result["tips_treas_10_rf"], rf)
+    np.testing.assert_allclose(result["arb_10"], rf - df["nom_zc10"])
+
+
+def test_pandas_and_dask_engines_match(inputs):
+    pandas_result = compute_tips_treasury.compute_tips_treasury("2009-01-01", "2019-12-31", engine="pandas", save=False)
+    dask_result = compute_tips_treasury.compute_tips_treasury("2009-01-01", "2019-12-31", engine="dask", save=False)
+    pd.testing.assert_frame_equal(pandas_result, dask_result)
+
+    nom, tips, swaps = inputs
+    n_rows = len(nom) + len(tips) + len(swaps)
+    assert abs(compute_tips_treasury.estimate_input_rows() - n_rows) < 0.05 * n_rows
+    assert compute_tips_treasury.choose_engine() == "pandas"
+    assert compute_tips_treasury.choose_engine(threshold=0) == "dask"
+    with pytest.raises(ValueError):
+        compute_tips_treasury.choose_engine("spark")
+
+
+def test_interpolate_curves_matches_np_interp():
+    rng = np.random.default_rng(1)
+    knots = np.array([1 / 12, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30])
+    values = rng.normal(size=(50, len(knots)))
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[0] = np.nan
+    maturities = np.linspace(0, 35, 71)
+
+    result = compute_tips_treasury.interpolate_curves(knots, values, maturities)
+    for row, got in zip(values, result):
+        observed = ~np.isnan(row)
+        expected = np.full(len(maturities), np.nan)
+        if observed.any():
+            inside = (maturities >= knots[observed].min()) & (maturities <= knots[observed].max())
+            expected[inside] = np.interp(maturities[inside], knots[observed], row[observed])
+        np.testing.assert_allclose(got, expected, atol=1e-12)
+
+
+def test_term_structure_panel(inputs):
+    panel = compute_tips_treasury.compute_term_structure(engine="pandas", save=False)
+    dask_panel = compute_tips_treasury.compute_term_structure(engine="dask", save=False)
+    pd.testing.assert_frame_equal(panel, dask_panel)
+
+    # No TIPS yield below 2 or above 20 years; rows sorted by date, then tenor
+    assert set(panel["tenor"]) == set(range(2, 21))
+    assert panel.set_index(["date", "tenor"]).index.is_monotonic_increasing
+
+    # Quoted swap tenors reproduce the wide series; others are interpolated
+    wide = compute_tips_treasury.compute_tips_treasury(engine="pandas", save=False)
+    ten = panel[panel["tenor"] == 10].merge(wide[["date", "arb_10"]].dropna(), on="date")
+    np.testing.assert_allclose(ten["arb"], ten["arb_10"])
+    _, _, swaps = inputs
+    first = panel[(panel["date"] == panel["date"].min()) & panel["tenor"].isin([5, 7, 10])]
+    quotes = swaps.loc[swaps["Dates"] == panel["date"].min().strftime("%Y-%m-%d")].iloc[0]
+    np.testing.assert_allclose(first["inf_swap"].iloc[1],
+                               (0.6 * quotes["USSWIT5 BGN Curncy"] + 0.4 * quotes["USSWIT10 BGN Curncy"]) / 100)
@@ -27,9 +27,14 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 import compute_tips_treasury
+import os
+import sys
 import unittest
 from settings import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import reference_data
+
 # config.switch_to_alt() # Use data stored on local VDI
 DATA_DIR = config("DATA_DIR")
 OUTPUT_DIR = config("OUTPUT_DIR")
@@ -522,20 +527,13 @@ def load_combined_spreads_wide(data_dir=DATA_DIR, raw=False, rename=True):
     In the raw data, variables labeled "raw" are the raw spreads.
     Without raw means the absolute value has been applied.
     """
-    data_dir = Path(data_dir)
-    # filepath = (
-    #     data_dir / "arbitrage_spread_wide.dta"
-    # )
-    filepath = "https://www.dropbox.com/scl/fi/81jm3dbe856i7p17rjy87/arbitrage_spread_wide.dta?rlkey=ke78u464vucmn43zt27nzkxya&st=59g2n7dt&dl=1"
-    df = pd.read_stata(filepath).set_index("date")
+    # Served from the local Parquet copy of arbitrage_spread_wide.dta (see reference_data.py)
     if raw:
-        ret = df.copy()
-    else:
-        ret = df[list(name_map.keys())]
-        if rename:
-            ret = ret.rename(columns=name_map)
-        ret = ret.reindex(sorted(ret.columns), axis=1)
-    return ret
+        return reference_data.load_spreads_wide(raw=True, data_dir=data_dir)
+    ret = reference_data.load_spreads_wide(data_dir=data_dir)
+    if not rename:
+        ret = ret.rename(columns=reference_data.STATA_NAMES)
+    return ret.reindex(sorted(ret.columns), axis=1)
 
 
 def load_combined_spreads_long(data_dir=DATA_DIR, rename=True):
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+bench_rolling_outlier_flag.py
+
+Benchmark the `outlier_filter` leave-one-out engine behind
+`calc_treasury_data.rolling_outlier_flag` against the original row-by-row
+loop (`rolling_outlier_flag_loop`) on synthetic Tenor x business-day panels.
+
+The loop is O(n^2) per tenor, so it is only timed up to --max-loop-rows; for
+those sizes the two flag columns are also checked for equality.
+
+Usage:
+    python bench_rolling_outlier_flag.py
+    python bench_rolling_outlier_flag.py --sizes 10000 100000 1000000 --max-loop-rows 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from calc_treasury_data import rolling_outlier_flag, rolling_outlier_flag_loop
+
+ROWS_PER_TENOR = 10_000  # ~40 years of business days
+
+
+def make_synthetic_panel(n_rows, seed=0):
+    """
+    Build a long panel with columns [Date, Tenor, arb] and about n_rows rows.
+    Each tenor is a random walk on business days with occasional spikes and NaNs.
+    """
+    rng = np.random.default_rng(seed)
+    n_tenors = max(1, int(np.ceil(n_rows / ROWS_PER_TENOR)))
+    per_tenor = int(np.ceil(n_rows / n_tenors))
+    dates = pd.bdate_range("1980-01-01", periods=per_tenor)
+
+    frames = []
+    for tenor in range(n_tenors):
+        arb = rng.normal(0, 1, per_tenor).cumsum() * 0.2 + rng.normal(0, 2, per_tenor)
+        n_spikes = max(1, per_tenor // 500)
+        spikes = rng.choice(per_tenor, n_spikes, replace=False)
+        arb[spikes] += rng.choice([-1, 1], n_spikes) * 100
+        arb[rng.random(per_tenor) < 0.01] = np.nan
+        frames.append(pd.DataFrame({"Date": dates, "Tenor": tenor, "arb": arb}))
+    return pd.concat(frames, ignore_index=True).iloc[:n_rows]
+
+
+def _time(func, *args, **kwargs):
+    start = time.perf_counter()
+    out = func(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def run_benchmark(sizes, max_loop_rows, window_days=45, threshold=10):
+    """Time both implementations for each panel size and return a results table."""
+    rows = []
+    for n in sizes:
+        df = make_synthetic_panel(n)
+        fast, t_fast = _time(rolling_outlier_flag, df, "Tenor", "Date", "arb",
+                             window_days=window_days, threshold=threshold)
+        t_loop, identical = np.nan, None
+        if n <= max_loop_rows:
+            slow, t_loop = _time(rolling_outlier_flag_loop, df, "Tenor", "Date", "arb",
+                                 window_days=window_days, threshold=threshold)
+            identical = bool(fast["bad_price"].equals(slow["bad_price"]))
+        rows.append({
+            "rows": len(df),
+            "tenors": df["Tenor"].nunique(),
+            "flagged": int(fast["bad_price"].sum()),
+            "engine_s": round(t_fast, 3),
+            "loop_s": round(t_loop, 3),
+            "speedup": round(t_loop / t_fast, 1) if n <= max_loop_rows else np.nan,
+            "identical_flags": identical,
+        })
+        print(rows[-1])
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--max-loop-rows", type=int, default=20_000,
+                        help="Largest panel on which to also time the O(n^2) loop")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.max_loop_rows)
+    print()
+    print(results.to_string(index=False))
+    if results["identical_flags"].eq(False).any():
+        raise SystemExit("Flag mismatch between engine and loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,40 +25,26 @@ import os
 
 # Ensure 'src' is in sys.path
 sys.path.append(os.path.abspath("./src"))  # Add 'src' to the path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
 
 # Now import config from settings.py
 from settings import config  # <- FIXED
+from outlier_filter import leave_one_out_outlier_flags
+from curve_interpolation import interpolate_ois_frame
+from contract_calendar import settlement_dates
 
 # Set data directory
 DATA_DIR = config("DATA_DIR")
 MANUAL_DATA_DIR = config("MANUAL_DATA_DIR")
 OUTPUT_DIR = config("OUTPUT_DIR")
 
-
-
-
+# Contracts that mature after the last trading date in the data: day 31 of the month
+MAT_DAY_OVERRIDES = {"DEC 21": 31, "MAR 22": 31}
 
 
 # -------------------------
 # Helper functions
 # -------------------------
-def parse_contract_date(contract_str):
-    """
-    Parse contract string to extract month and year.
-    E.g., "DEC 21" -> (12, 2021)
-    """
-    if pd.isna(contract_str) or not isinstance(contract_str, str):
-        return None, None
-    month_abbr = contract_str[:3].upper()
-    year_str = contract_str[4:6]
-    month_map = {'DEC': 12, 'MAR': 3, 'JUN': 6, 'SEP': 9}
-    month = month_map.get(month_abbr, np.nan)
-    try:
-        year = int(year_str) + 2000
-    except:
-        year = np.nan
-    return month, year
-
 def interpolate_ois(ttm, ois_1w, ois_1m, ois_3m, ois_6m, ois_1y):
     """Interpolate the OIS rate based on TTM (in days)."""
     if ttm <= 7:
@@ -75,6 +61,33 @@ def interpolate_ois(ttm, ois_1w, ois_1m, ois_3m, ois_6m, ois_1y):
 def rolling_outlier_flag(df, group_col, date_col, value_col, window_days=45, threshold=10):
     """
     Flag outliers using a rolling window (±45 days) per group.
+
+    An observation is flagged when its distance from the median of the other
+    observations in the window is at least `threshold` times their mean
+    absolute deviation. The window statistics come from
+    `outlier_filter.leave_one_out_outlier_flags`, which returns the same
+    flags as `rolling_outlier_flag_loop` in O(n log n) per group.
+    """
+    df = df.copy()
+    df['bad_price'] = False
+    df[date_col] = pd.to_datetime(df[date_col])
+    df.sort_values(date_col, inplace=True)
+
+    dates = df[date_col].to_numpy()
+    values = df[value_col].to_numpy(dtype=float)
+    bad_price = np.zeros(len(df), dtype=bool)
+    for name, pos in df.groupby(group_col, sort=False).indices.items():
+        pos = pos[~np.isnat(dates[pos])]
+        bad_price[pos] = leave_one_out_outlier_flags(
+            dates[pos], values[pos], window_days=window_days, threshold=threshold
+        )
+    df['bad_price'] = bad_price
+    return df
+
+def rolling_outlier_flag_loop(df, group_col, date_col, value_col, window_days=45, threshold=10):
+    """
+    Row-by-row reference implementation of `rolling_outlier_flag`.
+    O(n^2) per group; kept for tests and benchmarks.
     """
     df = df.copy()
     df['bad_price'] = False
@@ -132,29 +145,12 @@ def calc_treasury():
         ttm_col = f"TTM_{v}"
         mat_date_col = f"Mat_Date_{v}"
         
-        # Parse contract string to get month and year
-        df_long[[f"Mat_Month_{v}", f"Mat_Year_{v}"]] = df_long[contract_col].apply(
-            lambda s: pd.Series(parse_contract_date(s))
-        )
-        
-        # Merge with last_day_df to get the day-of-month
-        df_long = df_long.merge(last_day_df, left_on=[f"Mat_Month_{v}", f"Mat_Year_{v}"], 
-                                right_on=["Mat_Month", "Mat_Year"], how="left", suffixes=("", f"_{v}"))
-        # For specific contracts without a business day, set Mat_Day = 31
-        cond_special = df_long[contract_col].isin(["DEC 21", "MAR 22"])
-        df_long.loc[cond_special, "Mat_Day"] = 31
-        
-        def make_mat_date(row):
-            try:
-                return datetime(int(row[f"Mat_Year_{v}"]), int(row[f"Mat_Month_{v}"]), int(row["Mat_Day"]))
-            except Exception:
-                return pd.NaT
-        df_long[mat_date_col] = df_long.apply(make_mat_date, axis=1)
+        # Maturity: last business day of the contract month, i.e. the last
+        # trading date of that month in the data (resolved once per contract)
+        df_long[mat_date_col] = settlement_dates(df_long[contract_col], "last_business_day",
+                                                 trading_days=last_day_df["Date"],
+                                                 overrides=MAT_DAY_OVERRIDES)
         df_long[ttm_col] = (df_long[mat_date_col] - df_long["Date"]).dt.days
-        
-        # Clean up temporary columns
-        df_long.drop(columns=[f"Mat_Month_{v}", f"Mat_Year_{v}", "Mat_Month", "Mat_Year", "Mat_Day"], 
-                      inplace=True, errors='ignore')
     
     # -------------------------
     
@@ -170,14 +166,7 @@ def calc_treasury():
     for v in [1, 2]:
         ttm_col = f"TTM_{v}"
         ois_col = f"OIS_{v}"
-        df_long[ois_col] = df_long.apply(lambda row: 
-                                         interpolate_ois(row[ttm_col],
-                                                         row.get("OIS_1W", np.nan),
-                                                         row.get("OIS_1M", np.nan),
-                                                         row.get("OIS_3M", np.nan),
-                                                         row.get("OIS_6M", np.nan),
-                                                         row.get("OIS_1Y", np.nan)
-                                                        ) if pd.notnull(row[ttm_col]) else np.nan, axis=1)
+        df_long[ois_col] = interpolate_ois_frame(df_long, ttm_col)
     
     # -------------------------
     # Compute Treasury arbitrage spreads
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+curve_interpolation.py
+
+Batched piecewise-linear interpolation of term-structure curves.
+
+Each row carries its own curve (e.g. the OIS quotes observed on that date) and
+its own time-to-maturity. `interpolate_curve` evaluates all rows at once:
+
+    - The segment of each row is found with one `np.searchsorted` over the
+      knot tenors, and the two bracketing quotes are gathered from the 2-D
+      curve block.
+    - Below the first knot the first quote is returned (flat).
+    - Beyond the last knot the last segment is extrapolated linearly.
+    - Inside a segment the weights are written as in
+      `calc_treasury_data.interpolate_ois`, so the results are bit-identical
+      to the scalar version.
+
+Usage:
+    ois = interpolate_ois_frame(df_long, "TTM_2")
+"""
+
+import numpy as np
+import pandas as pd
+
+# OIS quote columns and their tenors in days.
+OIS_KNOTS = {
+    "OIS_1W": 7,
+    "OIS_1M": 30,
+    "OIS_3M": 90,
+    "OIS_6M": 180,
+    "OIS_1Y": 360,
+}
+
+
+def interpolate_curve(ttm, curve, knots):
+    """
+    Interpolate one curve per row at that row's time-to-maturity.
+
+    Args:
+        ttm (array-like): Time-to-maturity of each row, shape (n,). NaN gives NaN.
+        curve (array-like): Quotes at `knots` for each row, shape (n, k).
+        knots (array-like): Increasing knot tenors, same units as `ttm`, k >= 2.
+
+    Returns:
+        np.ndarray: Interpolated values, shape (n,).
+    """
+    ttm = np.asarray(ttm, dtype=float)
+    curve = np.asarray(curve, dtype=float)
+    knots = np.asarray(knots, dtype=float)
+    rows = np.arange(len(ttm))
+
+    # Segment j spans (knots[j], knots[j + 1]]; the last one also covers ttm > knots[-1].
+    seg = np.searchsorted(knots[1:-1], ttm, side="left")
+    k0, k1 = knots[seg], knots[seg + 1]
+    y0, y1 = curve[rows, seg], curve[rows, seg + 1]
+    span = k1 - k0
+    out = ((k1 - ttm) / span) * y0 + ((ttm - k0) / span) * y1
+
+    out = np.where(ttm <= knots[0], curve[:, 0], out)
+    out[np.isnan(ttm)] = np.nan
+    return out
+
+
+def interpolate_ois_frame(df, ttm_col, knots=OIS_KNOTS):
+    """
+    Interpolate the OIS curve of each row of `df` at `df[ttm_col]` days.
+
+    Quote columns missing from `df` are treated as NaN.
+
+    Returns:
+        pd.Series: Interpolated OIS rate aligned with `df.index`.
+    """
+    curve = df.reindex(columns=list(knots)).to_numpy(dtype=float)
+    values = interpolate_curve(df[ttm_col].to_numpy(dtype=float), curve, list(knots.values()))
+    return pd.Series(values, index=df.index)
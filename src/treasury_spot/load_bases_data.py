@@ -23,12 +23,17 @@ Notes:
   dataset for convenience.
 """
 
+import os
+import sys
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from settings import config
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # shared src/ modules
+import reference_data
+
 # Points to the directory where data is stored
 DATA_DIR = config("DATA_DIR")
 
@@ -54,40 +59,8 @@ DATA_DIR = config("DATA_DIR")
 
 
 
-name_map = {
-    "raw_box_12m": "Box_06m",
-    "raw_box_18m": "Box_12m",
-    "raw_box_6m": "Box_18m",
-    "raw_cal_dow": "Eq_SF_Dow",
-    "raw_cal_ndaq": "Eq_SF_NDAQ",
-    "raw_cal_spx": "Eq_SF_SPX",
-    "raw_cds_bond_hy": "CDS_Bond_HY",
-    "raw_cds_bond_ig": "CDS_Bond_IG",
-    "raw_cip_aud": "CIP_AUD",
-    "raw_cip_cad": "CIP_CAD",
-    "raw_cip_chf": "CIP_CHF",
-    "raw_cip_eur": "CIP_EUR",
-    "raw_cip_gbp": "CIP_GBP",
-    "raw_cip_jpy": "CIP_JPY",
-    "raw_cip_nzd": "CIP_NZD",
-    "raw_cip_sek": "CIP_SEK",
-    "raw_tfut_10": "Treasury_SF_10Y",
-    "raw_tfut_2": "Treasury_SF_02Y",
-    "raw_tfut_20": "Treasury_SF_20Y",
-    "raw_tfut_30": "Treasury_SF_30Y",
-    "raw_tfut_5": "Treasury_SF_05Y",
-    "raw_tips_treas_10": "TIPS_Treasury_10Y",
-    "raw_tips_treas_2": "TIPS_Treasury_02Y",
-    "raw_tips_treas_20": "TIPS_Treasury_20Y",
-    "raw_tips_treas_5": "TIPS_Treasury_05Y",
-    "raw_tswap_1": "Treasury_Swap_01Y",
-    "raw_tswap_10": "Treasury_Swap_10Y",
-    "raw_tswap_2": "Treasury_Swap_02Y",
-    "raw_tswap_20": "Treasury_Swap_20Y",
-    "raw_tswap_3": "Treasury_Swap_03Y",
-    "raw_tswap_30": "Treasury_Swap_30Y",
-    "raw_tswap_5": "Treasury_Swap_05Y",
-}
+# Stata name of each raw spread -> name used across the pipeline
+name_map = reference_data.SPREAD_NAMES
 
 
 def load_combined_spreads_wide(data_dir=DATA_DIR, raw=False, rename=True):
@@ -96,23 +69,20 @@ def load_combined_spreads_wide(data_dir=DATA_DIR, raw=False, rename=True):
     If not raw, only keeps the columns labeled 'raw_*' in the original dataset
     and optionally renames them.
 
+    The .dta is downloaded once and kept as a Parquet file in `data_dir`
+    (see reference_data.py); later calls read it from there.
+
     Returns:
     --------
     DataFrame with a date index and a variety of spread columns (CIP, CDS-Bond,
     Box, Equity SF, TIPS, Treasury-Futures, etc.).
     """
-    # The code references an external link for the .dta file
-    url = "https://www.dropbox.com/scl/fi/81jm3dbe856i7p17rjy87/arbitrage_spread_wide.dta?rlkey=ke78u464vucmn43zt27nzkxya&st=59g2n7dt&dl=1"
-    df = pd.read_stata(url).set_index("date")
-
     if raw:
-        return df.copy()
-    else:
-        columns_to_keep = list(name_map.keys())
-        subset_df = df[columns_to_keep].copy()
-        if rename:
-            subset_df = subset_df.rename(columns=name_map)
-        return subset_df.reindex(sorted(subset_df.columns), axis=1)
+        return reference_data.load_spreads_wide(raw=True, data_dir=data_dir)
+    subset_df = reference_data.load_spreads_wide(data_dir=data_dir)
+    if not rename:
+        subset_df = subset_df.rename(columns=reference_data.STATA_NAMES)
+    return subset_df.reindex(sorted(subset_df.columns), axis=1)
 
 
 
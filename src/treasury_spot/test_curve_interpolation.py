@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from calc_treasury_data import interpolate_ois
+from curve_interpolation import OIS_KNOTS, interpolate_curve, interpolate_ois_frame
+
+
+def test_interpolate_matches_scalar():
+    """Batched interpolation is bit-identical to `interpolate_ois`, including
+    the flat short end and the linear extrapolation past one year."""
+    rng = np.random.default_rng(0)
+    ttm = np.concatenate([[-3, 0, 7, 7.5, 30, 31, 90, 180, 181, 360, 365, 500], rng.uniform(0, 450, 500)])
+    curve = rng.uniform(0, 5, (len(ttm), len(OIS_KNOTS)))
+    curve[5, 2] = np.nan  # a missing 3M quote only affects rows that use it
+
+    fast = interpolate_curve(ttm, curve, list(OIS_KNOTS.values()))
+    slow = np.array([interpolate_ois(t, *c) for t, c in zip(ttm, curve)])
+    np.testing.assert_array_equal(fast, slow)
+
+
+def test_interpolate_ois_frame_missing_inputs():
+    """NaN TTM gives NaN, and missing quote columns are treated as NaN."""
+    df = pd.DataFrame({"TTM": [np.nan, 5, 60], "OIS_1W": [1.0, 1.0, 1.0], "OIS_1M": [2.0, 2.0, 2.0]})
+    out = interpolate_ois_frame(df, "TTM")
+    assert np.isnan(out.iloc[0])
+    assert out.iloc[1] == 1.0
+    assert np.isnan(out.iloc[2]), "60 days needs the (absent) 3M quote"
+
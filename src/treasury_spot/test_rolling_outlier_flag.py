@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calc_treasury_data import rolling_outlier_flag, rolling_outlier_flag_loop
+
+
+@pytest.fixture(scope="module")
+def df_panel():
+    """Small synthetic Tenor x business-day panel with spikes, gaps and NaNs."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2010-01-01", periods=400)
+    frames = []
+    for tenor in [2, 5, 10]:
+        arb = rng.normal(0, 5, len(dates)).cumsum() * 0.1 + rng.normal(0, 1, len(dates))
+        spikes = rng.choice(len(dates), 8, replace=False)
+        arb[spikes] += rng.choice([-1, 1], 8) * 80
+        arb[rng.choice(len(dates), 20, replace=False)] = np.nan
+        frames.append(pd.DataFrame({"Date": dates, "Tenor": tenor, "arb": arb}))
+    df = pd.concat(frames, ignore_index=True)
+    # Drop a block of dates in one tenor so windows have uneven lengths.
+    df = df.drop(df.index[(df["Tenor"] == 5) & (df["Date"].between("2010-06-01", "2010-08-15"))])
+    return df.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def test_flags_match_loop(df_panel):
+    """The windowed engine must return exactly the loop's flags."""
+    fast = rolling_outlier_flag(df_panel, "Tenor", "Date", "arb", window_days=45, threshold=10)
+    slow = rolling_outlier_flag_loop(df_panel, "Tenor", "Date", "arb", window_days=45, threshold=10)
+    pd.testing.assert_frame_equal(fast, slow)
+    assert fast["bad_price"].sum() > 0, "Synthetic spikes should be flagged"
+
+
+def test_flags_match_loop_low_threshold(df_panel):
+    """A low threshold flags many rows, exercising the exact re-check path."""
+    fast = rolling_outlier_flag(df_panel, "Tenor", "Date", "arb", window_days=10, threshold=2)
+    slow = rolling_outlier_flag_loop(df_panel, "Tenor", "Date", "arb", window_days=10, threshold=2)
+    pd.testing.assert_series_equal(fast["bad_price"], slow["bad_price"])
+
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+weighted_stats.py
+
+Grouped weighted means, variances and standard deviations, used by the
+copies of misc_tools.
+
+`groupby(...).apply` calls a Python function per group, which dominates the
+run time on panels with many groups. Here the rows are given integer group
+codes once (from `DataFrame.groupby`), and every per-group sum is a
+`np.bincount` over those codes:
+
+    count   number of rows with both a value and a weight
+    W       sum of w
+    mean    sum(w * x) / W
+    M2      sum(w * (x - mean)^2), in a second pass against the group means,
+            so there is no cancellation between sum(w * x^2) and mean^2
+
+    var     M2 / ((count - ddof) / count * W)
+
+The variance uses the same frequency-style correction as
+`misc_tools.groupby_weighted_std`: ddof=0 gives M2 / W, and ddof=1 scales it
+by count / (count - 1).
+
+Rows whose value or weight is NaN are left out, as are rows whose group key
+is NaN. Groups with no such rows, or with zero total weight, give NaN. The
+input frame is never modified.
+
+Usage:
+    moments = grouped_weighted_moments(df, "rate", "volume", "date", ddof=1)
+    moments["mean"], moments["std"]
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def group_codes(data, by_col):
+    """
+    Integer code of each row's group (-1 for NaN keys) and the group keys.
+
+    Groups are numbered in sorted key order, matching `groupby(by_col)`.
+    """
+    g = data.groupby(by_col, sort=True)
+    codes = g.ngroup()  # float with NaN when some keys are NaN
+    return codes.fillna(-1).to_numpy(dtype=np.int64), g.size().index
+
+
+def _kernel(codes, x, w, n_groups, ddof):
+    x = np.asarray(x, dtype=float)
+    w = np.asarray(w, dtype=float)
+    ok = (codes >= 0) & ~np.isnan(x) & ~np.isnan(w)
+    c, x, w = codes[ok], x[ok], w[ok]
+
+    count = np.bincount(c, minlength=n_groups).astype(float)
+    weight = np.bincount(c, weights=w, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(c, weights=w * x, minlength=n_groups) / weight
+        mean[weight == 0] = np.nan
+        dev = x - mean[c]
+        m2 = np.bincount(c, weights=w * dev * dev, minlength=n_groups)
+        var = m2 / ((count - ddof) / count * weight)
+    var[~(count > ddof)] = np.nan
+    return count, weight, mean, var
+
+
+def grouped_weighted_moments(data, data_col, weight_col, by_col, ddof=1):
+    """
+    Weighted count, total weight, mean, variance and std of `data_col` by group.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+    data_col, weight_col : str
+    by_col : str or list of str
+    ddof : int
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by the group keys, with columns count, weight, mean, var, std.
+    """
+    codes, keys = group_codes(data, by_col)
+    count, weight, mean, var = _kernel(codes, data[data_col], data[weight_col], len(keys), ddof)
+    return pd.DataFrame(
+        {"count": count, "weight": weight, "mean": mean, "var": var, "std": np.sqrt(var)},
+        index=keys,
+    )
+
+
+def weighted_mean(x, w):
+    """Weighted mean of x over the entries where x and w are both present."""
+    _, _, mean, _ = _kernel(np.zeros(len(x), dtype=np.int64), x, w, 1, 0)
+    return mean[0]
+
+
+def groupby_weighted_mean(data, data_col, weight_col, by_col, transform=False):
+    """
+    Weighted mean of `data_col` by group.
+
+    With `transform`, the group means are returned row by row, aligned with
+    the rows of `data` (NaN for rows with a NaN key).
+    """
+    codes, keys = group_codes(data, by_col)
+    _, _, mean, _ = _kernel(codes, data[data_col], data[weight_col], len(keys), 0)
+    if transform:
+        return np.where(codes >= 0, mean[codes], np.nan)
+    return pd.Series(mean, index=keys)
+
+
+def groupby_weighted_var(data, data_col, weight_col, by_col, ddof=1):
+    codes, keys = group_codes(data, by_col)
+    _, _, _, var = _kernel(codes, data[data_col], data[weight_col], len(keys), ddof)
+    return pd.Series(var, index=keys)
+
+
+def groupby_weighted_std(data, data_col, weight_col, by_col, ddof=1):
+    return np.sqrt(groupby_weighted_var(data, data_col, weight_col, by_col, ddof))